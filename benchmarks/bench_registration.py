@@ -0,0 +1,68 @@
+'''
+Compare registering resources one by one with batched registration::
+
+    $ python -m benchmarks.bench_registration
+
+"startup" is the time needed to register all namespaces on an app,
+"dispatch" is the time of looking up the last registered route.
+'''
+from __future__ import print_function
+import time
+import timeit
+
+from tornado.httputil import HTTPHeaders, HTTPServerRequest
+from tornado.web import Application, RequestHandler
+
+from tornado_restplus import Api, Namespace
+
+ROUTES_PER_NAMESPACE = 10
+
+
+class Handler(RequestHandler):
+    def get(self, item_id):
+        self.write(item_id)
+
+
+def make_namespaces(routes):
+    namespaces = []
+    for i in range(max(routes // ROUTES_PER_NAMESPACE, 1)):
+        ns = Namespace('ns{0}'.format(i))
+        for j in range(min(routes, ROUTES_PER_NAMESPACE)):
+            ns.add_resource(Handler, r'/resource{0}/(\d+)'.format(j))
+        namespaces.append(ns)
+    return namespaces
+
+
+def bench(batch, routes, number=1000):
+    namespaces = make_namespaces(routes)
+    app = Application()
+    api = Api(app, prefix='/api')
+    start = time.time()
+    if batch:
+        api.register_many(*namespaces)
+    else:
+        for ns in namespaces:
+            api.add_namespace(ns)
+    startup = time.time() - start
+
+    uri = '/api/{0}/resource{1}/42'.format(
+        namespaces[-1].name, min(routes, ROUTES_PER_NAMESPACE) - 1)
+    request = HTTPServerRequest(method='GET', uri=uri, headers=HTTPHeaders())
+    assert issubclass(app.find_handler(request).handler_class, Handler)
+    dispatch = min(timeit.repeat(lambda: app.find_handler(request),
+                                 number=number, repeat=3)) / number
+    return startup * 1e3, dispatch * 1e6
+
+
+def main():
+    print('{0:>8} {1:>8} {2:>14} {3:>14}'.format(
+        'routes', 'mode', 'startup [ms]', 'dispatch [us]'))
+    for routes in (10, 100, 1000):
+        for mode, batch in (('single', False), ('batch', True)):
+            startup, dispatch = bench(batch, routes)
+            print('{0:>8} {1:>8} {2:>14.2f} {3:>14.2f}'.format(
+                routes, mode, startup, dispatch))
+
+
+if __name__ == '__main__':
+    main()
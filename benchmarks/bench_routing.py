@@ -0,0 +1,60 @@
+'''
+Compare request dispatch cost of flat and per-namespace routing.
+
+Routes are spread over namespaces (10 routes each) and the last registered
+route is looked up, which is the worst case for the flat list::
+
+    $ python -m benchmarks.bench_routing
+'''
+from __future__ import print_function
+import timeit
+
+from tornado.httputil import HTTPHeaders, HTTPServerRequest
+from tornado.web import Application, RequestHandler
+
+from tornado_restplus import Api
+
+ROUTES_PER_NAMESPACE = 10
+
+
+class Handler(RequestHandler):
+    def get(self, item_id):
+        self.write(item_id)
+
+
+def make_app(routing, routes):
+    app = Application()
+    api = Api(app, prefix='/api', routing=routing)
+    for i in range(max(routes // ROUTES_PER_NAMESPACE, 1)):
+        ns = api.namespace('ns{0}'.format(i))
+        for j in range(min(routes, ROUTES_PER_NAMESPACE)):
+            ns.add_resource(Handler, r'/resource{0}/(\d+)'.format(j))
+    return app
+
+
+def make_request(routes):
+    last_ns = max(routes // ROUTES_PER_NAMESPACE, 1) - 1
+    last_route = min(routes, ROUTES_PER_NAMESPACE) - 1
+    uri = '/api/ns{0}/resource{1}/42'.format(last_ns, last_route)
+    return HTTPServerRequest(method='GET', uri=uri, headers=HTTPHeaders())
+
+
+def bench(routing, routes, number=10000):
+    app = make_app(routing, routes)
+    request = make_request(routes)
+    assert issubclass(app.find_handler(request).handler_class, Handler)
+    seconds = min(timeit.repeat(lambda: app.find_handler(request),
+                                number=number, repeat=3))
+    return seconds / number * 1e6
+
+
+def main():
+    print('{0:>8} {1:>14} {2:>14}'.format('routes', 'flat [us]',
+                                          'namespace [us]'))
+    for routes in (10, 100, 1000):
+        print('{0:>8} {1:>14.2f} {2:>14.2f}'.format(
+            routes, bench('flat', routes), bench('namespace', routes)))
+
+
+if __name__ == '__main__':
+    main()
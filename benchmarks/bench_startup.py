@@ -0,0 +1,98 @@
+'''
+Measure startup cost of an app with a few hundred documented handlers,
+with eager and lazy spec building, and loading routes exported with
+``Api.export_routes``::
+
+    $ python -m benchmarks.bench_startup
+
+"startup" is the time needed to define the handlers and register them on
+an :class:`Api` (or load them), "first spec" is the time of the first
+``spec.to_dict()``.
+'''
+from __future__ import print_function
+import time
+
+from tornado.web import Application, RequestHandler
+
+from tornado_restplus import Api
+
+HANDLERS = 300
+NAMESPACES = 10
+
+
+def get(self, item_id):
+    '''Get an item.
+    ---
+    description: Get an item
+    parameters:
+        - name: item_id
+          in: path
+          type: integer
+    responses:
+        200:
+            description: The item
+        404:
+            description: Item not found
+    '''
+
+
+def put(self, item_id):
+    '''Update an item.
+    ---
+    description: Update an item
+    responses:
+        204:
+            description: Item updated
+    '''
+
+
+def build_app(lazy_spec):
+    app = Application()
+    api = Api(app, prefix='/api', lazy_spec=lazy_spec)
+    namespaces = [api.namespace('ns{0}'.format(i)) for i in range(NAMESPACES)]
+    for i in range(HANDLERS):
+        # Each handler gets its own class, like in a real app module
+        handler = type('Handler{0}'.format(i), (RequestHandler, ),
+                       {'get': get, 'put': put, '__module__': __name__})
+        # Exported routes refer to handlers by import path
+        globals()[handler.__name__] = handler
+        ns = namespaces[i % NAMESPACES]
+        ns.add_resource(handler, r'/resource{0}/(\d+)'.format(i), _doc=True)
+    return api
+
+
+def load_app(data, namespaces):
+    api = Api(Application(), prefix='/api')
+    api.load_routes(data, namespaces=namespaces)
+    return api
+
+
+def bench(mode):
+    start = time.time()
+    if mode == 'exported':
+        built = build_app(False)
+        data = built.export_routes()
+        start = time.time()
+        api = load_app(data, built.namespaces)
+    else:
+        api = build_app(mode == 'lazy')
+    startup = time.time() - start
+    start = time.time()
+    doc = api.spec.to_dict()
+    first_spec = time.time() - start
+    assert len(doc['paths']) == HANDLERS
+    return startup * 1e3, first_spec * 1e3
+
+
+def main():
+    print('{0} documented handlers'.format(HANDLERS))
+    print('{0:>8} {1:>14} {2:>16}'.format('mode', 'startup [ms]',
+                                          'first spec [ms]'))
+    for mode in ('eager', 'lazy', 'exported'):
+        startup, first_spec = bench(mode)
+        print('{0:>8} {1:>14.1f} {2:>16.1f}'.format(mode, startup,
+                                                    first_spec))
+
+
+if __name__ == '__main__':
+    main()
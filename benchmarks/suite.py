@@ -0,0 +1,301 @@
+'''
+Request/response benchmark suite of the Api / Namespace stack.
+
+Each scenario builds an application, serves it with an in-process
+:class:`tornado.httpserver.HTTPServer` and drives it with
+:class:`tornado.httpclient.AsyncHTTPClient` on the same IOLoop, so whole
+request handling (parsing, routing, handler, serialization) is measured
+without network noise. Request counts and payloads are fixed, results
+are requests per second, p50 / p99 latency and response size::
+
+    $ python -m benchmarks.suite
+    $ python -m benchmarks.suite --save baseline.json
+    $ python -m benchmarks.suite --compare baseline.json --tolerance 0.2
+
+With ``--compare`` the exit status is 1 when any scenario is slower than
+the baseline by more than the tolerance (relative, on p50 latency and
+throughput), so the suite can gate releases.
+'''
+from __future__ import print_function
+import argparse
+import json
+import platform
+import sys
+import time
+
+import tornado
+from marshmallow import Schema, fields
+from tornado import gen
+from tornado.httpclient import AsyncHTTPClient
+from tornado.httpserver import HTTPServer
+from tornado.ioloop import IOLoop
+from tornado.testing import bind_unused_port
+from tornado.web import Application, RequestHandler
+
+from tornado_restplus import Api
+
+CONCURRENCY = 10
+
+
+class ItemHandler(RequestHandler):
+    def get(self, item_id):
+        self.write(item_id)
+
+
+class DocumentedHandler(RequestHandler):
+    def get(self, item_id):
+        '''Get an item.
+        ---
+        description: Get an item
+        parameters:
+            - name: item_id
+              in: path
+              type: integer
+        responses:
+            200:
+                description: The item
+        '''
+        self.write(item_id)
+
+
+class ItemSchema(Schema):
+    id = fields.Int()
+    name = fields.Str()
+    tags = fields.List(fields.Str())
+    price = fields.Float()
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    index = min(int(round(fraction * (len(values) - 1))), len(values) - 1)
+    return values[index]
+
+
+def summarize(latencies, seconds, size=None):
+    result = {
+        'rps': len(latencies) / seconds,
+        'p50_ms': percentile(latencies, 0.5) * 1e3,
+        'p99_ms': percentile(latencies, 0.99) * 1e3,
+    }
+    if size is not None:
+        result['bytes'] = size
+    return result
+
+
+@gen.coroutine
+def drive(port, path, requests, headers=None):
+    '''
+    Send ``requests`` GET requests to the path from ``CONCURRENCY``
+    concurrent workers, returns latencies, total time and response size.
+    '''
+    client = AsyncHTTPClient(force_instance=True, max_clients=CONCURRENCY)
+    url = 'http://127.0.0.1:{0}{1}'.format(port, path)
+    latencies = []
+    sizes = []
+
+    @gen.coroutine
+    def worker(count):
+        for _ in range(count):
+            start = time.time()
+            response = yield client.fetch(url, headers=headers)
+            latencies.append(time.time() - start)
+            sizes.append(len(response.body))
+
+    # Warm up caches (schemas, negotiation, connections)
+    yield [worker(2) for _ in range(CONCURRENCY)]
+    del latencies[:], sizes[:]
+    start = time.time()
+    yield [worker(requests // CONCURRENCY) for _ in range(CONCURRENCY)]
+    seconds = time.time() - start
+    client.close()
+    raise gen.Return((latencies, seconds, sizes[-1]))
+
+
+def serve(app, path, requests, headers=None):
+    sock, port = bind_unused_port()
+    server = HTTPServer(app)
+    server.add_sockets([sock])
+    try:
+        latencies, seconds, size = IOLoop.current().run_sync(
+            lambda: drive(port, path, requests, headers))
+    finally:
+        server.stop()
+    return summarize(latencies, seconds, size)
+
+
+def bench_routing_depth(depth, requests):
+    app = Application()
+    api = Api(app, prefix='/api')
+    path = ''.join('/level{0}'.format(i) for i in range(depth - 1))
+    ns = api.namespace('ns', path=path or '/ns')
+    ns.add_resource(ItemHandler, r'/items/(\d+)')
+    return serve(app, '/api{0}/items/42'.format(path or '/ns'), requests)
+
+
+def bench_namespaces(count, requests, routing='flat'):
+    app = Application()
+    api = Api(app, prefix='/api', routing=routing)
+    with api.batch():
+        for i in range(count):
+            api.namespace('ns{0}'.format(i)).add_resource(
+                ItemHandler, r'/items/(\d+)')
+    # The last namespace is the worst case of flat routing
+    return serve(app, '/api/ns{0}/items/42'.format(count - 1), requests)
+
+
+def documented_api(handlers, lazy_spec=False):
+    api = Api(Application(), prefix='/api', lazy_spec=lazy_spec)
+    for i in range(handlers):
+        ns = api.namespace('ns{0}'.format(i % 10))
+        ns.add_resource(type('Handler{0}'.format(i), (DocumentedHandler, ),
+                             {}),
+                        r'/items{0}/(\d+)'.format(i), _doc=True)
+    return api
+
+
+def bench_spec(handlers, repeat, cold):
+    '''
+    Time of ``spec.to_dict()``, cold: of a freshly registered api (it
+    parses all docstrings), warm: of an unchanged spec.
+    '''
+    api = documented_api(handlers, lazy_spec=True)
+    api.spec.to_dict()
+    latencies = []
+    start = time.time()
+    for _ in range(repeat):
+        if cold:
+            api = documented_api(handlers, lazy_spec=True)
+        call_start = time.time()
+        api.spec.to_dict()
+        latencies.append(time.time() - call_start)
+    return summarize(latencies, time.time() - start)
+
+
+def bench_spec_http(requests):
+    api = documented_api(100)
+    return serve(api.app, '/api/swagger.json', requests)
+
+
+def bench_payload(items, requests, mediatype='application/json'):
+    app = Application()
+    api = Api(app, prefix='/api')
+    data = [{'id': i, 'name': 'item{0}'.format(i), 'tags': ['a', 'b'],
+             'price': i * 1.5} for i in range(items)]
+
+    ns = api.namespace('items')
+
+    @ns.route('/')
+    class ItemsHandler(RequestHandler):
+        @api.marshal_with(ItemSchema, many=True)
+        def get(self):
+            return data
+
+    return serve(app, '/api/items/', requests, headers={'Accept': mediatype})
+
+
+def scenarios(quick=False):
+    '''
+    Returns list of ``(name, function)`` of all scenarios.
+    '''
+    requests = 200 if quick else 2000
+    result = []
+    for depth in (1, 3, 6):
+        result.append(('routing_depth_{0}'.format(depth),
+                       lambda depth=depth: bench_routing_depth(depth,
+                                                               requests)))
+    for count in (1, 10, 100):
+        for routing in ('flat', 'namespace'):
+            result.append((
+                'namespaces_{0}_{1}'.format(count, routing),
+                lambda count=count, routing=routing: bench_namespaces(
+                    count, requests, routing)))
+    result.append(('spec_cold_100', lambda: bench_spec(
+        100, 5 if quick else 20, cold=True)))
+    result.append(('spec_warm_100', lambda: bench_spec(
+        100, 100 if quick else 1000, cold=False)))
+    result.append(('spec_http', lambda: bench_spec_http(requests)))
+    for items in (10, 100, 1000):
+        result.append(('payload_json_{0}'.format(items),
+                       lambda items=items: bench_payload(items, requests)))
+    result.append(('payload_msgpack_1000', lambda: bench_payload(
+        1000, requests, 'application/x-msgpack')))
+    return result
+
+
+def run(quick=False, only=None):
+    results = {}
+    for name, func in scenarios(quick):
+        if only and only not in name:
+            continue
+        results[name] = func()
+        print_result(name, results[name])
+    return results
+
+
+def print_result(name, result, baseline=None):
+    line = '{0:<26} {1:>10.0f} {2:>9.3f} {3:>9.3f} {4:>9}'.format(
+        name, result['rps'], result['p50_ms'], result['p99_ms'],
+        result.get('bytes', ''))
+    if baseline is not None:
+        line += ' {0:>+8.1%} {1:>+8.1%}'.format(
+            result['rps'] / baseline['rps'] - 1,
+            result['p50_ms'] / baseline['p50_ms'] - 1)
+    print(line)
+
+
+def compare(results, baseline, tolerance):
+    '''
+    Returns names of scenarios regressed by more than tolerance against
+    the baseline.
+    '''
+    print('\n{0:<26} {1:>10} {2:>9} {3:>9} {4:>9} {5:>8} {6:>8}'.format(
+        'vs baseline', 'req/s', 'p50 [ms]', 'p99 [ms]', 'bytes',
+        'req/s', 'p50'))
+    regressed = []
+    for name, result in sorted(results.items()):
+        base = baseline.get(name)
+        if base is None:
+            continue
+        print_result(name, result, base)
+        if result['rps'] < base['rps'] * (1 - tolerance) or \
+                result['p50_ms'] > base['p50_ms'] * (1 + tolerance):
+            regressed.append(name)
+    return regressed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--save', metavar='FILE',
+                        help='save results as a baseline')
+    parser.add_argument('--compare', metavar='FILE',
+                        help='compare results with a saved baseline')
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help='allowed relative regression (default 0.2)')
+    parser.add_argument('--quick', action='store_true',
+                        help='run fewer requests (for smoke tests)')
+    parser.add_argument('--only', help='run scenarios containing the text')
+    args = parser.parse_args(argv)
+
+    print('{0:<26} {1:>10} {2:>9} {3:>9} {4:>9}'.format(
+        'scenario', 'req/s', 'p50 [ms]', 'p99 [ms]', 'bytes'))
+    results = run(args.quick, args.only)
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump({
+                'meta': {'python': platform.python_version(),
+                         'tornado': tornado.version,
+                         'quick': args.quick},
+                'results': results,
+            }, f, indent=2, sort_keys=True)
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)['results']
+        regressed = compare(results, baseline, args.tolerance)
+        if regressed:
+            print('\nRegressed: {0}'.format(', '.join(regressed)))
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
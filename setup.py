@@ -4,6 +4,8 @@ from setuptools import setup
 tests_require = ['pytest', 'pytest-cov']
 setup_requires = ['pytest-runner']
 install_requires = ['tornado>=4.5.1', 'apispec>=0.22.0', 'marshmallow>=2.13.5']
+extras_require = {'msgpack': ['msgpack'], 'cbor': ['cbor2'],
+                  'brotli': ['brotli']}
 
 setup(
     name='tornado-restplus',
@@ -14,6 +16,7 @@ setup(
     packages=['tornado_restplus'],
     setup_requires=setup_requires,
     install_requires=install_requires,
+    extras_require=extras_require,
     tests_require=tests_require,
     license='MIT',
     long_description=open('README.md').read(),
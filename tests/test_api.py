@@ -73,3 +73,49 @@ class ApiTest(AsyncHTTPTestCase):
         response = self.fetch('/api/ns2_path/endpoint2')
         assert response.code == 200
         assert response.body == b'SomeHandler [1]'
+
+    def test_batch_registration(self):
+        api = Api(self.app, doc=False)
+        ns1 = Namespace('ns1')
+        ns2 = Namespace('ns2')
+
+        @ns1.route('/endpoint1', reply='[1]')
+        @ns2.route('/endpoint2', reply='[2]')
+        class SomeHandler(BaseEchoHandler):
+            pass
+
+        rules = len(self.app.default_router.rules)
+        with api.batch():
+            api.add_namespace(ns1)
+            api.add_namespace(ns2)
+
+            @ns2.route('/endpoint3', reply='[3]')
+            class AnotherHandler(BaseEchoHandler):
+                pass
+
+            assert len(self.app.default_router.rules) == rules
+        assert len(self.app.default_router.rules) == rules + 1
+
+        response = self.fetch('/ns1/endpoint1')
+        assert response.body == b'SomeHandler [1]'
+        response = self.fetch('/ns2/endpoint2')
+        assert response.body == b'SomeHandler [2]'
+        response = self.fetch('/ns2/endpoint3')
+        assert response.body == b'AnotherHandler [3]'
+
+    def test_register_many(self):
+        api = Api(self.app, doc=False)
+        namespaces = [Namespace('ns{0}'.format(i)) for i in range(3)]
+        for i, ns in enumerate(namespaces):
+            ns.add_resource(BaseEchoHandler, '/endpoint', reply=str(i))
+        # The same url registered twice, the first one wins
+        namespaces[0].add_resource(BaseEchoHandler, '/endpoint', reply='x')
+
+        rules = len(self.app.default_router.rules)
+        api.register_many(*namespaces)
+        assert len(self.app.default_router.rules) == rules + 1
+        assert len(self.app.default_router.rules[-2].target.rules) == 3
+
+        for i in range(3):
+            response = self.fetch('/ns{0}/endpoint'.format(i))
+            assert response.body == 'BaseEchoHandler {0}'.format(i).encode()
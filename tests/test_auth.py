@@ -0,0 +1,233 @@
+import json
+import time
+from unittest import TestCase
+
+from tornado import gen
+from tornado.concurrent import Future
+from tornado.testing import AsyncHTTPTestCase, AsyncTestCase, gen_test
+from tornado.web import Application, RequestHandler
+
+from tornado_restplus import Api, Namespace
+from tornado_restplus.auth import (Authorizer, TokenCache,
+                                   normalize_security)
+
+AUTHORIZATIONS = {
+    'apikey': {'type': 'apiKey', 'in': 'header', 'name': 'X-API-KEY'},
+    'oauth2': {'type': 'oauth2', 'flow': 'implicit', 'scopes': {},
+               'authorizationUrl': 'https://example.com/auth'},
+}
+
+
+class NormalizeSecurityTest(TestCase):
+    def test_normalize(self):
+        assert normalize_security(None) is None
+        assert normalize_security('apikey') == [{'apikey': []}]
+        assert normalize_security(['apikey', {'oauth2': ['read']}]) == \
+            [{'apikey': []}, {'oauth2': ['read']}]
+        assert normalize_security([]) == []
+
+
+class TokenCacheTest(TestCase):
+    def test_ttl(self):
+        cache = TokenCache(ttl=0.01)
+        cache.set('a', 1)
+        assert cache.get('a') == 1
+        time.sleep(0.02)
+        assert cache.get('a') is None
+
+    def test_max_entries(self):
+        cache = TokenCache(max_entries=2)
+        for key in 'abc':
+            cache.set(key, key)
+        assert len(cache) == 2
+        assert cache.get('a') is None
+
+
+class AuthorizerTest(TestCase):
+    def test_check(self):
+        authorizer = Authorizer(AUTHORIZATIONS)
+        authorizer.verifier('apikey')(lambda token: None)
+        authorizer.check([{'apikey': []}])
+        with self.assertRaises(ValueError):
+            authorizer.check([{'oauth2': []}])
+        authorizer.check([{'oauth2': []}], verifiers=False)
+        with self.assertRaises(ValueError):
+            authorizer.check([{'unknown': []}], verifiers=False)
+
+    def test_misconfigured(self):
+        with self.assertRaises(ValueError):
+            Api(authorizations=AUTHORIZATIONS, security='unknown')
+        api = Api(authorizations=AUTHORIZATIONS, security='apikey')
+        ns = api.namespace('pets')
+
+        class PetsHandler(RequestHandler):
+            def get(self):
+                pass
+
+        class PetHandler(RequestHandler):
+            @ns.secure('oauth2')
+            def get(self):
+                pass
+
+        # No verifier of api security
+        with self.assertRaises(ValueError):
+            ns.add_resource(PetsHandler, '/')
+        api.verifier('apikey')(lambda token: None)
+        ns.add_resource(PetsHandler, '/')
+        with self.assertRaises(ValueError):
+            ns.add_resource(PetHandler, '/pet')
+
+
+class VerifyTest(AsyncTestCase):
+    def setUp(self):
+        super(VerifyTest, self).setUp()
+        self.authorizer = Authorizer(AUTHORIZATIONS)
+        self.pending = []
+
+        @self.authorizer.verifier('apikey')
+        def verify(token):
+            self.pending.append(Future())
+            return self.pending[-1]
+
+    @gen_test
+    def test_coalescing(self):
+        verifications = [self.authorizer.verify('apikey', 'secret')
+                         for _ in range(3)]
+        assert len(self.pending) == 1
+        self.pending[0].set_result('alice')
+        principals = yield verifications
+        assert principals == ['alice'] * 3
+        # Cached
+        principal = yield self.authorizer.verify('apikey', 'secret')
+        assert principal == 'alice' and len(self.pending) == 1
+
+    @gen_test
+    def test_coalescing_invalid(self):
+        verifications = [self.authorizer.verify('apikey', 'invalid')
+                         for _ in range(3)]
+        assert len(self.pending) == 1
+        self.pending[0].set_result(None)
+        principals = yield verifications
+        assert principals == [None] * 3
+        # Failed verifications are not cached
+        verification = self.authorizer.verify('apikey', 'invalid')
+        assert len(self.pending) == 2
+        self.pending[1].set_result(None)
+        principal = yield verification
+        assert principal is None
+
+
+class AuthTest(AsyncHTTPTestCase):
+    def get_app(self):
+        self.app = Application()
+        return self.app
+
+    def setUp(self):
+        super(AuthTest, self).setUp()
+        self.api = Api(self.app, authorizations=AUTHORIZATIONS,
+                       security='apikey')
+        self.verified = []
+        verified = self.verified
+
+        @self.api.verifier('apikey')
+        def verify_apikey(token):
+            verified.append(token)
+            return {'name': 'alice'} if token == 'secret' else None
+
+        @self.api.verifier('oauth2')
+        @gen.coroutine
+        def verify_bearer(token):
+            yield gen.moment
+            verified.append(token)
+            raise gen.Return({'name': 'bob', 'scopes': token.split(',')})
+
+        ns = self.api.namespace('pets')
+
+        @ns.route('/', _doc=True)
+        class PetsHandler(RequestHandler):
+            def get(self):
+                '''List pets.
+                ---
+                description: List pets
+                '''
+                self.write(self.current_user['name'])
+
+            @ns.secure()
+            def head(self):
+                '''Check pets.
+                ---
+                description: Public
+                '''
+
+        admin = Namespace('admin', security={'oauth2': ['admin']})
+
+        @admin.route('/', _doc=True)
+        class AdminHandler(RequestHandler):
+            def get(self):
+                '''Admin.
+                ---
+                description: Admin
+                '''
+                self.write(self.current_user['name'])
+
+            @admin.secure('apikey', {'oauth2': ['write']})
+            def post(self):
+                '''Write.
+                ---
+                description: Write
+                '''
+                self.write(self.current_user['name'])
+
+        self.api.add_namespace(admin)
+
+    def test_api_security(self):
+        assert self.fetch('/pets/').code == 401
+        headers = {'X-API-KEY': 'wrong'}
+        response = self.fetch('/pets/', headers=headers)
+        assert response.code == 401
+        assert json.loads(response.body.decode('utf-8')) == \
+            {'message': 'Unauthorized'}
+        headers = {'X-API-KEY': 'secret'}
+        for _ in range(3):
+            response = self.fetch('/pets/', headers=headers)
+            assert response.code == 200
+            assert response.body == b'alice'
+        # Only successful verifications are cached
+        assert self.verified == ['wrong', 'secret']
+
+    def test_public(self):
+        assert self.fetch('/pets/', method='HEAD').code == 200
+
+    def test_scopes(self):
+        response = self.fetch('/admin/',
+                              headers={'Authorization': 'Bearer read'})
+        assert response.code == 403
+        response = self.fetch('/admin/',
+                              headers={'Authorization': 'Bearer admin'})
+        assert response.body == b'bob'
+        # Namespace security replaces api security
+        response = self.fetch('/admin/', headers={'X-API-KEY': 'secret'})
+        assert response.code == 401
+
+    def test_method_security(self):
+        response = self.fetch('/admin/', method='POST', body='',
+                              headers={'X-API-KEY': 'secret'})
+        assert response.body == b'alice'
+        response = self.fetch('/admin/', method='POST', body='',
+                              headers={'Authorization': 'Bearer write'})
+        assert response.body == b'bob'
+        response = self.fetch('/admin/', method='POST', body='',
+                              headers={'Authorization': 'Bearer admin'})
+        assert response.code == 403
+
+    def test_spec(self):
+        spec = self.api.spec.to_dict()
+        assert spec['securityDefinitions'] == AUTHORIZATIONS
+        assert spec['security'] == [{'apikey': []}]
+        pets = spec['paths']['/pets']
+        assert 'security' not in pets['get']
+        assert pets['head']['security'] == []
+        admin = spec['paths']['/admin']
+        assert admin['get']['security'] == [{'oauth2': ['admin']}]
+        assert admin['post']['security'] == \
+            [{'apikey': []}, {'oauth2': ['write']}]
@@ -0,0 +1,127 @@
+import json
+
+from marshmallow import Schema, fields
+from tornado import gen
+from tornado.concurrent import Future
+from tornado.testing import AsyncHTTPTestCase
+from tornado.web import Application, RequestHandler
+
+from tornado_restplus import Api
+from tornado_restplus.events import EventStream
+
+
+class PetSchema(Schema):
+    name = fields.Str(required=True)
+
+
+class SilentFeed(object):
+    '''Async iterator which never yields an event.'''
+    def __init__(self):
+        # Kept referenced, the waiting producer is not garbage collected
+        self.future = Future()
+
+    def __aiter__(self):
+        return self
+
+    def __anext__(self):
+        return self.future
+
+
+class TickStream(EventStream):
+    keepalive = 0.01
+
+    @classmethod
+    def events(cls, topic):
+        return SilentFeed()
+
+
+class BatchTest(AsyncHTTPTestCase):
+    def get_app(self):
+        self.app = Application([(r'/other', OtherHandler)])
+        return self.app
+
+    def setUp(self):
+        super(BatchTest, self).setUp()
+        self.api = Api(self.app, prefix='/api')
+        self.api.add_batch_endpoint(max_requests=3, timeout=0.2)
+        self.api.namespace('ticks').add_resource(TickStream, '/')
+        self.pets = {'1': 'Rex'}
+        ns = self.api.namespace('pets')
+        pets = self.pets
+
+        @ns.route(r'/(?P<pet_id>\d+)')
+        class PetHandler(RequestHandler):
+            @ns.marshal_with(PetSchema)
+            @gen.coroutine
+            def get(self, pet_id):
+                yield gen.moment
+                if pet_id not in pets:
+                    self.send_error(404)
+                    return
+                raise gen.Return({'name': pets[pet_id]})
+
+        @ns.route('/')
+        class PetsHandler(RequestHandler):
+            @ns.expect(PetSchema)
+            def post(self):
+                pet_id = str(len(pets) + 1)
+                pets[pet_id] = self.payload['name']
+                self.set_status(201)
+                self.set_header('Location', '/api/pets/' + pet_id)
+
+            def get(self):
+                self.write(self.request.headers.get('X-Token', ''))
+
+    def batch(self, items, **kwargs):
+        response = self.fetch('/api/batch', method='POST',
+                              body=json.dumps(items), **kwargs)
+        return response, json.loads(response.body.decode('utf-8'))
+
+    def test_batch(self):
+        response, results = self.batch([
+            {'method': 'GET', 'path': '/api/pets/1'},
+            {'method': 'POST', 'path': '/api/pets/', 'body': {'name': 'Tom'}},
+            {'path': '/api/pets/', 'headers': {'X-Token': 'b'}},
+        ], headers={'X-Token': 'a'})
+        assert response.code == 200
+        assert results[0]['status'] == 200
+        assert results[0]['body'] == {'name': 'Rex'}
+        assert results[0]['headers']['Content-Type'] == 'application/json'
+        assert results[1]['status'] == 201
+        assert results[1]['headers']['Location'] == '/api/pets/2'
+        assert results[2]['body'] == 'b'
+        assert self.pets['2'] == 'Tom'
+
+    def test_errors(self):
+        response, results = self.batch([
+            {'path': '/api/pets/42'},
+            {'method': 'POST', 'path': '/api/pets/', 'body': {}},
+            {'method': 'DELETE', 'path': '/api/pets/1'},
+        ])
+        assert [result['status'] for result in results] == [404, 400, 405]
+
+    def test_outside_api(self):
+        response, results = self.batch([
+            {'path': '/other'}, {'path': '/api/batch'}, {'path': 'pets'},
+        ])
+        assert [result['status'] for result in results] == [404, 404, 400]
+
+    def test_timeout(self):
+        response, results = self.batch([
+            {'path': '/api/pets/1'}, {'path': '/api/ticks/'}])
+        assert [result['status'] for result in results] == [200, 504]
+        # The stream was closed, its producer is stopped
+        self.io_loop.run_sync(lambda: gen.sleep(0.05))
+        assert TickStream.hub.topics == {}
+
+    def test_invalid(self):
+        response, body = self.batch({'path': '/api/pets/1'})
+        assert response.code == 400
+        response, body = self.batch([{'path': '/api/pets/1'}] * 4)
+        assert response.code == 400
+        assert body == {'message': 'Too many sub-requests (maximum 3)'}
+
+
+class OtherHandler(RequestHandler):
+    def get(self):
+        self.write('other')
@@ -0,0 +1,111 @@
+import json
+
+from marshmallow import Schema, fields
+from tornado import gen
+from tornado.testing import AsyncHTTPTestCase
+from tornado.web import Application, HTTPError, RequestHandler
+
+from tornado_restplus import Api
+
+
+class PetSchema(Schema):
+    name = fields.Str(required=True)
+    age = fields.Int()
+
+
+class PetIdSchema(Schema):
+    id = fields.Int()
+
+
+class BulkTest(AsyncHTTPTestCase):
+    def get_app(self):
+        self.app = Application()
+        return self.app
+
+    def setUp(self):
+        super(BulkTest, self).setUp()
+        self.api = Api(self.app)
+        ns = self.api.namespace('pets')
+        self.calls = calls = []
+
+        @ns.route('/bulk', _doc=True)
+        class PetsBulk(RequestHandler):
+            @ns.bulk(PetSchema, code=201, result_schema=PetIdSchema,
+                     max_items=3, max_size=200)
+            @gen.coroutine
+            def post(self):
+                '''Create pets.'''
+                calls.append(self.payload)
+                results = []
+                for index, pet in enumerate(self.payload):
+                    if pet['name'] == 'Rex':
+                        results.append(HTTPError(409, 'Duplicate'))
+                    else:
+                        results.append({'id': index + 1, 'name': 'x'})
+                raise gen.Return(results)
+
+        @ns.route('/atomic')
+        class PetsAtomic(RequestHandler):
+            @ns.bulk(PetSchema, atomic=True)
+            def post(self):
+                calls.append(self.payload)
+
+    def post(self, path, body):
+        response = self.fetch(path, method='POST', body=body)
+        return response, json.loads(response.body.decode('utf-8'))
+
+    def test_bulk(self):
+        response, body = self.post('/pets/bulk', json.dumps(
+            [{'name': 'Tom', 'age': 2}, {'age': 'x'}, {'name': 'Rex'}]))
+        assert response.code == 207
+        assert self.calls == [[{'name': 'Tom', 'age': 2}, {'name': 'Rex'}]]
+        assert body[0] == {'status': 201, 'data': {'id': 1}}
+        assert body[1]['status'] == 400
+        assert set(body[1]['errors']) == set(['name', 'age'])
+        assert body[2] == {'status': 409, 'message': 'Duplicate'}
+
+    def test_all_succeeded(self):
+        response, body = self.post('/pets/bulk', json.dumps(
+            [{'name': 'Tom'}, {'name': 'Jerry'}]))
+        assert response.code == 201
+        assert [item['status'] for item in body] == [201, 201]
+        assert len(self.calls) == 1
+
+    def test_all_invalid(self):
+        response, body = self.post('/pets/bulk', json.dumps([{}]))
+        assert response.code == 207
+        assert body[0]['status'] == 400
+        assert self.calls == []
+
+    def test_atomic(self):
+        response, body = self.post('/pets/atomic', json.dumps(
+            [{'name': 'Tom'}, {}]))
+        assert response.code == 400
+        assert list(body['errors']) == ['1']
+        assert self.calls == []
+        response, body = self.post('/pets/atomic', json.dumps(
+            [{'name': 'Tom'}]))
+        assert response.code == 200
+        assert body == [{'status': 200}]
+
+    def test_limits(self):
+        response, body = self.post('/pets/bulk', json.dumps(
+            [{'name': 'a'}] * 4))
+        assert response.code == 413
+        assert 'items' in body['message']
+        response, body = self.post('/pets/bulk', json.dumps(
+            [{'name': 'a' * 300}]))
+        assert response.code == 413
+        response, body = self.post('/pets/bulk', json.dumps({'name': 'a'}))
+        assert response.code == 400
+        assert self.calls == []
+
+    def test_spec(self):
+        operation = self.api.spec.to_dict()['paths']['/pets/bulk']['post']
+        parameter = operation['parameters'][0]
+        assert parameter['in'] == 'body'
+        assert parameter['schema']['type'] == 'array'
+        assert parameter['schema']['maxItems'] == 3
+        assert 'name' in parameter['schema']['items']['properties']
+        assert set(operation['responses']) == set(['201', '207', '400',
+                                                   '413'])
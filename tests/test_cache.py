@@ -0,0 +1,164 @@
+import json
+from unittest import TestCase
+
+from marshmallow import Schema, fields
+from tornado import gen
+from tornado.testing import AsyncHTTPTestCase, gen_test
+from tornado.web import Application, RequestHandler
+
+from tornado_restplus import Api
+from tornado_restplus.cache import CachedResponse, MemoryCache
+
+
+class PetSchema(Schema):
+    id = fields.Int()
+    name = fields.Str()
+
+
+class MemoryCacheTest(TestCase):
+    def test_lru_eviction(self):
+        cache = MemoryCache(max_entries=2)
+        cache.set('a', CachedResponse(200, [], b'a'), 60)
+        cache.set('b', CachedResponse(200, [], b'b'), 60)
+        assert cache.get('a').body == b'a'
+        cache.set('c', CachedResponse(200, [], b'c'), 60)
+        assert cache.get('b') is None
+        assert cache.get('a').body == b'a'
+        assert cache.get('c').body == b'c'
+
+    def test_size_limit(self):
+        cache = MemoryCache(max_bytes=10)
+        cache.set('a', CachedResponse(200, [], b'x' * 6), 60)
+        cache.set('b', CachedResponse(200, [], b'x' * 6), 60)
+        assert len(cache) == 1
+        assert cache.size == 6
+        cache.set('c', CachedResponse(200, [], b'x' * 11), 60)
+        assert cache.get('c') is None
+        assert cache.get('b') is not None
+
+    def test_ttl(self):
+        cache = MemoryCache()
+        cache.set('a', CachedResponse(200, [], b'a'), -1)
+        assert cache.get('a') is None
+        assert cache.size == 0
+
+    def test_delete_prefix(self):
+        cache = MemoryCache()
+        cache.set('ns1:a', CachedResponse(200, [], b'a'), 60)
+        cache.set('ns2:a', CachedResponse(200, [], b'a'), 60)
+        cache.delete_prefix('ns1:')
+        assert cache.get('ns1:a') is None
+        assert cache.get('ns2:a') is not None
+        assert cache.size == 1
+
+
+class CacheDecoratorTest(AsyncHTTPTestCase):
+    def get_app(self):
+        self.app = Application()
+        return self.app
+
+    def setUp(self):
+        super(CacheDecoratorTest, self).setUp()
+        self.api = Api(self.app)
+        self.ns = self.api.namespace('items')
+        self.calls = []
+        calls = self.calls
+        ns = self.ns
+
+        @ns.route('/')
+        class ItemsHandler(RequestHandler):
+            @ns.cache(ttl=60)
+            @gen.coroutine
+            def get(self):
+                calls.append(self.request.uri)
+                yield gen.sleep(0.01)
+                self.set_header('X-Custom', 'custom')
+                self.write({'calls': len(calls)})
+
+        @ns.route('/pet')
+        class PetHandler(RequestHandler):
+            @ns.cache(ttl=60)
+            @ns.marshal_with(PetSchema)
+            def get(self):
+                calls.append(self.request.uri)
+                return {'id': 1, 'name': 'n'}
+
+        @ns.route('/missing')
+        class MissingHandler(RequestHandler):
+            @ns.cache(ttl=60)
+            @gen.coroutine
+            def get(self):
+                calls.append(self.request.uri)
+                yield gen.sleep(0.01)
+                self.set_status(404)
+
+    def test_cache(self):
+        response = self.fetch('/items/')
+        assert json.loads(response.body.decode('utf-8')) == {'calls': 1}
+        response = self.fetch('/items/')
+        assert response.code == 200
+        assert json.loads(response.body.decode('utf-8')) == {'calls': 1}
+        assert response.headers['X-Custom'] == 'custom'
+        assert response.headers['Content-Type'].startswith('application/json')
+        assert self.calls == ['/items/']
+
+        response = self.fetch('/items/?page=2')
+        assert json.loads(response.body.decode('utf-8')) == {'calls': 2}
+
+    def test_mask(self):
+        response = self.fetch('/items/pet', headers={'X-Fields': 'name'})
+        assert json.loads(response.body.decode('utf-8')) == {'name': 'n'}
+        response = self.fetch('/items/pet')
+        assert json.loads(response.body.decode('utf-8')) == {'id': 1,
+                                                             'name': 'n'}
+        assert 'X-Fields' in response.headers['Vary']
+        assert len(self.calls) == 2
+
+    def test_not_cacheable(self):
+        assert self.fetch('/items/missing').code == 404
+        assert self.fetch('/items/missing').code == 404
+        assert len(self.calls) == 2
+
+    @gen_test
+    def test_coalescing_not_cacheable(self):
+        responses = yield [self.http_client.fetch(
+            self.get_url('/items/missing'), raise_error=False)
+            for _ in range(3)]
+        assert [response.code for response in responses] == [404] * 3
+        assert len(self.calls) == 3
+
+    def test_invalidation(self):
+        self.fetch('/items/')
+        self.ns.invalidate_cache()
+        response = self.fetch('/items/')
+        assert json.loads(response.body.decode('utf-8')) == {'calls': 2}
+
+    @gen_test
+    def test_coalescing(self):
+        client = self.http_client
+        responses = yield [client.fetch(self.get_url('/items/'))
+                           for _ in range(5)]
+        assert self.calls == ['/items/']
+        for response in responses:
+            assert json.loads(response.body.decode('utf-8')) == {'calls': 1}
+
+    def test_credentials(self):
+        api = Api(self.app, prefix='/secure', authorizations={
+            'apikey': {'type': 'apiKey', 'in': 'header', 'name': 'X-KEY'}},
+            security='apikey')
+        api.verifier('apikey')(lambda token: token)
+        ns = api.namespace('me')
+
+        @ns.route('/')
+        class MeHandler(RequestHandler):
+            @ns.cache(ttl=60)
+            def get(self):
+                self.write({'me': self.current_user})
+
+        for user in ('alice', 'bob'):
+            response = self.fetch('/secure/me/', headers={'X-KEY': user})
+            assert json.loads(response.body.decode('utf-8')) == {'me': user}
+        # Public resources are not cached for requests with cookies either
+        self.fetch('/items/', headers={'Cookie': 'session=alice'})
+        self.fetch('/items/', headers={'Cookie': 'session=bob'})
+        assert self.calls == ['/items/', '/items/']
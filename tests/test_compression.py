@@ -0,0 +1,112 @@
+import gzip
+from unittest import TestCase
+
+import pytest
+from tornado.testing import AsyncHTTPTestCase
+from tornado.web import Application, RequestHandler
+
+from tornado_restplus import Api, Namespace
+from tornado_restplus.compression import Compression, brotli, compressible
+
+BODY = b'{"items":[' + b','.join([b'"item"'] * 500) + b']}'
+
+
+class CompressionTest(TestCase):
+    def test_compressible(self):
+        assert compressible('application/json; charset=UTF-8')
+        assert compressible('text/csv')
+        assert compressible('application/vnd.pets+json')
+        assert not compressible('image/png')
+        assert not compressible('')
+
+    def test_levels(self):
+        compression = Compression(algorithms=['gzip'], level=11)
+        assert compression.algorithms == ['gzip']
+        assert compression.levels['gzip'] == 9
+
+    def test_unknown(self):
+        with pytest.raises(ValueError):
+            Compression(algorithms=['lzma'])
+
+
+class CompressionHandlersTest(AsyncHTTPTestCase):
+    def get_app(self):
+        self.app = Application()
+        return self.app
+
+    def setUp(self):
+        super(CompressionHandlersTest, self).setUp()
+        self.api = Api(self.app)
+        self.calls = []
+        ns = Namespace('ns', compression=Compression(min_size=100))
+        calls = self.calls
+
+        @ns.route('/large')
+        class LargeHandler(RequestHandler):
+            def get(self):
+                self.set_header('Content-Type', 'application/json')
+                self.write(BODY)
+
+        @ns.route('/small')
+        class SmallHandler(RequestHandler):
+            def get(self):
+                self.write({'small': True})
+
+        @ns.route('/cached')
+        class CachedHandler(RequestHandler):
+            @ns.cache(60)
+            def get(self):
+                calls.append(1)
+                self.set_header('Content-Type', 'application/json')
+                self.write(BODY)
+
+        plain = self.api.namespace('plain')
+
+        @plain.route('/large')
+        class PlainHandler(LargeHandler):
+            pass
+
+        self.api.add_namespace(ns)
+
+    def get(self, url, encoding):
+        return self.fetch(url, headers={'Accept-Encoding': encoding},
+                          decompress_response=False)
+
+    def test_gzip(self):
+        response = self.get('/ns/large', 'gzip, deflate')
+        assert response.headers['Content-Encoding'] == 'gzip'
+        assert response.headers['Vary'] == 'Accept-Encoding'
+        assert gzip.decompress(response.body) == BODY
+
+    @pytest.mark.skipif(brotli is None, reason='brotli is not installed')
+    def test_brotli(self):
+        response = self.get('/ns/large', 'gzip, br')
+        assert response.headers['Content-Encoding'] == 'br'
+        assert brotli.decompress(response.body) == BODY
+
+    def test_identity(self):
+        response = self.get('/ns/large', 'identity')
+        assert 'Content-Encoding' not in response.headers
+        assert response.body == BODY
+
+    def test_min_size(self):
+        response = self.get('/ns/small', 'gzip')
+        assert 'Content-Encoding' not in response.headers
+        assert response.body == b'{"small": true}'
+
+    def test_other_namespace(self):
+        response = self.get('/plain/large', 'gzip')
+        assert 'Content-Encoding' not in response.headers
+
+    def test_cached_compressed(self):
+        for _ in range(2):
+            response = self.get('/ns/cached', 'gzip')
+            assert response.headers['Content-Encoding'] == 'gzip'
+            assert gzip.decompress(response.body) == BODY
+        response = self.get('/ns/cached', 'identity')
+        assert response.body == BODY
+        assert len(self.calls) == 2
+        backend = self.api.namespaces[-1].cache_backend
+        stored = backend.get('ns:/ns/cached application/json gzip')
+        assert ('Content-Encoding', 'gzip') in stored.headers
+        assert gzip.decompress(stored.body) == BODY
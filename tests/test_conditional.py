@@ -0,0 +1,108 @@
+import datetime
+import json
+from unittest import TestCase
+
+from marshmallow import Schema, fields
+from tornado import gen
+from tornado.testing import AsyncHTTPTestCase
+from tornado.web import Application, RequestHandler
+
+from tornado_restplus import Api
+from tornado_restplus.conditional import to_datetime
+
+UPDATED = datetime.datetime(2020, 1, 2, 3, 4, 5)
+
+
+class PetSchema(Schema):
+    name = fields.Str()
+
+
+class ToDatetimeTest(TestCase):
+    def test_timestamp(self):
+        assert to_datetime(1577934245.5) == UPDATED
+
+    def test_aware(self):
+        class Offset(datetime.tzinfo):
+            def utcoffset(self, dt):
+                return datetime.timedelta(hours=2)
+
+        value = datetime.datetime(2020, 1, 2, 5, 4, 5, 42, tzinfo=Offset())
+        assert to_datetime(value) == UPDATED
+
+
+class ConditionalTest(AsyncHTTPTestCase):
+    def get_app(self):
+        self.app = Application()
+        return self.app
+
+    def setUp(self):
+        super(ConditionalTest, self).setUp()
+        self.api = Api(self.app)
+        self.calls = []
+        self.versions = {'rex': 3}
+        ns = self.api.namespace('pets')
+        calls = self.calls
+        versions = self.versions
+
+        @gen.coroutine
+        def version(handler, name):
+            raise gen.Return(versions[name])
+
+        @ns.route(r'/(?P<name>[a-z]+)', _doc=True)
+        class PetHandler(RequestHandler):
+            @ns.conditional(etag=version)
+            @ns.marshal_with(PetSchema)
+            def get(self, name):
+                '''Get pet.
+                ---
+                description: Get pet
+                '''
+                calls.append(name)
+                return {'name': name}
+
+        @ns.route(r'/updated/(?P<name>[a-z]+)')
+        class UpdatedHandler(RequestHandler):
+            @ns.conditional(last_modified=lambda handler, name: UPDATED)
+            def get(self, name):
+                calls.append(name)
+                self.write(name)
+
+    def test_etag(self):
+        response = self.fetch('/pets/rex')
+        assert response.code == 200
+        assert response.headers['Etag'] == '"3"'
+        assert json.loads(response.body.decode('utf-8')) == {'name': 'rex'}
+
+        response = self.fetch('/pets/rex', headers={'If-None-Match': '"3"'})
+        assert response.code == 304
+        assert response.headers['Etag'] == '"3"'
+        assert response.body == b''
+        assert self.calls == ['rex']
+
+        self.versions['rex'] = 4
+        response = self.fetch('/pets/rex', headers={'If-None-Match': '"3"'})
+        assert response.code == 200
+        assert response.headers['Etag'] == '"4"'
+        assert self.calls == ['rex', 'rex']
+
+    def test_last_modified(self):
+        response = self.fetch('/pets/updated/rex')
+        assert response.code == 200
+        last_modified = response.headers['Last-Modified']
+        assert last_modified == 'Thu, 02 Jan 2020 03:04:05 GMT'
+
+        response = self.fetch('/pets/updated/rex',
+                              headers={'If-Modified-Since': last_modified})
+        assert response.code == 304
+        assert self.calls == ['rex']
+
+        response = self.fetch('/pets/updated/rex', headers={
+            'If-Modified-Since': 'Thu, 02 Jan 2020 03:04:04 GMT'})
+        assert response.code == 200
+        assert self.calls == ['rex', 'rex']
+
+    def test_spec(self):
+        operation = self.api.spec.to_dict()['paths']['/pets/{name}']['get']
+        assert operation['responses']['304'] == {'description': 'Not Modified'}
+        names = [param['name'] for param in operation['parameters']]
+        assert 'If-None-Match' in names
@@ -0,0 +1,157 @@
+import json
+from unittest import TestCase
+
+from marshmallow import Schema, fields
+from tornado import gen
+from tornado.queues import Queue
+from tornado.testing import AsyncHTTPTestCase, AsyncTestCase, gen_test
+from tornado.web import Application
+
+from tornado_restplus import Api
+from tornado_restplus.events import (COALESCE, Event, EventStream, Hub,
+                                     Subscriber, Topic, format_event)
+
+
+class PriceSchema(Schema):
+    price = fields.Int()
+
+
+class QueueFeed(object):
+    '''Async iterator of items put to a queue, None ends it.'''
+    def __init__(self):
+        self.queue = Queue()
+
+    def __aiter__(self):
+        return self
+
+    @gen.coroutine
+    def __anext__(self):
+        item = yield self.queue.get()
+        if item is None:
+            raise StopAsyncIteration()
+        raise gen.Return(item)
+
+
+class SubscriberTest(TestCase):
+    def test_format(self):
+        assert format_event('a\nb', event='price', id=1) == \
+            b'event: price\nid: 1\ndata: a\ndata: b\n\n'
+
+    def test_drop(self):
+        subscriber = Subscriber(max_buffer=2)
+        subscriber.put(None, b'1')
+        subscriber.put(None, b'2')
+        assert not subscriber.closed
+        subscriber.put(None, b'3')
+        assert subscriber.dropped and subscriber.closed
+        assert list(subscriber.buffer) == [b'1', b'2']
+
+    def test_coalesce(self):
+        subscriber = Subscriber(max_buffer=2, overflow=COALESCE)
+        subscriber.put('a', b'a1')
+        subscriber.put('b', b'b1')
+        subscriber.put('a', b'a2')
+        assert list(subscriber.buffer.values()) == [b'b1', b'a2']
+        subscriber.put(None, b'x')
+        assert list(subscriber.buffer.values()) == [b'a2', b'x']
+        assert subscriber.coalesced == 2
+        assert not subscriber.closed
+
+    def test_unknown_overflow(self):
+        with self.assertRaises(ValueError):
+            Subscriber(overflow='block')
+
+
+class HubTest(AsyncTestCase):
+    @gen_test
+    def test_producer_per_topic(self):
+        hub = Hub()
+        feed = QueueFeed()
+        topics = []
+
+        def factory():
+            topics.append(Topic(feed, lambda data: data))
+            return topics[-1]
+
+        first, second = Subscriber(), Subscriber()
+        hub.subscribe('key', factory, first)
+        hub.subscribe('key', factory, second)
+        assert len(topics) == 1
+        yield feed.queue.put(Event('1', event='tick'))
+        chunks = yield first.get()
+        assert chunks == [b'event: tick\ndata: 1\n\n']
+        chunks = yield second.get()
+        assert chunks == [b'event: tick\ndata: 1\n\n']
+
+        hub.unsubscribe('key', first)
+        assert not topics[0].closed
+        hub.unsubscribe('key', second)
+        assert topics[0].closed
+        assert hub.topics == {}
+
+
+class PriceStream(EventStream):
+    '''Prices of a symbol'''
+    event_schema = PriceSchema
+    keepalive = 0.05
+    feeds = {}
+
+    @classmethod
+    def events(cls, topic):
+        feed = cls.feeds[topic] = QueueFeed()
+        return feed
+
+
+class EventStreamTest(AsyncHTTPTestCase):
+    def get_app(self):
+        self.app = Application()
+        return self.app
+
+    def setUp(self):
+        super(EventStreamTest, self).setUp()
+        self.api = Api(self.app)
+        ns = self.api.namespace('stream')
+        ns.definition('Price', schema=PriceSchema)
+        ns.add_resource(PriceStream, r'/prices/(?P<symbol>[A-Z]+)', _doc=True)
+
+    @gen.coroutine
+    def subscribe(self, path, count):
+        chunks = []
+        future = self.http_client.fetch(
+            self.get_url(path), streaming_callback=chunks.append)
+        while sum(len(topic.subscribers)
+                  for topic in PriceStream.hub.topics.values()) < count:
+            yield gen.sleep(0.01)
+        raise gen.Return((future, chunks))
+
+    @gen_test
+    def test_stream(self):
+        first, first_chunks = yield self.subscribe('/stream/prices/ABC', 1)
+        second, second_chunks = yield self.subscribe('/stream/prices/ABC', 2)
+        assert list(PriceStream.feeds) == [(('symbol', 'ABC'), )]
+        feed = PriceStream.feeds[(('symbol', 'ABC'), )]
+        yield gen.sleep(0.1)
+        yield feed.queue.put(Event({'price': 1, 'secret': 'x'},
+                                   event='price', id=1))
+        yield feed.queue.put({'price': 2})
+        yield feed.queue.put(None)
+
+        for future, chunks in ((first, first_chunks),
+                               (second, second_chunks)):
+            response = yield future
+            assert response.headers['Content-Type'] == 'text/event-stream'
+            body = b''.join(chunks).decode('utf-8')
+            assert ': keep-alive\n\n' in body
+            events = [part for part in body.split('\n\n')
+                      if part.startswith(('event', 'data'))]
+            assert events[0].split('\n')[:2] == ['event: price', 'id: 1']
+            assert json.loads(events[0].split('data: ')[1]) == {'price': 1}
+            assert json.loads(events[1][len('data: '):]) == {'price': 2}
+        assert PriceStream.hub.topics == {}
+
+    def test_spec(self):
+        operation = self.api.spec.to_dict()['paths'][
+            '/stream/prices/{symbol}']['get']
+        assert operation['produces'] == ['text/event-stream']
+        assert operation['responses']['200']['schema'] == {
+            '$ref': '#/definitions/Price'}
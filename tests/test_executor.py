@@ -0,0 +1,144 @@
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from unittest import TestCase
+
+from marshmallow import Schema, fields
+from tornado import gen
+from tornado.testing import AsyncHTTPTestCase, gen_test
+from tornado.web import Application, RequestHandler
+
+from tornado_restplus import Api, Namespace
+from tornado_restplus.executor import (BoundedExecutor, QueueFull,
+                                       run_in_executor)
+
+
+class ThreadSchema(Schema):
+    thread = fields.Str()
+
+
+class BoundedExecutorTest(TestCase):
+    def test_queue_depth(self):
+        executor = BoundedExecutor(max_workers=1, max_queue=1)
+        event = threading.Event()
+        first = executor.submit(event.wait)
+        second = executor.submit(event.wait)
+        assert executor.pending == 2
+        assert executor.queued == 1
+        with self.assertRaises(QueueFull):
+            executor.submit(event.wait)
+        event.set()
+        first.result()
+        second.result()
+        executor.shutdown()
+        assert executor.stats() == {'max_workers': 1, 'max_queue': 1,
+                                    'pending': 0, 'queued': 0}
+
+    def test_process_pool_decorator(self):
+        executor = BoundedExecutor(executor_class=ProcessPoolExecutor)
+        with self.assertRaises(TypeError):
+            run_in_executor(executor)
+        executor.shutdown()
+
+
+class RunInExecutorTest(AsyncHTTPTestCase):
+    def get_app(self):
+        self.app = Application()
+        return self.app
+
+    def setUp(self):
+        super(RunInExecutorTest, self).setUp()
+        self.api = Api(self.app)
+
+    def test_decorator(self):
+        ns = self.api.namespace('ns')
+
+        @ns.route('/')
+        class BlockingHandler(RequestHandler):
+            @ns.marshal_with(ThreadSchema)
+            @ns.run_in_executor()
+            def get(self):
+                return {'thread': threading.current_thread().name}
+
+        response = self.fetch('/ns/')
+        assert response.code == 200
+        assert threading.current_thread().name.encode('utf-8') \
+            not in response.body
+
+    def test_namespace_executor(self):
+        executor = BoundedExecutor(max_workers=2)
+        ns = Namespace('ns', executor=executor)
+        main_thread = threading.current_thread().name
+
+        @ns.route('/')
+        class BlockingHandler(RequestHandler):
+            @ns.marshal_with(ThreadSchema)
+            @ns.run_in_executor()
+            def get(self):
+                time.sleep(0.01)
+                return {'thread': threading.current_thread().name}
+
+            def post(self):
+                # Unmarked methods are left on the IOLoop
+                self.respond()
+
+            def respond(self):
+                self.finish(threading.current_thread().name)
+
+        self.api.add_namespace(ns)
+        response = self.fetch('/ns/')
+        assert main_thread.encode('utf-8') not in response.body
+        assert executor.pending == 0
+        response = self.fetch('/ns/', method='POST', body='')
+        assert response.body.decode('utf-8') == main_thread
+
+    @gen_test
+    def test_queue_full(self):
+        executor = BoundedExecutor(max_workers=1, max_queue=0)
+        ns = self.api.namespace('ns')
+        event = threading.Event()
+
+        @ns.route('/')
+        class BlockingHandler(RequestHandler):
+            @ns.run_in_executor(executor)
+            def get(self):
+                event.wait()
+
+        first = self.http_client.fetch(self.get_url('/ns/'))
+        yield gen.sleep(0.05)
+        response = yield self.http_client.fetch(self.get_url('/ns/'),
+                                                raise_error=False)
+        assert response.code == 503
+        event.set()
+        response = yield first
+        assert response.code == 200
+
+
+class NamespaceDecoratorsTest(AsyncHTTPTestCase):
+    def get_app(self):
+        self.app = Application()
+        return self.app
+
+    def test_decorators(self):
+        def header(value):
+            def decorator(method):
+                def wrapper(self, *args, **kwargs):
+                    self.add_header('X-Decorator', value)
+                    return method(self, *args, **kwargs)
+                return wrapper
+            return decorator
+
+        api = Api(self.app)
+        ns = Namespace('ns', decorators=[header('inner'), header('outer')])
+
+        @ns.route('/')
+        class SomeHandler(RequestHandler):
+            def get(self):
+                self.write('ok')
+
+        api.add_namespace(ns)
+        response = self.fetch('/ns/')
+        assert response.body == b'ok'
+        assert response.headers.get_list('X-Decorator') == ['outer', 'inner']
+        # Original class is not modified
+        assert SomeHandler.__dict__['get'].__name__ == 'get'
@@ -0,0 +1,106 @@
+import json
+
+import pytest
+from tornado.testing import AsyncHTTPTestCase
+from tornado.web import Application, RequestHandler
+
+from tornado_restplus import Api, Namespace
+
+ns = Namespace('pets', limits=[])
+
+
+@ns.route(r'/(?P<pet_id>\d+)', _doc=True, greeting='Hello')
+class PetHandler(RequestHandler):
+    def initialize(self, greeting):
+        self.greeting = greeting
+
+    def get(self, pet_id):
+        '''Get pet.
+        ---
+        description: Get pet
+        '''
+        self.write('{0} {1} from {2}'.format(self.greeting, pet_id,
+                                             self.namespace.name))
+
+
+class PingHandler(RequestHandler):
+    def get(self):
+        self.write('pong')
+
+
+def build_api(**kwargs):
+    api = Api(Application(), prefix='/api', **kwargs)
+    api.add_namespace(ns, path='/animals')
+    return api
+
+
+class ExportTest(AsyncHTTPTestCase):
+    def get_app(self):
+        self.app = Application()
+        return self.app
+
+    def exported(self, **kwargs):
+        # Artifacts are saved as JSON
+        return json.loads(json.dumps(build_api(**kwargs).export_routes()))
+
+    def test_export(self):
+        data = self.exported()
+        assert data['prefix'] == '/api'
+        assert data['namespaces'] == [
+            {'name': 'pets', 'import': 'tests.test_export:ns',
+             'path': '/animals'}]
+        assert data['routes'] == [{
+            'url': r'/api/animals/(?P<pet_id>\d+)',
+            'handler': 'tests.test_export:PetHandler',
+            'namespace': 0,
+            'kwargs': {'greeting': 'Hello'},
+        }]
+        assert '/api/animals/{pet_id}' in data['spec']['paths']
+
+    def test_load(self):
+        data = self.exported()
+        api = Api(self.app, prefix='/api')
+        api.load_routes(data)
+        response = self.fetch('/api/animals/1')
+        assert response.body == b'Hello 1 from pets'
+        assert api.spec.to_dict()['paths'] == data['spec']['paths']
+        # The namespace is registered already
+        api.add_namespace(ns)
+        assert len(api.routes) == 2
+
+    def test_load_namespace_routing(self):
+        data = self.exported(routing='namespace')
+        api = Api(self.app, prefix='/api', routing='namespace')
+        api.load_routes(data, namespaces=[ns])
+        assert self.fetch('/api/animals/2').body == b'Hello 2 from pets'
+
+    def test_prefix_mismatch(self):
+        data = self.exported()
+        with pytest.raises(ValueError):
+            Api(self.app, prefix='/v2').load_routes(data)
+
+    def test_not_importable(self):
+        api = Api(self.app)
+        local = api.namespace('local')
+
+        @local.route('/')
+        class LocalHandler(RequestHandler):
+            pass
+
+        with pytest.raises(ValueError):
+            api.export_routes()
+
+    def test_default_namespace(self):
+        api = Api(Application(), prefix='/api')
+        api.default_namespace.add_resource(PingHandler, '/ping')
+        data = json.loads(json.dumps(api.export_routes()))
+        assert data['namespaces'][0]['import'] is None
+        api = Api(self.app, prefix='/api')
+        api.load_routes(data)
+        assert self.fetch('/api/default/ping').body == b'pong'
+
+    def test_not_module_level(self):
+        api = Api(self.app)
+        api.namespace('jobs').job('/report')(lambda payload: payload)
+        with pytest.raises(ValueError):
+            api.export_routes()
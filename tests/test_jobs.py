@@ -0,0 +1,148 @@
+import json
+import time
+from unittest import TestCase
+
+import pytest
+from marshmallow import Schema, fields
+from tornado import gen
+from tornado.locks import Event
+from tornado.testing import AsyncHTTPTestCase, gen_test
+from tornado.web import Application
+
+from tornado_restplus import Api
+from tornado_restplus.executor import BoundedExecutor, QueueFull
+from tornado_restplus.jobs import FAILED, PENDING, SUCCEEDED, JobStore
+
+
+class ReportRequestSchema(Schema):
+    size = fields.Int(required=True)
+
+
+class ReportSchema(Schema):
+    total = fields.Int()
+
+
+class JobStoreTest(TestCase):
+    def test_bounded(self):
+        store = JobStore(max_jobs=2)
+        first = store.create()
+        second = store.create()
+        with pytest.raises(QueueFull):
+            store.create()
+        store.finish(first, result=1)
+        third = store.create()
+        assert store.get(first.id) is None
+        assert store.get(second.id).status == PENDING
+        assert len(store) == 2
+        assert third.id != second.id
+
+    def test_ttl(self):
+        store = JobStore(ttl=0.01)
+        job = store.create()
+        store.finish(job, error='boom')
+        assert store.get(job.id).status == FAILED
+        time.sleep(0.02)
+        assert store.get(job.id) is None
+
+
+class JobsTest(AsyncHTTPTestCase):
+    def get_app(self):
+        self.app = Application()
+        return self.app
+
+    def setUp(self):
+        super(JobsTest, self).setUp()
+        self.api = Api(self.app)
+        self.event = Event()
+        self.store = JobStore()
+        ns = self.api.namespace('reports')
+        event = self.event
+
+        @ns.job('/sync', schema=ReportRequestSchema,
+                result_schema=ReportSchema,
+                executor=BoundedExecutor(max_workers=1, max_queue=0))
+        def sync_report(payload):
+            '''Build a report.'''
+            time.sleep(0.05)
+            if payload['size'] < 0:
+                raise ValueError('Negative size')
+            return {'total': payload['size'] * 2, 'secret': 'x'}
+
+        @ns.job('/async', store=self.store)
+        @gen.coroutine
+        def async_report(payload):
+            yield event.wait()
+            raise gen.Return(payload)
+
+    @gen.coroutine
+    def request(self, path, method='GET', body=None):
+        response = yield self.http_client.fetch(
+            self.get_url(path), method=method, raise_error=False,
+            body=json.dumps(body) if body is not None else None)
+        raise gen.Return((response, json.loads(response.body.decode('utf-8'))
+                          if response.body else None))
+
+    @gen.coroutine
+    def wait(self, status_url):
+        for _ in range(100):
+            response, body = yield self.request(status_url)
+            if body['status'] != PENDING:
+                raise gen.Return(body)
+            yield gen.sleep(0.01)
+
+    @gen_test
+    def test_sync_job(self):
+        response, body = yield self.request('/reports/sync', 'POST',
+                                            {'size': 21})
+        assert response.code == 202
+        assert body['status'] == PENDING
+        assert response.headers['Location'] == body['status_url']
+        assert body['status_url'] == '/reports/sync/' + body['id']
+        # The executor is busy with the first job and has no queue
+        response, _ = yield self.request('/reports/sync', 'POST',
+                                         {'size': 1})
+        assert response.code == 503
+        body = yield self.wait(body['status_url'])
+        assert body == {'id': body['id'], 'status': SUCCEEDED,
+                        'result': {'total': 42}}
+
+    @gen_test
+    def test_failed_job(self):
+        response, body = yield self.request('/reports/sync', 'POST',
+                                            {'size': -1})
+        body = yield self.wait(body['status_url'])
+        assert body['status'] == FAILED
+        assert body['error'] == 'Negative size'
+
+    @gen_test
+    def test_invalid_payload(self):
+        response, body = yield self.request('/reports/sync', 'POST', {})
+        assert response.code == 400
+        assert 'size' in body['errors']
+
+    @gen_test
+    def test_coroutine_job(self):
+        response, body = yield self.request('/reports/async', 'POST',
+                                            {'a': 1})
+        assert response.code == 202
+        assert len(self.store) == 1
+        response, status = yield self.request(body['status_url'])
+        assert status['status'] == PENDING
+        self.event.set()
+        status = yield self.wait(body['status_url'])
+        assert status['result'] == {'a': 1}
+
+    @gen_test
+    def test_unknown_job(self):
+        response, body = yield self.request('/reports/async/' + '0' * 32)
+        assert response.code == 404
+
+    def test_spec(self):
+        paths = self.api.spec.to_dict()['paths']
+        submit = paths['/reports/sync']['post']
+        assert submit['summary'] == 'Build a report.'
+        assert submit['responses']['202']['schema']['properties'][
+            'status'] == {'type': 'string'}
+        status = paths['/reports/sync/{job_id}']['get']
+        assert set(status['responses']) == set(['200', '404'])
+        assert 'post' in paths['/reports/async']
@@ -0,0 +1,107 @@
+import json
+from unittest import TestCase
+
+from tornado import gen
+from tornado.locks import Event
+from tornado.testing import AsyncHTTPTestCase, gen_test
+from tornado.web import Application, RequestHandler
+
+from tornado_restplus import Api, Namespace
+from tornado_restplus.limits import (ConcurrencyLimit, MemoryRateLimitBackend,
+                                     RateLimit)
+
+
+class MemoryRateLimitBackendTest(TestCase):
+    def test_token_bucket(self):
+        backend = MemoryRateLimitBackend()
+        assert backend.consume('a', 1, 2) is None
+        assert backend.consume('a', 1, 2) is None
+        wait = backend.consume('a', 1, 2)
+        assert 0 < wait <= 1
+        assert backend.consume('b', 1, 2) is None
+
+    def test_max_keys(self):
+        backend = MemoryRateLimitBackend(max_keys=2)
+        for key in 'abc':
+            backend.consume(key, 1, 1)
+        assert len(backend) == 2
+        # Evicted bucket starts full
+        assert backend.consume('a', 1, 1) is None
+
+
+class LimitsTest(AsyncHTTPTestCase):
+    def get_app(self):
+        self.app = Application()
+        return self.app
+
+    def setUp(self):
+        super(LimitsTest, self).setUp()
+        self.api = Api(self.app)
+
+    def test_rate_limit(self):
+        ns = self.api.namespace('ns')
+        calls = []
+
+        @ns.route('/')
+        class SomeHandler(RequestHandler):
+            @ns.limit(RateLimit(0.1, burst=2))
+            def get(self):
+                calls.append(1)
+                self.write('ok')
+
+        assert self.fetch('/ns/').code == 200
+        assert self.fetch('/ns/').code == 200
+        response = self.fetch('/ns/')
+        assert response.code == 429
+        assert int(response.headers['Retry-After']) > 0
+        body = json.loads(response.body.decode('utf-8'))
+        assert body == {'message': 'Too Many Requests'}
+        assert len(calls) == 2
+
+    def test_custom_key(self):
+        ns = self.api.namespace('ns')
+
+        def api_key(handler):
+            return handler.request.headers.get('X-Api-Key')
+
+        @ns.route('/')
+        class SomeHandler(RequestHandler):
+            @ns.limit(RateLimit(0.1, burst=1, key=api_key))
+            def get(self):
+                self.write('ok')
+
+        assert self.fetch('/ns/', headers={'X-Api-Key': 'a'}).code == 200
+        assert self.fetch('/ns/', headers={'X-Api-Key': 'a'}).code == 429
+        assert self.fetch('/ns/', headers={'X-Api-Key': 'b'}).code == 200
+
+    @gen_test
+    def test_namespace_concurrency_limit(self):
+        limit = ConcurrencyLimit(1)
+        ns = Namespace('ns', limits=[limit])
+        event = Event()
+
+        @ns.route('/slow')
+        class SlowHandler(RequestHandler):
+            @gen.coroutine
+            def get(self):
+                yield event.wait()
+                self.write('slow')
+
+        @ns.route('/fast')
+        class FastHandler(RequestHandler):
+            def get(self):
+                self.write('fast')
+
+        self.api.add_namespace(ns)
+        slow = self.http_client.fetch(self.get_url('/ns/slow'))
+        yield gen.sleep(0.05)
+        assert limit.inflight == {None: 1}
+        response = yield self.http_client.fetch(self.get_url('/ns/fast'),
+                                                raise_error=False)
+        assert response.code == 503
+        event.set()
+        response = yield slow
+        assert response.body == b'slow'
+        assert limit.inflight == {}
+        response = yield self.http_client.fetch(self.get_url('/ns/fast'))
+        assert response.body == b'fast'
@@ -0,0 +1,252 @@
+import json
+import sys
+from unittest import skipIf
+
+from marshmallow import Schema, fields
+from tornado import gen
+from tornado.testing import AsyncHTTPTestCase
+from tornado.web import Application, RequestHandler
+
+from tornado_restplus import Api
+from tornado_restplus.marshalling import get_schema
+from tornado_restplus.representations import JSON_ENCODERS, stdlib_json
+
+
+class PetSchema(Schema):
+    name = fields.Str(required=True)
+    age = fields.Int()
+
+
+class ExpectTest(AsyncHTTPTestCase):
+    def get_app(self):
+        self.app = Application()
+        return self.app
+
+    def setUp(self):
+        super(ExpectTest, self).setUp()
+        self.api = Api(self.app)
+        self.ns = self.api.namespace('pets')
+
+    def post(self, url, body):
+        if not isinstance(body, bytes):
+            body = json.dumps(body).encode('utf-8')
+        response = self.fetch(url, method='POST', body=body)
+        return response, json.loads(response.body.decode('utf-8'))
+
+    def test_expect(self):
+        @self.ns.route('/')
+        class PetsHandler(RequestHandler):
+            @self.ns.expect(PetSchema)
+            def post(self):
+                self.write(self.payload)
+
+        response, body = self.post('/pets/', {'name': 'Rex', 'age': 3})
+        assert response.code == 200
+        assert body == {'name': 'Rex', 'age': 3}
+
+    def test_validation_error(self):
+        @self.ns.route('/')
+        class PetsHandler(RequestHandler):
+            @self.ns.expect(PetSchema)
+            def post(self):
+                raise AssertionError('Handler should not be called')
+
+        response, body = self.post('/pets/', {'age': 'three'})
+        assert response.code == 400
+        assert body['message'] == 'Input payload validation failed'
+        assert set(body['errors']) == {'name', 'age'}
+
+    def test_invalid_json(self):
+        @self.ns.route('/')
+        class PetsHandler(RequestHandler):
+            @self.ns.expect(PetSchema)
+            def post(self):
+                raise AssertionError('Handler should not be called')
+
+        response, body = self.post('/pets/', b'{"name": ')
+        assert response.code == 400
+        assert body['message'] == 'Failed to decode JSON object'
+
+    def test_many(self):
+        @self.ns.route('/many')
+        class PetsHandler(RequestHandler):
+            @self.api.expect(PetSchema, many=True)
+            def post(self):
+                self.write({'count': len(self.payload)})
+
+        response, body = self.post('/pets/many', [{'name': 'Rex'},
+                                                  {'name': 'Tom'}])
+        assert response.code == 200
+        assert body == {'count': 2}
+
+    def test_namespace_validate(self):
+        ns = self.api.namespace('lenient', validate=False)
+
+        @ns.route('/')
+        class PetsHandler(RequestHandler):
+            @ns.expect(PetSchema)
+            def post(self):
+                self.write({'valid': 'name' in self.payload})
+
+        response, body = self.post('/lenient/', {'age': 3})
+        assert response.code == 200
+        assert body == {'valid': False}
+
+    def test_schema_cache(self):
+        assert get_schema(PetSchema) is get_schema(PetSchema)
+        assert get_schema(PetSchema, many=True) is not get_schema(PetSchema)
+        assert get_schema(PetSchema, many=True).many
+        schema = PetSchema()
+        assert get_schema(schema) is schema
+
+
+class MarshalWithTest(AsyncHTTPTestCase):
+    def get_app(self):
+        self.app = Application()
+        return self.app
+
+    def setUp(self):
+        super(MarshalWithTest, self).setUp()
+        self.api = Api(self.app)
+        self.ns = self.api.namespace('pets')
+
+    def test_marshal_with(self):
+        @self.ns.route('/')
+        class PetHandler(RequestHandler):
+            @self.ns.marshal_with(PetSchema, code=201)
+            def get(self):
+                return {'name': 'Rex', 'age': 3, 'secret': 'x'}
+
+        response = self.fetch('/pets/')
+        assert response.code == 201
+        assert response.headers['Content-Type'] == 'application/json'
+        body = json.loads(response.body.decode('utf-8'))
+        assert body == {'name': 'Rex', 'age': 3}
+
+    def test_coroutine(self):
+        @self.ns.route('/')
+        class PetsHandler(RequestHandler):
+            @self.api.marshal_with(PetSchema, many=True)
+            @gen.coroutine
+            def get(self):
+                yield gen.moment
+                raise gen.Return([{'name': 'Rex'}, {'name': 'Tom'}])
+
+        response = self.fetch('/pets/')
+        assert response.code == 200
+        body = json.loads(response.body.decode('utf-8'))
+        assert body == [{'name': 'Rex'}, {'name': 'Tom'}]
+
+    def test_finished_by_handler(self):
+        @self.ns.route('/')
+        class PetHandler(RequestHandler):
+            @self.ns.marshal_with(PetSchema)
+            def get(self):
+                self.set_status(404)
+                self.finish('missing')
+
+        response = self.fetch('/pets/')
+        assert response.code == 404
+        assert response.body == b'missing'
+
+    def test_custom_representation(self):
+        api = Api(self.app, prefix='/custom',
+                  default_mediatype='application/vnd.pets+json')
+
+        @api.representation('application/vnd.pets+json')
+        def output_pets(data):
+            return stdlib_json(data) + b'\n'
+
+        ns = api.namespace('pets')
+
+        @ns.route('/')
+        class PetHandler(RequestHandler):
+            @api.marshal_with(PetSchema)
+            def get(self):
+                return {'name': 'Rex'}
+
+        response = self.fetch('/custom/pets/')
+        assert response.headers['Content-Type'] == \
+            'application/vnd.pets+json'
+        assert response.body == b'{"name":"Rex"}\n'
+
+    def test_json_encoders(self):
+        data = {'name': u'R\xe9x', 'tags': [1, 2.5, None, True]}
+        for name, encoder in JSON_ENCODERS.items():
+            assert json.loads(encoder(data).decode('utf-8')) == data, name
+
+
+class AsyncItems(object):
+    def __init__(self, count):
+        self.count = count
+
+    def __aiter__(self):
+        return self
+
+    @gen.coroutine
+    def __anext__(self):
+        yield gen.moment
+        if not self.count:
+            raise StopAsyncIteration()
+        self.count -= 1
+        raise gen.Return({'name': 'pet{0}'.format(self.count)})
+
+
+class MarshalStreamTest(AsyncHTTPTestCase):
+    def get_app(self):
+        self.app = Application()
+        return self.app
+
+    def setUp(self):
+        super(MarshalStreamTest, self).setUp()
+        self.api = Api(self.app)
+        self.ns = self.api.namespace('pets')
+
+    def test_json_array(self):
+        @self.ns.route('/')
+        class PetsHandler(RequestHandler):
+            @self.ns.marshal_stream(PetSchema, chunk_size=10)
+            def get(self):
+                return ({'name': 'pet{0}'.format(i), 'secret': i}
+                        for i in range(25))
+
+        response = self.fetch('/pets/')
+        assert response.code == 200
+        body = json.loads(response.body.decode('utf-8'))
+        assert body == [{'name': 'pet{0}'.format(i)} for i in range(25)]
+
+    def test_empty(self):
+        @self.ns.route('/')
+        class PetsHandler(RequestHandler):
+            @self.ns.marshal_stream(PetSchema)
+            def get(self):
+                return []
+
+        response = self.fetch('/pets/')
+        assert json.loads(response.body.decode('utf-8')) == []
+
+    def test_ndjson(self):
+        @self.ns.route('/')
+        class PetsHandler(RequestHandler):
+            @self.api.marshal_stream(PetSchema, ndjson=True, chunk_size=2)
+            def get(self):
+                for i in range(5):
+                    yield {'name': 'pet{0}'.format(i)}
+
+        response = self.fetch('/pets/')
+        assert response.headers['Content-Type'] == 'application/x-ndjson'
+        lines = response.body.decode('utf-8').splitlines()
+        assert [json.loads(line) for line in lines] == \
+            [{'name': 'pet{0}'.format(i)} for i in range(5)]
+
+    @skipIf(sys.version_info < (3, 5), 'requires async iterators')
+    def test_async_iterator(self):
+        @self.ns.route('/')
+        class PetsHandler(RequestHandler):
+            @self.ns.marshal_stream(PetSchema, chunk_size=2)
+            def get(self):
+                return AsyncItems(3)
+
+        response = self.fetch('/pets/')
+        body = json.loads(response.body.decode('utf-8'))
+        assert body == [{'name': 'pet2'}, {'name': 'pet1'}, {'name': 'pet0'}]
@@ -0,0 +1,171 @@
+import json
+from unittest import TestCase
+
+import pytest
+from marshmallow import Schema, fields
+from tornado.testing import AsyncHTTPTestCase
+from tornado.web import Application, RequestHandler
+
+from tornado_restplus import Api
+from tornado_restplus.mask import MaskedSchemaCache, MaskError, parse_mask
+
+
+class OwnerSchema(Schema):
+    name = fields.Str()
+    age = fields.Int()
+
+
+class PetSchema(Schema):
+    id = fields.Int()
+    name = fields.Str()
+    owner = fields.Nested(OwnerSchema)
+
+
+PET = {'id': 1, 'name': 'Rex', 'owner': {'name': 'Bob', 'age': 42}}
+
+
+class ParseMaskTest(TestCase):
+    def test_flat(self):
+        assert parse_mask('id,name') == ('id', 'name')
+        assert parse_mask(' { id , name } ') == ('id', 'name')
+
+    def test_nested(self):
+        assert parse_mask('{name,owner{name,age}}') == \
+            ('name', 'owner.name', 'owner.age')
+
+    def test_invalid(self):
+        for mask in ('', '{}', 'owner{name', 'name}', '{name', ',{name}'):
+            with pytest.raises(MaskError):
+                parse_mask(mask)
+
+
+class MaskedSchemaCacheTest(TestCase):
+    def test_cached(self):
+        cache = MaskedSchemaCache()
+        schema = PetSchema()
+        compiled = cache.get(schema, 'name')
+        assert cache.get(schema, 'name') is compiled
+        assert compiled.dump(PET).data == {'name': 'Rex'}
+
+    def test_maxsize(self):
+        cache = MaskedSchemaCache(maxsize=2)
+        schema = PetSchema()
+        first = cache.get(schema, 'id')
+        cache.get(schema, 'name')
+        cache.get(schema, 'owner')
+        assert len(cache) == 2
+        assert cache.get(schema, 'id') is not first
+
+    def test_unknown_field(self):
+        cache = MaskedSchemaCache()
+        with pytest.raises(MaskError):
+            cache.get(PetSchema(), 'color')
+        with pytest.raises(MaskError):
+            cache.get(PetSchema(), 'owner{color}')
+        with pytest.raises(MaskError):
+            cache.get(PetSchema(), 'name{first}')
+        assert len(cache) == 0
+
+    def test_instance_settings(self):
+        cache = MaskedSchemaCache()
+        schema = PetSchema(exclude=('id', ))
+        with pytest.raises(MaskError):
+            cache.get(schema, 'id')
+        compiled = cache.get(schema, 'name')
+        assert compiled.dump(PET).data == {'name': 'Rex'}
+        # Settings are a part of the key
+        assert cache.get(PetSchema(), 'name') is not compiled
+
+    def test_instance_only(self):
+        cache = MaskedSchemaCache()
+        schema = PetSchema(only=('name', 'owner.name'),
+                           context={'user': 'bob'})
+        with pytest.raises(MaskError):
+            cache.get(schema, 'owner{age}')
+        compiled = cache.get(schema, 'owner')
+        assert compiled.dump(PET).data == {'owner': {'name': 'Bob'}}
+        assert compiled.context is schema.context
+
+
+class MaskTest(AsyncHTTPTestCase):
+    def get_app(self):
+        self.app = Application()
+        return self.app
+
+    def setUp(self):
+        super(MaskTest, self).setUp()
+        self.api = Api(self.app)
+        self.calls = []
+        ns = self.api.namespace('pets')
+        calls = self.calls
+
+        @ns.route('/pet', _doc=True)
+        class PetHandler(RequestHandler):
+            @ns.marshal_with(PetSchema)
+            def get(self):
+                '''Get pet.
+                ---
+                description: Get pet
+                '''
+                calls.append(1)
+                return PET
+
+        @ns.route('/all')
+        class PetsHandler(RequestHandler):
+            @ns.marshal_with(PetSchema, many=True)
+            def get(self):
+                return [PET, PET]
+
+        @ns.route('/stream')
+        class StreamHandler(RequestHandler):
+            @ns.marshal_stream(PetSchema, ndjson=True)
+            def get(self):
+                return iter([PET])
+
+        @ns.route('/raw')
+        class RawHandler(RequestHandler):
+            @ns.marshal_with(PetSchema, mask=False)
+            def get(self):
+                return PET
+
+    def get_json(self, url, **kwargs):
+        response = self.fetch(url, **kwargs)
+        return response, json.loads(response.body.decode('utf-8'))
+
+    def test_no_mask(self):
+        response, body = self.get_json('/pets/pet')
+        assert body == PET
+
+    def test_header(self):
+        response, body = self.get_json(
+            '/pets/pet', headers={'X-Fields': 'name,owner{name}'})
+        assert body == {'name': 'Rex', 'owner': {'name': 'Bob'}}
+        assert 'X-Fields' in response.headers.get_list('Vary')
+
+    def test_query_argument(self):
+        response, body = self.get_json('/pets/pet?fields=id')
+        assert body == {'id': 1}
+
+    def test_many(self):
+        response, body = self.get_json('/pets/all?fields=id')
+        assert body == [{'id': 1}, {'id': 1}]
+
+    def test_stream(self):
+        response = self.fetch('/pets/stream?fields=name')
+        assert json.loads(response.body.decode('utf-8')) == {'name': 'Rex'}
+
+    def test_disabled(self):
+        response, body = self.get_json('/pets/raw?fields=id')
+        assert body == PET
+
+    def test_invalid(self):
+        response, body = self.get_json('/pets/pet?fields=color')
+        assert response.code == 400
+        assert body == {'message': 'Invalid mask: Unknown field: color'}
+        assert self.calls == []
+
+    def test_spec(self):
+        operation = self.api.spec.to_dict()['paths']['/pets/pet']['get']
+        assert {'name': 'X-Fields', 'in': 'header', 'type': 'string',
+                'format': 'mask', 'description': 'An optional fields mask'} \
+            in operation['parameters']
@@ -0,0 +1,86 @@
+from tornado.testing import AsyncHTTPTestCase
+from tornado.web import Application, HTTPError, RequestHandler
+
+from tornado_restplus import Api
+from tornado_restplus.metrics import MetricsCollector
+
+
+class ItemHandler(RequestHandler):
+    def get(self, item_id):
+        if item_id == '0':
+            raise HTTPError(404)
+        self.write(item_id)
+
+
+class ClientHandler(RequestHandler):
+    def initialize(self, api):
+        # The binding is kept under private names, handlers may reuse these
+        self.api = api
+        self.namespace = 'clients'
+
+    def get(self):
+        self.write(self.api)
+
+
+class MetricsTest(AsyncHTTPTestCase):
+    def get_app(self):
+        self.app = Application()
+        return self.app
+
+    def setUp(self):
+        super(MetricsTest, self).setUp()
+        self.api = Api(self.app, prefix='/api')
+        self.ns = self.api.namespace('items')
+        self.ns.add_resource(ItemHandler, r'/(\d+)')
+
+    def test_without_collector(self):
+        response = self.fetch('/api/items/1')
+        assert response.code == 200
+        assert self.api.collector is None
+
+    def test_snapshot(self):
+        collector = self.api.instrument()
+        assert isinstance(collector, MetricsCollector)
+        self.fetch('/api/items/1')
+        self.fetch('/api/items/2')
+        self.fetch('/api/items/0')
+
+        snapshot = collector.snapshot()
+        assert len(snapshot) == 1
+        item = snapshot[0]
+        assert item['namespace'] == 'items'
+        assert item['route'] == r'/api/items/(\d+)'
+        assert item['method'] == 'GET'
+        assert item['count'] == 3
+        assert item['statuses'] == {200: 2, 404: 1}
+        assert item['buckets'][-1] == (float('inf'), 3)
+        assert item['sum'] >= 0
+
+    def test_custom_buckets(self):
+        collector = self.api.instrument(MetricsCollector(buckets=(60, 30)))
+        self.fetch('/api/items/1')
+        buckets = collector.snapshot()[0]['buckets']
+        assert buckets == [(30, 1), (60, 1), (float('inf'), 1)]
+
+    def test_prometheus_handler(self):
+        self.api.instrument(path='/metrics')
+        self.fetch('/api/items/1')
+        response = self.fetch('/api/metrics')
+        assert response.code == 200
+        assert response.headers['Content-Type'].startswith('text/plain')
+        text = response.body.decode('utf-8')
+        labels = r'namespace="items",route="/api/items/(\\d+)",method="GET"'
+        assert 'restplus_requests_total{%s,code="200"} 1' % labels in text
+        assert 'restplus_request_duration_seconds_bucket{%s,le="+Inf"} 1' \
+            % labels in text
+        assert 'restplus_request_duration_seconds_count{%s} 1' % labels \
+            in text
+
+    def test_handler_attributes(self):
+        collector = self.api.instrument()
+        self.ns.add_resource(ClientHandler, '/client', api='remote')
+        response = self.fetch('/api/items/client')
+        assert response.body == b'remote'
+        snapshot = collector.snapshot()
+        assert [(item['namespace'], item['route']) for item in snapshot] == \
+            [('items', '/api/items/client')]
@@ -0,0 +1,87 @@
+import json
+
+from marshmallow import Schema, fields
+from tornado.testing import AsyncHTTPTestCase
+from tornado.web import Application, RequestHandler
+
+from tornado_restplus import Api
+from tornado_restplus.pagination import decode_cursor, encode_cursor
+
+ITEMS = [{'id': i, 'name': 'item{0}'.format(i)} for i in range(1, 8)]
+
+
+class ItemSchema(Schema):
+    id = fields.Int()
+    name = fields.Str()
+
+
+class PaginationTest(AsyncHTTPTestCase):
+    def get_app(self):
+        self.app = Application()
+        return self.app
+
+    def setUp(self):
+        super(PaginationTest, self).setUp()
+        self.api = Api(self.app)
+        self.ns = self.api.namespace('items')
+        ns = self.ns
+
+        @ns.route('/', _doc=True)
+        class ItemsHandler(RequestHandler):
+            @ns.paginate(ItemSchema, max_page_size=3)
+            def get(self):
+                '''List items.
+                ---
+                description: List items
+                '''
+                after = self.page.after or 0
+                return [item for item in ITEMS
+                        if item['id'] > after][:self.page.limit]
+
+    def get_page(self, url):
+        response = self.fetch(url)
+        return response, json.loads(response.body.decode('utf-8'))
+
+    def test_pages(self):
+        ids = []
+        url = '/items/?limit=2'
+        while True:
+            response, body = self.get_page(url)
+            assert response.code == 200
+            assert body['limit'] == 2
+            ids.extend(item['id'] for item in body['items'])
+            if body['next_cursor'] is None:
+                break
+            url = '/items/?limit=2&cursor=' + body['next_cursor']
+        assert ids == [item['id'] for item in ITEMS]
+
+    def test_max_page_size(self):
+        response, body = self.get_page('/items/?limit=1000')
+        assert body['limit'] == 3
+        assert len(body['items']) == 3
+        response, body = self.get_page('/items/')
+        assert body['limit'] == 3
+
+    def test_invalid_arguments(self):
+        response, body = self.get_page('/items/?limit=abc')
+        assert response.code == 400
+        response, body = self.get_page('/items/?cursor=%25%25')
+        assert response.code == 400
+
+    def test_cursor(self):
+        assert decode_cursor(encode_cursor({'id': 5})) == {'id': 5}
+        assert decode_cursor(encode_cursor('a')) == 'a'
+
+    def test_spec(self):
+        doc = self.api.spec.to_dict()
+        operation = doc['paths']['/items']['get']
+        assert operation['description'] == 'List items'
+        parameters = {p['name']: p for p in operation['parameters']}
+        assert parameters['limit']['in'] == 'query'
+        assert parameters['limit']['maximum'] == 3
+        assert parameters['cursor']['type'] == 'string'
+
+    def test_mask(self):
+        response, body = self.get_page('/items/?limit=1&fields=name')
+        assert body['items'] == [{'name': 'item1'}]
+        assert body['next_cursor'] is not None
@@ -0,0 +1,145 @@
+import json
+import time
+
+from tornado import gen
+from tornado.testing import AsyncHTTPTestCase, gen_test
+from tornado.web import Application, RequestHandler
+
+from tornado_restplus import Api
+from tornado_restplus.profiling import Profiler
+
+
+def spin(seconds):
+    end = time.time() + seconds
+    while time.time() < end:
+        pass
+
+
+class BusyHandler(RequestHandler):
+    def get(self):
+        spin(0.05)
+        self.write('done')
+
+
+class IdleHandler(RequestHandler):
+    def get(self):
+        spin(0.05)
+        self.write('done')
+
+
+class ProfilingTest(AsyncHTTPTestCase):
+    def get_app(self):
+        self.app = Application()
+        return self.app
+
+    def setUp(self):
+        super(ProfilingTest, self).setUp()
+        self.api = Api(self.app, prefix='/api')
+        self.api.namespace('busy').add_resource(BusyHandler, '/')
+        self.api.namespace('idle').add_resource(IdleHandler, '/')
+        self.api.add_profiling_endpoint(max_seconds=10, security=[])
+
+    @gen.coroutine
+    def profile(self, query, requests=('/api/busy/', '/api/idle/')):
+        future = self.http_client.fetch(
+            self.get_url('/api/_profile?' + query), method='POST', body=b'',
+            raise_error=False)
+        yield gen.sleep(0.01)
+        for _ in range(3):
+            for path in requests:
+                yield self.http_client.fetch(self.get_url(path))
+        response = yield future
+        raise gen.Return(response)
+
+    @gen_test
+    def test_sample(self):
+        response = yield self.profile('seconds=0.3&namespace=busy')
+        assert response.code == 200
+        data = json.loads(response.body.decode('utf-8'))
+        assert data['mode'] == 'sample'
+        assert list(data['handlers']) == ['BusyHandler']
+        busy = data['handlers']['BusyHandler']
+        assert busy['samples'] > 0
+        assert any(stack.startswith('tests.test_profiling:get;') and
+                   'tests.test_profiling:spin' in stack
+                   for stack in busy['stacks'])
+        assert self.api.profiler is None
+
+    @gen_test
+    def test_collapsed(self):
+        response = yield self.profile('seconds=0.3&format=collapsed')
+        lines = response.body.decode('utf-8').splitlines()
+        handlers = set(line.split(';', 1)[0] for line in lines)
+        assert handlers == set(['BusyHandler', 'IdleHandler'])
+        assert all(line.rsplit(' ', 1)[1].isdigit() for line in lines)
+
+    @gen_test
+    def test_cprofile(self):
+        response = yield self.profile(
+            'seconds=0.3&mode=cprofile&route=/api/busy/')
+        data = json.loads(response.body.decode('utf-8'))
+        assert list(data['handlers']) == ['BusyHandler']
+        busy = data['handlers']['BusyHandler']
+        assert busy['calls'] == 3
+        assert any('(spin)' in item['function']
+                   for item in busy['functions'])
+
+    @gen_test
+    def test_running(self):
+        future = self.http_client.fetch(
+            self.get_url('/api/_profile?seconds=0.2'), method='POST',
+            body=b'')
+        yield gen.sleep(0.05)
+        response = yield self.http_client.fetch(
+            self.get_url('/api/_profile?seconds=0.2'), method='POST',
+            body=b'', raise_error=False)
+        assert response.code == 409
+        response = yield future
+        assert response.code == 200
+
+    @gen_test
+    def test_invalid(self):
+        for query in ('seconds=20', 'seconds=x', 'namespace=unknown',
+                      'mode=trace', 'mode=cprofile&format=collapsed'):
+            response = yield self.http_client.fetch(
+                self.get_url('/api/_profile?' + query), method='POST',
+                body=b'', raise_error=False)
+            assert response.code == 400, query
+
+    def test_unknown_mode(self):
+        with self.assertRaises(ValueError):
+            Profiler(self.api, mode='trace')
+
+    @gen_test
+    def test_security(self):
+        api = Api(self.app, prefix='/secure', authorizations={
+            'apikey': {'type': 'apiKey', 'in': 'header', 'name': 'X-KEY'}})
+        api.verifier('apikey')(lambda token: token == 'admin' or None)
+        api.namespace('busy').add_resource(BusyHandler, '/')
+        api.add_profiling_endpoint(security='apikey')
+        url = self.get_url('/secure/_profile?seconds=0.05')
+        response = yield self.http_client.fetch(
+            url, method='POST', body=b'', raise_error=False)
+        assert response.code == 401
+        response = yield self.http_client.fetch(
+            url, method='POST', body=b'', headers={'X-KEY': 'admin'})
+        assert response.code == 200
+
+    def test_api_security(self):
+        api = Api(self.app, prefix='/secure', security='apikey',
+                  authorizations={'apikey': {'type': 'apiKey', 'in': 'header',
+                                             'name': 'X-KEY'}})
+        api.verifier('apikey')(lambda token: token == 'admin' or None)
+        api.namespace('busy').add_resource(BusyHandler, '/')
+        api.add_profiling_endpoint()
+        response = self.fetch('/secure/_profile?seconds=0.05', method='POST',
+                              body=b'')
+        assert response.code == 401
+
+    def test_security_required(self):
+        api = Api(self.app, prefix='/public')
+        api.namespace('busy').add_resource(BusyHandler, '/')
+        with self.assertRaises(ValueError):
+            api.add_profiling_endpoint()
+        assert self.fetch('/public/_profile', method='POST',
+                          body=b'').code == 404
@@ -0,0 +1,109 @@
+import json
+from unittest import TestCase
+
+import pytest
+from marshmallow import Schema, fields
+from tornado.testing import AsyncHTTPTestCase
+from tornado.web import Application, RequestHandler
+
+from tornado_restplus import Api
+from tornado_restplus.representations import (best_match, cbor2, msgpack,
+                                              parse_accept)
+
+MEDIATYPES = ['application/json', 'application/x-msgpack', 'text/csv']
+
+
+class PetSchema(Schema):
+    name = fields.Str()
+
+
+class BestMatchTest(TestCase):
+    def test_parse_accept(self):
+        assert parse_accept('text/*;q=0.5, application/json, */*;q=0.1, '
+                            'text/csv;q=0.5, image/png;q=0') == \
+            ['application/json', 'text/csv', 'text/*', '*/*']
+
+    def test_best_match(self):
+        assert best_match('application/x-msgpack', MEDIATYPES) == \
+            'application/x-msgpack'
+        assert best_match('application/json;q=0.5, application/x-msgpack',
+                          MEDIATYPES) == 'application/x-msgpack'
+        assert best_match('text/*', MEDIATYPES) == 'text/csv'
+        assert best_match('*/*', MEDIATYPES) == 'application/json'
+        assert best_match('image/png', MEDIATYPES) is None
+        assert best_match('application/json;q=x', MEDIATYPES) is None
+
+
+class NegotiationTest(AsyncHTTPTestCase):
+    def get_app(self):
+        self.app = Application()
+        return self.app
+
+    def setUp(self):
+        super(NegotiationTest, self).setUp()
+        self.api = Api(self.app)
+
+        @self.api.representation('text/csv')
+        def output_csv(data):
+            return ','.join(sorted(data.values())).encode('utf-8')
+
+        ns = self.api.namespace('pets')
+
+        @ns.route('/', _doc=True)
+        class PetHandler(RequestHandler):
+            @self.api.marshal_with(PetSchema)
+            def get(self):
+                '''Get pet.
+                ---
+                description: Get pet
+                '''
+                return {'name': 'Rex'}
+
+    def test_default(self):
+        for headers in ({}, {'Accept': '*/*'}, {'Accept': 'image/png'}):
+            response = self.fetch('/pets/', headers=headers)
+            assert response.headers['Content-Type'] == 'application/json'
+            assert response.body == b'{"name":"Rex"}'
+            assert response.headers.get_list('Vary') == ['X-Fields',
+                                                         'Accept']
+
+    def test_custom(self):
+        response = self.fetch('/pets/', headers={'Accept': 'text/csv'})
+        assert response.headers['Content-Type'] == 'text/csv'
+        assert response.body == b'Rex'
+
+    @pytest.mark.skipif(msgpack is None, reason='msgpack is not installed')
+    def test_msgpack(self):
+        response = self.fetch('/pets/', headers={
+            'Accept': 'application/json;q=0.9, application/x-msgpack'})
+        assert response.headers['Content-Type'] == 'application/x-msgpack'
+        assert msgpack.unpackb(response.body, raw=False) == {'name': 'Rex'}
+
+    @pytest.mark.skipif(cbor2 is None, reason='cbor2 is not installed')
+    def test_cbor(self):
+        response = self.fetch('/pets/', headers={'Accept': 'application/cbor'})
+        assert response.headers['Content-Type'] == 'application/cbor'
+        assert cbor2.loads(response.body) == {'name': 'Rex'}
+
+    def test_not_acceptable(self):
+        api = Api(self.app, prefix='/strict', default_mediatype=None,
+                  doc=False)
+
+        ns = api.namespace('pets')
+
+        @ns.route('/')
+        class PetHandler(RequestHandler):
+            @api.marshal_with(PetSchema)
+            def get(self):
+                return {'name': 'Rex'}
+
+        response = self.fetch('/strict/pets/', headers={'Accept': 'image/png'})
+        assert response.code == 406
+        response = self.fetch('/strict/pets/')
+        assert response.headers['Content-Type'] == 'application/json'
+
+    def test_produces(self):
+        response = self.fetch('/swagger.json')
+        produces = json.loads(response.body.decode('utf-8'))['produces']
+        assert produces[0] == 'application/json'
+        assert 'text/csv' in produces
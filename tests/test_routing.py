@@ -0,0 +1,108 @@
+from tornado.web import Application, RequestHandler, URLSpec
+from tornado.testing import AsyncHTTPTestCase
+
+from tornado_restplus import Api, Namespace
+
+from tests.common import BaseEchoHandler
+
+
+class NamespaceRoutingTest(AsyncHTTPTestCase):
+    def get_app(self):
+        self.app = Application()
+        return self.app
+
+    def test_namespace_routing(self):
+        api = Api(self.app, prefix='/api', routing='namespace')
+        ns1 = api.namespace('ns1')
+        ns2 = api.namespace('ns2')
+
+        @ns1.route('/endpoint', reply='[1]')
+        class FirstHandler(BaseEchoHandler):
+            pass
+
+        @ns2.route('/endpoint', reply='[2]')
+        class SecondHandler(BaseEchoHandler):
+            pass
+
+        response = self.fetch('/api/ns1/endpoint')
+        assert response.code == 200
+        assert response.body == b'FirstHandler [1]'
+        response = self.fetch('/api/ns2/endpoint')
+        assert response.code == 200
+        assert response.body == b'SecondHandler [2]'
+        response = self.fetch('/api/ns3/endpoint')
+        assert response.code == 404
+
+    def test_lazy_loading(self):
+        api = Api(routing='namespace')
+        ns = Namespace('ns')
+
+        @ns.route('/endpoint', reply='[0]')
+        class SomeHandler(BaseEchoHandler):
+            pass
+
+        api.add_namespace(ns, path='/custom')
+        api.init_app(self.app)
+        response = self.fetch('/custom/endpoint')
+        assert response.code == 200
+        assert response.body == b'SomeHandler [0]'
+
+    def test_nested_prefixes(self):
+        api = Api(self.app, routing='namespace')
+        outer = api.namespace('outer')
+        inner = Namespace('inner', path='/outer/inner')
+        api.add_namespace(inner)
+
+        @outer.route('/inner/other', reply='[outer]')
+        class OuterHandler(BaseEchoHandler):
+            pass
+
+        @inner.route('/endpoint', reply='[inner]')
+        class InnerHandler(BaseEchoHandler):
+            pass
+
+        response = self.fetch('/outer/inner/endpoint')
+        assert response.body == b'InnerHandler [inner]'
+        # Falls back to the shorter prefix
+        response = self.fetch('/outer/inner/other')
+        assert response.body == b'OuterHandler [outer]'
+
+    def test_path_arguments(self):
+        api = Api(self.app, routing='namespace')
+        ns = api.namespace('items')
+
+        @ns.route(r'/(?P<item_id>\d+)')
+        class ItemHandler(RequestHandler):
+            def get(self, item_id):
+                self.write(item_id)
+
+        response = self.fetch('/items/42')
+        assert response.code == 200
+        assert response.body == b'42'
+
+    def test_regex_namespace_path(self):
+        for routing in ('flat', 'namespace'):
+            api = Api(self.app, prefix='/' + routing, routing=routing)
+            ns = Namespace('pets', path=r'/users/(?P<uid>\d+)')
+            api.add_namespace(ns)
+
+            @ns.route('/pets')
+            class PetsHandler(RequestHandler):
+                def get(self, uid):
+                    self.write(uid)
+
+            response = self.fetch('/{0}/users/5/pets'.format(routing))
+            assert response.code == 200, routing
+            assert response.body == b'5'
+
+    def test_reverse_url(self):
+        api = Api(self.app, routing='namespace')
+        api.router.add_rules('/items', [
+            URLSpec(r'/items/(\d+)', BaseEchoHandler, dict(reply=''),
+                    name='item')])
+        api.init_app(self.app)
+        assert self.app.reverse_url('item', 7) == '/items/7'
+
+    def test_unknown_routing_mode(self):
+        with self.assertRaises(ValueError):
+            Api(routing='unknown')
@@ -1,7 +1,9 @@
+from apispec.exceptions import APISpecError
+import pytest
 from tornado.web import Application
 from unittest import TestCase
 
-from tornado_restplus import Api
+from tornado_restplus import Api, Namespace
 from tests.common import BaseEchoHandler
 from marshmallow import Schema, fields
 
@@ -184,3 +186,122 @@ class SpecTest(TestCase):
         assert 'Pet' in doc['definitions']
         assert 'name' in doc['definitions']['Pet']['properties']
         assert 'category' in doc['definitions']['Pet']['properties']
+
+    def test_namespace_fragments(self):
+        class PetSchema(Schema):
+            name = fields.Str()
+
+        other = self.api.namespace('other')
+
+        @self.ns.route('/path', _doc=True)
+        class SomeHandler(BaseEchoHandler):
+            def get(self):
+                '''Get a greeting endpoint.
+                ---
+                description: Get a greeting
+                '''
+                pass
+
+        other.definition('Pet', schema=PetSchema)
+
+        fragment = self.api.spec.fragment(self.ns)
+        assert list(fragment.paths) == ['/api/path']
+        assert len(fragment.definitions) == 0
+        fragment = self.api.spec.fragment(other)
+        assert len(fragment.paths) == 0
+        assert list(fragment.definitions) == ['Pet']
+
+        doc = self.api.spec.to_dict()
+        assert '/api/path' in doc['paths']
+        assert 'Pet' in doc['definitions']
+
+    def test_only_changed_fragments_are_merged(self):
+        @self.ns.route('/path', _doc=True)
+        class SomeHandler(BaseEchoHandler):
+            def get(self):
+                '''Get a greeting endpoint.
+                ---
+                description: Get a greeting
+                '''
+                pass
+
+        self.api.spec.to_dict()
+        assert len(self.api.spec._changed) == 0
+
+        other = self.api.namespace('other')
+
+        @other.route('/path', _doc=True)
+        class OtherHandler(BaseEchoHandler):
+            def get(self):
+                '''Get other greeting.
+                ---
+                description: Get other greeting
+                '''
+                pass
+
+        assert list(self.api.spec._changed) == [other]
+        doc = self.api.spec.to_dict()
+        assert '/api/path' in doc['paths']
+        assert '/other/path' in doc['paths']
+
+    def test_add_namespace_twice(self):
+        class PetSchema(Schema):
+            name = fields.Str()
+
+        ns = Namespace('lazy_api')
+        ns.definition('Pet', schema=PetSchema)
+        self.api.add_namespace(ns)
+        self.api.spec.to_dict()
+        self.api.add_namespace(ns)
+        assert len(self.api.spec._changed) == 0
+        assert self.api.namespaces.count(ns) == 1
+
+    def test_lazy_spec(self):
+        api = Api(self.app, title='Lazy api', lazy_spec=True)
+        ns = api.namespace('lazy')
+
+        @ns.route('/first', _doc=True)
+        @ns.route('/second', _doc=True)
+        class SomeHandler(BaseEchoHandler):
+            def get(self):
+                '''Get a greeting endpoint.
+                ---
+                description: Get a greeting
+                '''
+                pass
+
+        fragment = api.spec.fragment(ns)
+        assert len(fragment.pending) == 2
+        assert len(fragment.paths) == 0
+        assert len(api.spec._handler_operations) == 0
+
+        doc = api.spec.to_dict()
+        assert doc['paths']['/lazy/first']['get']['description'] == \
+            'Get a greeting'
+        assert doc['paths']['/lazy/second']['get']['description'] == \
+            'Get a greeting'
+        assert len(fragment.pending) == 0
+        assert list(api.spec._handler_operations) == [SomeHandler]
+
+    def test_lazy_spec_error(self):
+        api = Api(self.app, lazy_spec=True)
+        ns = api.namespace('lazy')
+
+        @ns.route('/first', _doc=True)
+        class FirstHandler(BaseEchoHandler):
+            def get(self):
+                '''Get a greeting endpoint.
+                ---
+                description: Get a greeting
+                '''
+                pass
+
+        @ns.route('/second', _doc=True)
+        class SecondHandler(BaseEchoHandler):
+            def get(self):
+                pass
+
+        for _ in range(2):
+            with pytest.raises(APISpecError):
+                api.spec.to_dict()
+        assert len(api.spec.fragment(ns).pending) == 1
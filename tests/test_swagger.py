@@ -0,0 +1,118 @@
+import gzip
+import json
+from io import BytesIO
+
+from tornado.testing import AsyncHTTPTestCase
+from tornado.web import Application
+from marshmallow import Schema, fields
+
+from tornado_restplus import Api
+
+from tests.common import BaseEchoHandler
+
+
+class SwaggerHandlerTest(AsyncHTTPTestCase):
+    def get_app(self):
+        self.app = Application()
+        return self.app
+
+    def setUp(self):
+        super(SwaggerHandlerTest, self).setUp()
+        self.api = Api(self.app, title='Api title', prefix='/api',
+                       doc='/swagger.json')
+        self.ns = self.api.namespace('ns')
+
+        @self.ns.route('/path', _doc=True, reply='')
+        class SomeHandler(BaseEchoHandler):
+            def get(self):
+                '''Get a greeting endpoint.
+                ---
+                description: Get a greeting
+                responses:
+                    200:
+                        description: A greeting to the client
+                '''
+                pass
+
+    def test_serve_spec(self):
+        response = self.fetch('/api/swagger.json')
+        assert response.code == 200
+        assert response.headers['Content-Type'].startswith('application/json')
+        doc = json.loads(response.body.decode('utf-8'))
+        assert doc['info']['title'] == 'Api title'
+        assert '/api/ns/path' in doc['paths']
+
+    def test_gzip(self):
+        response = self.fetch('/api/swagger.json', decompress_response=False,
+                              headers={'Accept-Encoding': 'gzip'})
+        assert response.code == 200
+        assert response.headers['Content-Encoding'] == 'gzip'
+        body = gzip.GzipFile(fileobj=BytesIO(response.body)).read()
+        assert body == self.api.serialized_spec.identity
+
+        response = self.fetch('/api/swagger.json', decompress_response=False,
+                              headers={'Accept-Encoding': 'identity'})
+        assert 'Content-Encoding' not in response.headers
+        assert response.body == self.api.serialized_spec.identity
+
+        response = self.fetch('/api/swagger.json', decompress_response=False,
+                              headers={'Accept-Encoding': 'gzip;q=0, br'})
+        assert 'Content-Encoding' not in response.headers
+        assert response.body == self.api.serialized_spec.identity
+
+    def test_not_modified(self):
+        response = self.fetch('/api/swagger.json')
+        etag = response.headers['ETag']
+        assert etag == self.api.serialized_spec.etag
+
+        response = self.fetch('/api/swagger.json',
+                              headers={'If-None-Match': etag})
+        assert response.code == 304
+        assert response.body == b''
+
+    def test_invalidation(self):
+        cached = self.api.serialized_spec
+        assert self.api.serialized_spec is cached
+
+        class PetSchema(Schema):
+            name = fields.Str()
+
+        self.ns.definition('Pet', schema=PetSchema)
+        assert self.api.serialized_spec is not cached
+        assert b'Pet' in self.api.serialized_spec.identity
+
+        cached = self.api.serialized_spec
+
+        @self.ns.route('/another_path', _doc=True, reply='')
+        class AnotherHandler(BaseEchoHandler):
+            def get(self):
+                '''Another endpoint.
+                ---
+                description: Another
+                '''
+                pass
+
+        assert self.api.serialized_spec is not cached
+        response = self.fetch('/api/swagger.json')
+        doc = json.loads(response.body.decode('utf-8'))
+        assert '/api/ns/another_path' in doc['paths']
+
+    def test_default_doc_path(self):
+        Api(self.app, title='Root api')
+        response = self.fetch('/swagger.json')
+        assert response.code == 200
+        doc = json.loads(response.body.decode('utf-8'))
+        assert doc['info']['title'] == 'Root api'
+        # The application root is left to its own handlers
+        assert self.fetch('/').code == 404
+
+    def test_root_doc_path(self):
+        Api(self.app, title='Root api', doc='/')
+        response = self.fetch('/')
+        assert json.loads(response.body.decode('utf-8'))['info']['title'] == \
+            'Root api'
+
+    def test_disabled_doc(self):
+        Api(self.app, prefix='/nodoc', doc=False)
+        response = self.fetch('/nodoc')
+        assert response.code == 404
@@ -1,8 +1,22 @@
+import json
 import logging
-from apispec import APISpec
+import sys
+from collections import OrderedDict
+from contextlib import contextmanager
 
+from tornado.routing import AnyMatches, Rule
+
+from .auth import Authorizer, normalize_security, secure
+from .batch import BatchHandler
 from .namespace import Namespace
-from .utils import make_path_chunk
+from .metrics import MetricsCollector, MetricsHandler
+from .profiling import ProfileHandler
+from .representations import DEFAULT_REPRESENTATIONS, best_match
+from .resource import ResourceMixin
+from .routing import NamespaceRouter, Route
+from .spec import IncrementalAPISpec
+from .swagger import SerializedSpec, SwaggerHandler
+from .utils import import_object, import_path, make_path_chunk
 
 log = logging.getLogger(__name__)
 
@@ -11,13 +25,14 @@ class Api(object):
     def __init__(self, app=None, version='1.0', title=None, description=None,
                  terms_url=None, license=None, license_url=None,
                  contact=None, contact_url=None, contact_email=None,
-                 authorizations=None, security=None, doc='/',
+                 authorizations=None, security=None,
+                 doc='/swagger.json',
                  default='default',  # default_id=default_id,
                  default_label='Default namespace', validate=None,
                  tags=None, prefix='',
                  default_mediatype='application/json', decorators=None,
                  catch_all_404s=False, serve_challenge_on_401=False,
-                 format_checker=None,
+                 format_checker=None, routing='flat', lazy_spec=False,
                  **kwargs):
         self.version = version
         self.title = title or 'API'
@@ -29,9 +44,12 @@ class Api(object):
         self.license = license
         self.license_url = license_url
         self.authorizations = authorizations
-        # self.security = security
+        self.security = normalize_security(security)
+        self.authorizer = Authorizer(authorizations)
+        # Verifiers are registered later, they are checked with resources
+        self.authorizer.check(self.security, verifiers=False)
         # self.default_id = default_id
-        # self._validate = validate
+        self._validate = validate
         self._doc = doc
         # self._doc_view = None
         # self._default_error_handler = None
@@ -53,20 +71,40 @@ class Api(object):
                                                 api=self,
                                                 path='/')
         self.ns_paths = dict()
-        self.spec = APISpec(title, version,
-                            plugins=['apispec.ext.tornado',
-                                     'apispec.ext.marshmallow'])
-        # self.representations = OrderedDict(DEFAULT_REPRESENTATIONS)
+        self.spec = IncrementalAPISpec(title, version,
+                                       plugins=['apispec.ext.tornado',
+                                                'apispec.ext.marshmallow'],
+                                       lazy=lazy_spec)
+        self.representations = OrderedDict(DEFAULT_REPRESENTATIONS)
         self.urls = {}
         self.prefix = make_path_chunk(prefix)
-        # self.default_mediatype = default_mediatype
+        self.default_mediatype = default_mediatype
+        self._negotiated = {}
+        self._update_produces()
+        if authorizations:
+            self.spec.options['securityDefinitions'] = authorizations
+        if self.security is not None:
+            self.spec.options['security'] = self.security
         # self.decorators = decorators if decorators else []
         # self.catch_all_404s = catch_all_404s
         # self.serve_challenge_on_401 = serve_challenge_on_401
         # self.blueprint_setup = None
         # self.endpoints = set()
         self.resources = []
+        self.routes = []
+        if routing == 'namespace':
+            self.router = NamespaceRouter()
+        elif routing == 'flat':
+            self.router = None
+        else:
+            raise ValueError('Unknown routing mode: {0}'.format(routing))
+        self._serialized_spec = None
+        self.collector = None
+        self.profiler = None
+        self._batch = None
         self.app = None
+        if doc is not False:
+            self._register_doc()
         # self.blueprint = None
 
         if app is not None:
@@ -115,9 +153,20 @@ class Api(object):
         :param tornado.Application app: The tornado application object
         '''
 
-        if len(self.resources) > 0:
+        if len(self.resources) > 0 or self.router is not None:
             self._register_view(app, self.resources)
 
+    def get_ns_prefix(self, ns):
+        '''
+        Returns complete static prefix (api prefix + namespace path) under
+        which resources of given namespace are registered.
+
+        :param Namespace ns: the namespace or None for api level resources
+        '''
+        if ns is None:
+            return self.prefix
+        return self._complete_url(self.get_ns_path(ns) or ns.path)
+
     def get_ns_path(self, ns):
         return self.ns_paths.get(ns)
 
@@ -134,13 +183,16 @@ class Api(object):
         :param Namespace ns: the namespace
         :param path: registration prefix of namespace
         '''
-        if ns not in self.namespaces:
-            self.namespaces.append(ns)
-            if self not in ns.apis:
-                ns.apis.append(self)
-            # Associate ns with prefix-path
-            if path is not None:
-                self.ns_paths[ns] = path
+        if ns in self.namespaces:
+            # Already registered, resources and definitions are not
+            # processed again
+            return
+        self.namespaces.append(ns)
+        if self not in ns.apis:
+            ns.apis.append(self)
+        # Associate ns with prefix-path
+        if path is not None:
+            self.ns_paths[ns] = path
         # Register resources
         for resource, urls, kwargs in ns.resources:
             self.register_resource(ns, resource, *self.ns_urls(ns, urls),
@@ -148,7 +200,41 @@ class Api(object):
 
         for definition in ns.definitions:
             args, kwargs = definition
-            self.spec.definition(*args, **kwargs)
+            self.register_definition(ns, *args, **kwargs)
+
+    @contextmanager
+    def batch(self):
+        '''
+        A context manager collecting resources registered within it and
+        installing them in the application with a single ``add_handlers``
+        call, instead of one call (and one host rule) per resource::
+
+            with api.batch():
+                api.add_namespace(ns1)
+                api.add_namespace(ns2)
+        '''
+        if self._batch is not None:
+            # Nested batch, the outer one installs the handlers
+            yield
+            return
+        self._batch = []
+        try:
+            yield
+        finally:
+            urlspecs, self._batch = self._batch, None
+            if urlspecs:
+                self._register_view(self.app, urlspecs)
+
+    def register_many(self, *namespaces):
+        '''
+        Register several namespaces installing all their resources at once,
+        see :meth:`batch`.
+
+        :param Namespace namespaces: the namespaces
+        '''
+        with self.batch():
+            for ns in namespaces:
+                self.add_namespace(ns)
 
     def namespace(self, *args, **kwargs):
         '''
@@ -168,29 +254,421 @@ class Api(object):
         '''
         return ''.join([self.prefix, url_part])
 
+    def _bind_resource(self, namespace, resource, route):
+        '''
+        Returns a subclass of the resource bound to this api, namespace and
+        route (available as ``self.api``, ``self.namespace`` and
+        ``self.route`` in handlers, see :class:`ResourceMixin`). The same
+        resource can be registered in several apis and namespaces, so the
+        original class is left untouched.
+
+        :param Namespace namespace: the namespace or None
+        :param resource: RequestHandler descendant
+        :param str route: complete url template of the route
+        :raises ValueError: when security requirements of the resource use
+                            unknown schemes or schemes without verifier
+        '''
+        attrs = {
+            '_restplus_api': self,
+            '_restplus_namespace': namespace,
+            '_restplus_route': route,
+            '__doc__': resource.__doc__,
+            '__module__': resource.__module__,
+        }
+        # Public aliases, unless the resource uses the names itself
+        for name, value in (('api', self), ('namespace', namespace),
+                            ('route', route)):
+            if issubclass(resource, ResourceMixin) or \
+                    not hasattr(resource, name):
+                attrs[name] = value
+        if namespace is not None:
+            attrs.update(namespace.decorate(resource,
+                                            security=self.security))
+        handler = type(resource.__name__, (ResourceMixin, resource), attrs)
+        for http_method in handler.SUPPORTED_METHODS:
+            method = getattr(handler, http_method.lower(), None)
+            self.authorizer.check(getattr(method, '__security__', None))
+        return handler
+
     def register_resource(self, namespace, resource, *urls, **kwargs):
-        urlspecs = []
         doc = kwargs.pop('_doc', None)
-        for url in urls:
-            url = self._complete_url(url)
-            urlspecs.append((url, resource, kwargs))
+        urls = [self._complete_url(url) for url in urls]
 
         if doc is not None:
             if isinstance(doc, bool):
                 if doc:
-                    for urlspec in urlspecs:
-                        self.spec.add_path(urlspec=urlspec)
+                    defaults = None
+                    if namespace is not None and \
+                            namespace.security is not None:
+                        defaults = {'security': namespace.security}
+                    for url in urls:
+                        self.spec.add_urlspec((url, resource, kwargs),
+                                              fragment=namespace,
+                                              defaults=defaults)
+                    self.invalidate_spec()
             else:
                 # TODO handle documentation as string?
                 pass
 
+        self._install(namespace, resource, urls, kwargs)
+
+    def _install(self, namespace, resource, urls, kwargs):
+        '''
+        Bind the resource to complete urls and install it in the router
+        and the application.
+        '''
+        urlspecs = []
+        for url in urls:
+            self.routes.append(Route(url, resource, namespace, kwargs))
+            handler = self._bind_resource(namespace, resource, url)
+            urlspecs.append((url, handler, kwargs))
+
+        if self.router is not None:
+            self.router.add_rules(self.get_ns_prefix(namespace), urlspecs)
+
         if self.app is not None:
             self._register_view(self.app, urlspecs)
         else:
             self.resources.extend(urlspecs)
 
     def _register_view(self, app, urlspecs):
-        app.add_handlers(r'.*', urlspecs)
+        if self._batch is not None:
+            self._batch.extend(urlspecs)
+        elif self.router is None:
+            app.add_handlers(r'.*', self._unique_urlspecs(urlspecs))
+        elif self.router.application is None:
+            # Rules are already kept by the router, it only has to be
+            # installed once.
+            self.router.application = app
+            app.add_handlers(r'.*', [Rule(AnyMatches(), self.router)])
+
+    @staticmethod
+    def _unique_urlspecs(urlspecs):
+        # Tornado uses the first matching rule, later ones with the same
+        # url would never be reached.
+        urls = set()
+        unique = []
+        for urlspec in urlspecs:
+            if urlspec[0] not in urls:
+                urls.add(urlspec[0])
+                unique.append(urlspec)
+        return unique
+
+    def register_definition(self, namespace, *args, **kwargs):
+        '''
+        Add a definition to the spec fragment of given namespace.
+
+        :param Namespace namespace: the namespace or None for api level
+                                    definitions
+        '''
+        self.spec.definition(*args, fragment=namespace, **kwargs)
+        self.invalidate_spec()
 
     def definition(self, *args, **kwargs):
-        self.spec.definition(*args, **kwargs)
+        self.register_definition(None, *args, **kwargs)
+
+    def _register_doc(self):
+        '''
+        Register :class:`SwaggerHandler` serving the spec under ``doc`` path
+        (``/swagger.json`` by default, so the api does not shadow the
+        application's root handler).
+        '''
+        url = make_path_chunk(self._doc)
+        if not (self.prefix or url):
+            url = '/'
+        self.register_resource(None, SwaggerHandler, url, api=self)
+
+    def instrument(self, collector=None, path=None):
+        '''
+        Attach a metrics collector recording request count, status codes
+        and latency of every resource of the api. Without a collector
+        resources only pay for a single attribute check.
+
+        :param MetricsCollector collector: the collector, a new one is
+                                           created if not provided
+        :param str path: optional path (under api prefix) to serve metrics
+                         in prometheus text format at
+        :returns MetricsCollector: the attached collector
+        '''
+        self.collector = collector or MetricsCollector()
+        if path is not None:
+            self.register_resource(None, MetricsHandler, make_path_chunk(path),
+                                   api=self)
+        return self.collector
+
+    def export_routes(self):
+        '''
+        Returns the route table of namespace resources and the spec as
+        JSON serializable dict, to be loaded with :meth:`load_routes`
+        (eg. saved at build time and loaded by workers at startup)::
+
+            {"prefix": "/api",
+             "namespaces": [{"name": "pets", "import": "app.pets:ns",
+                             "path": null}],
+             "routes": [{"url": "/api/pets/(?P<pet_id>\\d+)",
+                         "handler": "app.pets:PetHandler",
+                         "namespace": 0, "kwargs": {}}],
+             "spec": {...}}
+
+        Resources must be importable module level classes and their kwargs
+        JSON serializable. Api level handlers (doc, metrics, batch) are
+        not exported, they are registered when the api is set up.
+
+        :raises ValueError: when a resource is not importable (its import
+                            path does not resolve to the resource itself)
+        '''
+        namespaces = []
+        routes = []
+        for route in self.routes:
+            if route.namespace is None:
+                continue
+            if route.namespace not in namespaces:
+                namespaces.append(route.namespace)
+            handler = import_path(route.resource)
+            try:
+                importable = import_object(handler) is route.resource
+            except (ImportError, AttributeError):
+                importable = False
+            if not importable:
+                raise ValueError('Resource {0} is not importable'
+                                 .format(handler))
+            routes.append({
+                'url': route.url,
+                'handler': handler,
+                'namespace': namespaces.index(route.namespace),
+                'kwargs': route.kwargs,
+            })
+        # Fail early on kwargs which can't be saved
+        json.dumps(routes)
+        return {
+            'prefix': self.prefix,
+            'namespaces': [{
+                'name': ns.name,
+                'import': self._namespace_import_path(ns),
+                'path': self.get_ns_path(ns),
+            } for ns in namespaces],
+            'routes': routes,
+            'spec': self.spec.to_dict(),
+        }
+
+    @staticmethod
+    def _namespace_import_path(ns):
+        # Namespaces are usually module globals next to their resources
+        for resource, _, _ in ns.resources:
+            module = sys.modules.get(resource.__module__)
+            if module is None:
+                continue
+            for name, value in vars(module).items():
+                if value is ns:
+                    return '{0}:{1}'.format(resource.__module__, name)
+        return None
+
+    def load_routes(self, data, namespaces=None):
+        '''
+        Install routes exported with :meth:`export_routes`. Resources are
+        bound and installed with a single ``add_handlers`` call, and the
+        spec is taken as is, so urls are not composed and docstrings are
+        not parsed again. Loaded namespaces are marked as registered.
+
+        :param dict data: exported routes
+        :param list namespaces: namespaces to use instead of importing them
+                                (matched by name), required for namespaces
+                                which are not module globals (but the
+                                default one)
+        :raises ValueError: when api prefix differs or a namespace can't
+                            be resolved
+        '''
+        if data['prefix'] != self.prefix:
+            raise ValueError('Routes were exported with prefix {0!r}'
+                             .format(data['prefix']))
+        by_name = dict((ns.name, ns) for ns in namespaces or [])
+        loaded = []
+        for item in data['namespaces']:
+            ns = by_name.get(item['name'])
+            if ns is None and item['import']:
+                ns = import_object(item['import'])
+            if ns is None and item['name'] == self.default_namespace.name:
+                ns = self.default_namespace
+            if ns is None:
+                raise ValueError('Namespace {0} can not be resolved'
+                                 .format(item['name']))
+            loaded.append(ns)
+            if ns not in self.namespaces:
+                self.namespaces.append(ns)
+                if self not in ns.apis:
+                    ns.apis.append(self)
+                if item['path'] is not None:
+                    self.ns_paths[ns] = item['path']
+        with self.batch():
+            for route in data['routes']:
+                self._install(loaded[route['namespace']],
+                              import_object(route['handler']),
+                              [route['url']], route['kwargs'])
+        self.spec.load(data['spec'])
+        self.invalidate_spec()
+
+    def add_batch_endpoint(self, path='/batch', max_requests=50, timeout=30):
+        '''
+        Serve a batch endpoint under api prefix. It takes a JSON array of
+        ``{"method", "path", "body", "headers"}`` sub-requests, runs them
+        concurrently against resources of this api without loopback http
+        calls and returns an array of ``{"status", "headers", "body"}``
+        results, see :mod:`batch`.
+
+        :param str path: path of the endpoint (under api prefix)
+        :param int max_requests: maximum number of sub-requests in a batch
+        :param float timeout: seconds after which an unfinished sub-request
+                              is closed and answered with ``504``
+        '''
+        self.register_resource(None, BatchHandler, make_path_chunk(path),
+                               api=self, max_requests=max_requests,
+                               timeout=timeout)
+
+    def add_profiling_endpoint(self, path='/_profile', max_seconds=60,
+                               security=None):
+        '''
+        Serve a profiling endpoint under api prefix. ``POST`` to it
+        profiles resources of a namespace or route for a number of seconds
+        with a statistical sampler or cProfile, and returns stats grouped
+        by handler class (or collapsed stacks for flamegraphs), see
+        :mod:`profiling`. The running profiler is available as
+        :attr:`profiler`.
+
+        :param str path: path of the endpoint (under api prefix)
+        :param float max_seconds: maximum profiling time
+        :param security: security requirements of the endpoint, defaults
+                         to api ``security``, an empty list makes the
+                         endpoint public
+        :raises ValueError: when neither the api nor the endpoint declare
+                            security (profiling slows down the whole
+                            server, it is not public unless asked for)
+        '''
+        security = self.security if security is None else \
+            normalize_security(security)
+        if security is None:
+            raise ValueError('The profiling endpoint requires security, '
+                             'pass security=[] to make it public')
+        handler = ProfileHandler
+        if security:
+            handler = type(ProfileHandler.__name__, (ProfileHandler, ), {
+                'post': secure(security)(ProfileHandler.post),
+                '__module__': ProfileHandler.__module__,
+            })
+        self.register_resource(None, handler, make_path_chunk(path),
+                               api=self, max_seconds=max_seconds)
+
+    @property
+    def serialized_spec(self):
+        '''
+        The spec serialized to JSON (and gzip). It is built on first access
+        and kept until the spec changes.
+
+        :returns SerializedSpec: cached serialized spec
+        '''
+        if self._serialized_spec is None:
+            self._serialized_spec = SerializedSpec(self.spec.to_dict())
+        return self._serialized_spec
+
+    def invalidate_spec(self):
+        '''
+        Drop cached serialized spec, it will be rebuilt on next request.
+        '''
+        self._serialized_spec = None
+
+    def expect(self, *args, **kwargs):
+        '''
+        A decorator to load and validate request body, see
+        :meth:`Namespace.expect`.
+        '''
+        return self.default_namespace.expect(*args, **kwargs)
+
+    def marshal_with(self, *args, **kwargs):
+        '''
+        A decorator serializing returned object with a marshmallow schema,
+        see :meth:`Namespace.marshal_with`.
+        '''
+        return self.default_namespace.marshal_with(*args, **kwargs)
+
+    def marshal_stream(self, *args, **kwargs):
+        '''
+        A decorator streaming serialized objects, see
+        :meth:`Namespace.marshal_stream`.
+        '''
+        return self.default_namespace.marshal_stream(*args, **kwargs)
+
+    def paginate(self, *args, **kwargs):
+        '''
+        A decorator for keyset paginated handler methods, see
+        :meth:`Namespace.paginate`.
+        '''
+        return self.default_namespace.paginate(*args, **kwargs)
+
+    def representation(self, mediatype):
+        '''
+        Allows additional representation transformers to be declared for
+        the api. Transformers take the marshalled data and return bytes::
+
+            @api.representation('application/json')
+            def output_json(data):
+                return ujson.dumps(data).encode('utf-8')
+
+        :param str mediatype: the mediatype the transformer produces
+        '''
+        def wrapper(func):
+            self.representations[mediatype] = func
+            self._negotiated.clear()
+            self._update_produces()
+            return func
+        return wrapper
+
+    def verifier(self, name):
+        '''
+        A decorator registering verifier of credentials of a security
+        scheme declared in ``authorizations``. It takes the credentials
+        (api key, basic auth credentials or bearer token) and returns the
+        principal or None, possibly as a future. Verified credentials are
+        cached, see :mod:`auth`::
+
+            @api.verifier('apikey')
+            def verify_apikey(token):
+                return API_KEYS.get(token)
+
+        :param str name: name of the security scheme
+        '''
+        return self.authorizer.verifier(name)
+
+    def mediatypes(self):
+        '''
+        Returns mediatypes of available representations, the default one
+        first.
+        '''
+        default = self.default_mediatype
+        return sorted(self.representations,
+                      key=lambda mediatype: mediatype != default)
+
+    def negotiate(self, accept):
+        '''
+        Returns the mediatype of responses to requests with given ``Accept``
+        header. When no representation is acceptable, the default mediatype
+        is used, or None is returned when there is no default. Results are
+        memoized per header value.
+
+        :param str accept: value of ``Accept`` header or None
+        '''
+        if not accept:
+            return self.default_mediatype or next(iter(self.representations))
+        try:
+            return self._negotiated[accept]
+        except KeyError:
+            pass
+        mediatype = best_match(accept, self.mediatypes()) or \
+            self.default_mediatype
+        if len(self._negotiated) >= 1024:
+            # Clients send few distinct headers, this only bounds the memory
+            self._negotiated.clear()
+        self._negotiated[accept] = mediatype
+        return mediatype
+
+    def _update_produces(self):
+        self.spec.options['produces'] = self.mediatypes()
+        self.invalidate_spec()
@@ -0,0 +1,256 @@
+'''
+Authorization of requests against security requirements.
+
+Security schemes are declared in :attr:`Api.authorizations` (swagger
+``securityDefinitions``), and credentials of each scheme are checked by
+a verifier function registered with :meth:`Api.verifier`::
+
+    api = Api(authorizations={
+        'apikey': {'type': 'apiKey', 'in': 'header', 'name': 'X-API-KEY'},
+    }, security='apikey')
+
+    @api.verifier('apikey')
+    @gen.coroutine
+    def verify_apikey(token):
+        user = yield db.user_by_key(token)
+        raise gen.Return(user)
+
+Requirements are declared per api, namespace or handler method, they
+have the swagger form: a list of alternatives, each one a dict of scheme
+names (which all must be satisfied) to required scopes. Verified
+credentials are kept in a bounded TTL cache, so repeated requests with
+the same token skip signature checks or backend lookups.
+'''
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from tornado import gen
+from tornado.concurrent import Future
+from tornado.httputil import responses
+
+from .marshalling import is_awaitable
+from .utils import add_apidoc
+
+
+def normalize_security(security):
+    '''
+    Returns security requirements in the swagger form. Scheme names can
+    be used as shorthands: ``'apikey'`` stands for ``[{'apikey': []}]``
+    and ``['apikey', 'oauth2']`` for either of them.
+    '''
+    if security is None:
+        return None
+    if not isinstance(security, (list, tuple)):
+        security = [security]
+    return [{item: []} if not isinstance(item, dict) else dict(item)
+            for item in security]
+
+
+class TokenCache(object):
+    '''
+    LRU cache of verified credentials, entries expire after ``ttl``
+    seconds (it should be shorter than lifetime of tokens).
+
+    :param int max_entries: maximum number of kept entries
+    :param float ttl: time to live of entries in seconds
+    '''
+    def __init__(self, max_entries=4096, ttl=300):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return None
+        expires, value = entry
+        if expires < time.time():
+            return None
+        self._entries[key] = entry
+        return value
+
+    def set(self, key, value):
+        self._entries.pop(key, None)
+        self._entries[key] = (time.time() + self.ttl, value)
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+
+
+def _authorization(handler, kind):
+    value = handler.request.headers.get('Authorization', '')
+    prefix, _, token = value.partition(' ')
+    if prefix.lower() == kind and token:
+        return token.strip()
+    return None
+
+
+def credentials(handler, scheme):
+    '''
+    Returns credentials of a security scheme sent with the request (api
+    key, basic auth credentials or bearer token) or None.
+
+    :param dict scheme: swagger security scheme object
+    '''
+    kind = scheme.get('type')
+    if kind == 'apiKey':
+        if scheme.get('in') == 'query':
+            return handler.get_query_argument(scheme['name'], None)
+        return handler.request.headers.get(scheme['name'])
+    if kind == 'basic':
+        return _authorization(handler, 'basic')
+    if kind == 'oauth2':
+        return _authorization(handler, 'bearer')
+    return None
+
+
+def principal_scopes(principal):
+    if isinstance(principal, dict):
+        return principal.get('scopes', ())
+    return getattr(principal, 'scopes', ())
+
+
+class Authorizer(object):
+    '''
+    Checks requests against security requirements using verifiers of
+    security schemes.
+
+    :param dict authorizations: swagger security schemes keyed by name
+    :param TokenCache cache: cache of verified credentials
+    '''
+    def __init__(self, authorizations=None, cache=None):
+        self.authorizations = authorizations or {}
+        self.cache = cache if cache is not None else TokenCache()
+        self.verifiers = {}
+        self._inflight = {}
+
+    def verifier(self, name):
+        '''
+        A decorator registering verifier of a security scheme. Verifiers
+        take credentials and return the principal (eg. user or token
+        claims, with optional ``scopes``) or None when they are invalid,
+        they may return a future.
+
+        :param str name: name of the security scheme
+        '''
+        if name not in self.authorizations:
+            raise ValueError('Unknown security scheme: {0}'.format(name))
+
+        def wrapper(func):
+            self.verifiers[name] = func
+            return func
+        return wrapper
+
+    def check(self, security, verifiers=True):
+        '''
+        Check that schemes of security requirements are declared (and
+        have verifiers), so misconfigured requirements fail on
+        registration instead of on requests.
+
+        :raises ValueError: on unknown scheme or missing verifier
+        '''
+        for requirement in security or ():
+            for name in requirement:
+                if name not in self.authorizations:
+                    raise ValueError('Unknown security scheme: {0}'
+                                     .format(name))
+                if verifiers and name not in self.verifiers:
+                    raise ValueError('No verifier of security scheme: {0}'
+                                     .format(name))
+
+    @gen.coroutine
+    def verify(self, name, token):
+        '''
+        Returns principal of credentials of a scheme or None. Successful
+        verifications are cached and concurrent verifications of the same
+        credentials are run once.
+        '''
+        key = (name, token)
+        principal = self.cache.get(key)
+        if principal is None and key in self._inflight:
+            # None when the concurrent verification failed
+            principal = yield self._inflight[key]
+            raise gen.Return(principal)
+        if principal is not None:
+            raise gen.Return(principal)
+        future = self._inflight[key] = Future()
+        try:
+            principal = self.verifiers[name](token)
+            if is_awaitable(principal):
+                principal = yield principal
+            if principal is not None:
+                self.cache.set(key, principal)
+        finally:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+            future.set_result(principal)
+        raise gen.Return(principal)
+
+    @gen.coroutine
+    def authorize(self, handler, security):
+        '''
+        Check the request against security requirements.
+
+        :returns tuple: None and principal of the first scheme of the
+                        satisfied requirement, or ``401`` (missing or
+                        invalid credentials) / ``403`` (missing scopes)
+                        and None
+        '''
+        status = 401
+        for requirement in security:
+            principal = None
+            for name, scopes in requirement.items():
+                token = credentials(handler, self.authorizations[name])
+                found = None
+                if token is not None:
+                    found = yield self.verify(name, token)
+                if found is None:
+                    break
+                if not set(scopes) <= set(principal_scopes(found)):
+                    status = 403
+                    break
+                if principal is None:
+                    principal = found
+            else:
+                raise gen.Return((None, principal))
+        raise gen.Return((status, None))
+
+
+def secure(security):
+    '''
+    A decorator checking security requirements before the handler method
+    runs. The principal is available as ``self.current_user``, rejected
+    requests are answered with ``401`` or ``403``. Requirements are
+    documented in the spec.
+
+    :param list security: requirements in the swagger form, an empty list
+                          makes the method public
+    '''
+    def decorator(method):
+        if not security:
+            wrapper = method
+        else:
+            @wraps(method)
+            @gen.coroutine
+            def wrapper(self, *args, **kwargs):
+                authorizer = self._restplus_api.authorizer
+                status, principal = yield authorizer.authorize(self, security)
+                if status is not None:
+                    self.set_status(status)
+                    self.finish({'message': responses[status]})
+                    return
+                self.current_user = principal
+                result = method(self, *args, **kwargs)
+                if is_awaitable(result):
+                    result = yield result
+                raise gen.Return(result)
+        wrapper = add_apidoc(wrapper, {'security': security})
+        wrapper.__security__ = security
+        return wrapper
+    return decorator
@@ -0,0 +1,184 @@
+'''
+Batch endpoint running many sub-requests in one round trip.
+
+The body of a batch request is a JSON array of sub-requests::
+
+    [{"method": "GET", "path": "/api/pets/1"},
+     {"method": "POST", "path": "/api/pets/", "body": {"name": "Rex"}}]
+
+Each sub-request is routed by the application to a resource of the api
+and executed in-process (no loopback HTTP call), all of them
+concurrently on the IOLoop. The response is an array of results in the
+same order::
+
+    [{"status": 200, "headers": {...}, "body": {...}}, ...]
+
+Sub-requests inherit headers of the batch request (eg. ``Authorization``
+or cookies), and may override them with ``headers``. A sub-request which
+does not finish in ``timeout`` seconds (eg. an event stream or a long
+poll) is closed like a disconnected client and answered with ``504``.
+'''
+import json
+from datetime import timedelta
+
+from tornado import gen
+from tornado.concurrent import Future
+from tornado.httputil import HTTPHeaders, HTTPServerRequest
+from tornado.web import RequestHandler
+
+from .marshalling import decode_json, write_data
+
+# Headers of the batch request which are not passed to sub-requests
+SKIP_REQUEST_HEADERS = frozenset(['Content-Length', 'Content-Type',
+                                  'Content-Encoding', 'Accept-Encoding',
+                                  'Transfer-Encoding', 'Expect'])
+# Headers of sub-responses which are not included in results
+SKIP_RESPONSE_HEADERS = frozenset(['Date', 'Server', 'Content-Length'])
+
+
+def _resolved():
+    future = Future()
+    future.set_result(None)
+    return future
+
+
+class SubRequestConnection(object):
+    '''
+    In-memory stand-in of the http connection of a sub-request, it keeps
+    the response and resolves :attr:`finished` when it is complete.
+    '''
+    def __init__(self):
+        self.status = None
+        self.headers = None
+        self.chunks = []
+        self.finished = Future()
+        self.closed = False
+        self._close_callback = None
+
+    def set_close_callback(self, callback):
+        self._close_callback = callback
+
+    def close(self):
+        '''
+        Drop the sub-request as if its client disconnected, the handler
+        is notified with ``on_connection_close``.
+        '''
+        if self.closed:
+            return
+        self.closed = True
+        callback, self._close_callback = self._close_callback, None
+        if callback is not None:
+            callback()
+
+    def write_headers(self, start_line, headers, chunk=None, callback=None):
+        self.status = start_line.code
+        self.headers = headers
+        return self.write(chunk, callback)
+
+    def write(self, chunk, callback=None):
+        if chunk and not self.closed:
+            self.chunks.append(chunk)
+        if callback is not None:
+            callback()
+        return _resolved()
+
+    def finish(self):
+        if not self.finished.done():
+            self.finished.set_result(None)
+
+    def result(self):
+        headers = dict((name, value) for name, value in self.headers.get_all()
+                       if name not in SKIP_RESPONSE_HEADERS)
+        body = b''.join(self.chunks)
+        if not body:
+            body = None
+        elif headers.get('Content-Type', '').startswith('application/json'):
+            body = decode_json(body)
+        else:
+            body = body.decode('utf-8', 'replace')
+        return {'status': self.status, 'headers': headers, 'body': body}
+
+
+def error(status, message):
+    return {'status': status, 'headers': {}, 'body': {'message': message}}
+
+
+class BatchHandler(RequestHandler):
+    '''
+    Runs sub-requests against resources of an :class:`Api`, see module
+    documentation.
+    '''
+    def initialize(self, api, max_requests=50, timeout=30):
+        self.api = api
+        self.max_requests = max_requests
+        self.timeout = timeout
+
+    @gen.coroutine
+    def post(self):
+        try:
+            items = decode_json(self.request.body)
+        except ValueError:
+            items = None
+        if not isinstance(items, list) or \
+                not all(isinstance(item, dict) for item in items):
+            self.set_status(400)
+            self.write({'message': 'Expected an array of sub-requests'})
+            return
+        if len(items) > self.max_requests:
+            self.set_status(400)
+            self.write({'message': 'Too many sub-requests (maximum {0})'
+                        .format(self.max_requests)})
+            return
+        results = yield [self.run(item) for item in items]
+        write_data(self, results)
+
+    def sub_request(self, item):
+        '''
+        Build :class:`HTTPServerRequest` of a sub-request.
+        '''
+        headers = HTTPHeaders()
+        for name, value in self.request.headers.get_all():
+            if name not in SKIP_REQUEST_HEADERS:
+                headers.add(name, value)
+        # Sub-responses are embedded in the batch response as JSON
+        headers['Accept'] = 'application/json'
+        body = item.get('body')
+        if body is not None:
+            body = json.dumps(body).encode('utf-8')
+            headers['Content-Type'] = 'application/json'
+        for name, value in (item.get('headers') or {}).items():
+            headers[name] = value
+        request = HTTPServerRequest(
+            method=item.get('method', 'GET').upper(), uri=item['path'],
+            version=self.request.version, headers=headers, body=body,
+            host=self.request.host, connection=SubRequestConnection())
+        request.remote_ip = self.request.remote_ip
+        request.protocol = self.request.protocol
+        return request
+
+    @gen.coroutine
+    def run(self, item):
+        '''
+        Execute a sub-request, returns its result.
+        '''
+        path = item.get('path')
+        if not hasattr(path, 'startswith') or not path.startswith('/'):
+            raise gen.Return(error(400, 'Invalid path'))
+        request = self.sub_request(item)
+        delegate = self.application.find_handler(request)
+        handler_class = delegate.handler_class
+        if getattr(handler_class, '_restplus_api', None) is not self.api or \
+                issubclass(handler_class, BatchHandler):
+            raise gen.Return(error(404, 'Not Found'))
+        handler = handler_class(self.application, request,
+                                **delegate.handler_kwargs)
+        # Transforms (eg. gzip) are left out, results are embedded
+        gen.convert_yielded(handler._execute([], *delegate.path_args,
+                                             **delegate.path_kwargs))
+        try:
+            yield gen.with_timeout(timedelta(seconds=self.timeout),
+                                   request.connection.finished)
+        except gen.TimeoutError:
+            request.connection.close()
+            raise gen.Return(error(504, 'Sub-request timed out'))
+        raise gen.Return(request.connection.result())
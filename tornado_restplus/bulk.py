@@ -0,0 +1,140 @@
+'''
+Bulk write endpoints.
+
+A bulk handler method takes a JSON array of items, validated in a single
+marshmallow ``many=True`` pass, and is called once with all valid items
+(``self.payload``), so it can store them in one round trip. It returns one
+result per item, the response is an array of per-item statuses in order
+of the request::
+
+    @ns.route('/pets/bulk')
+    class PetsBulk(RequestHandler):
+        @ns.bulk(PetSchema, code=201)
+        @gen.coroutine
+        def post(self):
+            ids = yield db.insert_many(self.payload)
+            raise gen.Return([{'id': id} for id in ids])
+
+    [{"status": 201, "data": {"id": 1}},
+     {"status": 400, "errors": {"name": ["Missing data for required field."]}},
+     {"status": 409, "message": "Duplicate"}]
+
+Results are serialized with ``result_schema`` (or returned as they are),
+a :class:`tornado.web.HTTPError` result marks a failed item. The response
+status is ``code`` when all items succeeded, ``207`` otherwise.
+'''
+from functools import wraps
+
+from tornado import gen
+from tornado.httputil import responses
+from tornado.web import HTTPError
+
+from .marshalling import (decode_json, dump, get_schema, is_awaitable, load,
+                          write_data)
+from .utils import add_apidoc
+
+
+def item_status(result, code, schema=None):
+    '''
+    Returns status of an item processed by a bulk handler.
+    '''
+    if isinstance(result, HTTPError):
+        return {'status': result.status_code,
+                'message': result.log_message or
+                responses.get(result.status_code, 'Unknown')}
+    status = {'status': code}
+    if result is not None:
+        status['data'] = dump(schema, result) if schema is not None \
+            else result
+    return status
+
+
+def bulk(schema, code=200, result_schema=None, max_items=1000,
+         max_size=10 * 1024 * 1024, atomic=False):
+    '''
+    A decorator for handler methods processing an array of items in a
+    single call, see module documentation. Requests larger than
+    ``max_size`` bytes or with more than ``max_items`` items are answered
+    with ``413``.
+
+    :param schema: marshmallow schema class or instance of a single item
+    :param int code: status of successfully processed items
+    :param result_schema: marshmallow schema of results of items
+    :param int max_items: maximum number of items of a request
+    :param int max_size: maximum size of request body in bytes
+    :param bool atomic: whether to reject the whole request (with ``400``
+                        and per-item errors) when any item is invalid,
+                        by default valid items are processed
+    '''
+    many_schema = get_schema(schema, many=True)
+    if result_schema is not None:
+        result_schema = get_schema(result_schema)
+
+    def decorator(method):
+        @wraps(method)
+        @gen.coroutine
+        def wrapper(self, *args, **kwargs):
+            if len(self.request.body) > max_size:
+                self.set_status(413)
+                self.write({'message': 'Request body too large (maximum {0} '
+                                       'bytes)'.format(max_size)})
+                return
+            try:
+                data = decode_json(self.request.body)
+            except ValueError:
+                data = None
+            if not isinstance(data, list):
+                self.set_status(400)
+                self.write({'message': 'Expected an array of items'})
+                return
+            if len(data) > max_items:
+                self.set_status(413)
+                self.write({'message': 'Too many items (maximum {0})'
+                            .format(max_items)})
+                return
+            loaded, errors = load(many_schema, data)
+            if errors and (atomic or not isinstance(errors, dict) or
+                           not all(isinstance(index, int)
+                                   for index in errors)):
+                self.set_status(400)
+                self.write({'message': 'Input payload validation failed',
+                            'errors': errors})
+                return
+            valid = [index for index in range(len(data))
+                     if index not in errors]
+            statuses = [{'status': 400, 'errors': errors[index]}
+                        if index in errors else None
+                        for index in range(len(data))]
+            self.payload = [loaded[index] for index in valid]
+            results = []
+            if self.payload:
+                results = method(self, *args, **kwargs)
+                if is_awaitable(results):
+                    results = yield results
+                if self._finished:
+                    return
+                if results is None:
+                    results = [None] * len(valid)
+                results = list(results)
+                if len(results) != len(valid):
+                    raise ValueError('Bulk handler returned {0} results for '
+                                     '{1} items'.format(len(results),
+                                                        len(valid)))
+            for index, result in zip(valid, results):
+                statuses[index] = item_status(result, code, result_schema)
+            failed = any(status['status'] != code for status in statuses)
+            write_data(self, statuses, 207 if failed else code)
+        return add_apidoc(wrapper, {
+            'parameters': [{
+                'name': 'payload', 'in': 'body', 'required': True,
+                'schema': {'type': 'array', 'items': schema,
+                           'maxItems': max_items},
+            }],
+            'responses': {
+                str(code): {'description': 'All items processed'},
+                '207': {'description': 'Status of each item, some failed'},
+                '400': {'description': 'Invalid payload'},
+                '413': {'description': 'Too many items or too large body'},
+            },
+        })
+    return decorator
@@ -0,0 +1,244 @@
+'''
+Response caching for GET handlers.
+
+Cached responses are stored in a backend. :class:`MemoryCache` is an
+in-process LRU bounded by the number of entries and their total size;
+shared stores can be plugged in by implementing :class:`CacheBackend`.
+'''
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from tornado import gen
+from tornado.concurrent import Future
+
+from .auth import credentials
+from .compression import handler_compression
+from .marshalling import is_awaitable, representation
+from .mask import MASK_HEADER
+
+# Headers which are not stored with cached responses
+SKIP_HEADERS = frozenset(['Date', 'Server', 'Content-Length', 'Set-Cookie'])
+
+
+class CachedResponse(object):
+    '''
+    Serialized response: status code, headers and body.
+    '''
+    __slots__ = ('status', 'headers', 'body')
+
+    def __init__(self, status, headers, body):
+        self.status = status
+        self.headers = headers
+        self.body = body
+
+    @property
+    def size(self):
+        return len(self.body) + sum(len(name) + len(value)
+                                    for name, value in self.headers)
+
+
+class CacheBackend(object):
+    '''
+    Interface of cache backends. Methods may return values directly or
+    futures resolving to them, so asynchronous (shared) stores can be
+    used.
+    '''
+    def get(self, key):
+        '''
+        Returns :class:`CachedResponse` stored under key or None.
+        '''
+        raise NotImplementedError()
+
+    def set(self, key, response, ttl):
+        '''
+        Store :class:`CachedResponse` under key for ttl seconds.
+        '''
+        raise NotImplementedError()
+
+    def delete_prefix(self, prefix):
+        '''
+        Remove all entries which keys start with prefix.
+        '''
+        raise NotImplementedError()
+
+
+class MemoryCache(CacheBackend):
+    '''
+    In-process LRU cache.
+
+    :param int max_entries: maximum number of stored responses
+    :param int max_bytes: maximum total size of stored responses
+    '''
+    def __init__(self, max_entries=1024, max_bytes=64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return None
+        expires, response = entry
+        if expires < time.time():
+            self.size -= response.size
+            return None
+        # Reinsert to mark as recently used
+        self._entries[key] = entry
+        return response
+
+    def set(self, key, response, ttl):
+        size = response.size
+        if size > self.max_bytes:
+            return
+        self._remove(key)
+        self._entries[key] = (time.time() + ttl, response)
+        self.size += size
+        while (len(self._entries) > self.max_entries or
+               self.size > self.max_bytes):
+            _, (_, evicted) = self._entries.popitem(last=False)
+            self.size -= evicted.size
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.size -= entry[1].size
+
+    def delete_prefix(self, prefix):
+        for key in [key for key in self._entries if key.startswith(prefix)]:
+            self._remove(key)
+
+    def clear(self):
+        self._entries.clear()
+        self.size = 0
+
+
+def write_cached(handler, response):
+    handler.set_status(response.status)
+    seen = set()
+    for name, value in response.headers:
+        # Replace defaults (eg. Content-Type), keep repeated headers
+        if name in seen:
+            handler.add_header(name, value)
+        else:
+            handler.set_header(name, value)
+            seen.add(name)
+    handler.write(response.body)
+
+
+def capture(handler):
+    '''
+    Returns :class:`CachedResponse` built out of what the handler has
+    written so far, or None when the response can't be cached (it is not
+    a ``200`` or was already flushed).
+    '''
+    if handler._finished or handler._headers_written or \
+            handler.get_status() != 200:
+        return None
+    headers = [(name, value) for name, value in handler._headers.get_all()
+               if name not in SKIP_HEADERS]
+    return CachedResponse(200, headers, b''.join(handler._write_buffer))
+
+
+def _default_key(handler):
+    # Responses to one uri differ by negotiated representation and fields
+    # mask (the query argument mask is a part of the uri)
+    key = '{0} {1}'.format(handler.request.uri, representation(handler)[0])
+    mask = handler.request.headers.get(MASK_HEADER)
+    return key + ' ' + mask if mask else key
+
+
+def has_credentials(handler):
+    '''
+    Returns whether the request carries credentials: ``Authorization``
+    header, cookies or credentials of a security scheme of the api the
+    handler is bound to. Responses to such requests may be user specific.
+    '''
+    headers = handler.request.headers
+    if 'Authorization' in headers or 'Cookie' in headers:
+        return True
+    api = getattr(handler, '_restplus_api', None)
+    if api is None:
+        return False
+    return any(credentials(handler, scheme) is not None
+               for scheme in api.authorizer.authorizations.values())
+
+
+def cached(backend, ttl, key=None, prefix=''):
+    '''
+    A decorator caching responses of a GET handler method.
+
+    Concurrent misses on the same key are coalesced, the method is run
+    once and other requests wait for its response. When the namespace of
+    the handler compresses responses, they are stored compressed (keyed
+    by content coding too).
+
+    The default key does not tell users apart, so requests carrying
+    credentials (see :func:`has_credentials`) bypass the cache. A custom
+    ``key`` caches them too, it has to include the user when responses
+    depend on it.
+
+    :param CacheBackend backend: the store for responses
+    :param float ttl: time to live of cached responses in seconds
+    :param callable key: function taking the handler and returning cache
+                         key, defaults to request uri and mediatype
+    :param str prefix: prefix of all keys (used for invalidation)
+    '''
+    bypass = has_credentials if key is None else None
+    key = key or _default_key
+    inflight = {}
+
+    def decorator(method):
+        @wraps(method)
+        @gen.coroutine
+        def wrapper(self, *args, **kwargs):
+            if bypass is not None and bypass(self):
+                result = method(self, *args, **kwargs)
+                if is_awaitable(result):
+                    result = yield result
+                raise gen.Return(result)
+            cache_key = prefix + key(self)
+            compression = handler_compression(self)
+            if compression is not None:
+                encoding = compression.encoding(self)
+                if encoding is not None:
+                    cache_key += ' ' + encoding
+            response = backend.get(cache_key)
+            if is_awaitable(response):
+                response = yield response
+            if response is None and cache_key in inflight:
+                response = yield inflight[cache_key]
+            if response is not None:
+                write_cached(self, response)
+                return
+
+            # Requests which waited for a response that could not be cached
+            # run the method too, only one of them owns the entry
+            future = None
+            if cache_key not in inflight:
+                future = inflight[cache_key] = Future()
+            response = None
+            try:
+                result = method(self, *args, **kwargs)
+                if is_awaitable(result):
+                    yield result
+                if compression is not None and not self._finished:
+                    compression.compress(self)
+                response = capture(self)
+                if response is not None:
+                    stored = backend.set(cache_key, response, ttl)
+                    if is_awaitable(stored):
+                        yield stored
+            finally:
+                if future is not None:
+                    if inflight.get(cache_key) is future:
+                        del inflight[cache_key]
+                    # Waiting requests run the method themselves if the
+                    # response could not be cached
+                    future.set_result(response)
+        return wrapper
+    return decorator
@@ -0,0 +1,131 @@
+'''
+Response compression policy.
+
+Unlike Tornado's ``compress_response`` setting (all or nothing), a
+:class:`Compression` is set per namespace and decides which algorithms
+are used, from which body size and with which level. Bodies are
+compressed once when the response is finished; cached responses are
+stored compressed, so cache hits are not compressed again.
+'''
+import gzip
+from collections import OrderedDict
+from io import BytesIO
+
+from .representations import parse_accept
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+
+def gzip_compress(data, level=6):
+    buf = BytesIO()
+    # mtime is fixed so that the compressed body is reproducible
+    with gzip.GzipFile(mode='wb', fileobj=buf, compresslevel=level,
+                       mtime=0) as f:
+        f.write(data)
+    return buf.getvalue()
+
+
+# Compressors keyed by content coding, with default and maximum level
+COMPRESSORS = OrderedDict()
+
+if brotli is not None:
+    def brotli_compress(data, level=4):
+        return brotli.compress(data, quality=level)
+    COMPRESSORS['br'] = (brotli_compress, 4, 11)
+
+COMPRESSORS['gzip'] = (gzip_compress, 6, 9)
+
+COMPRESSIBLE_TYPES = frozenset([
+    'application/json', 'application/javascript', 'application/xml',
+    'application/x-ndjson', 'application/x-msgpack', 'application/cbor',
+    'image/svg+xml',
+])
+
+
+def compressible(content_type):
+    content_type = content_type.split(';')[0].strip()
+    return content_type.startswith('text/') or \
+        content_type.endswith(('+json', '+xml')) or \
+        content_type in COMPRESSIBLE_TYPES
+
+
+class Compression(object):
+    '''
+    Compression policy of responses.
+
+    :param algorithms: content codings in order of preference, ``br``
+                       is left out when brotli is not installed
+    :param int min_size: minimum body size (in bytes) to compress
+    :param int level: compression level, by default 6 for gzip and 4
+                      for brotli (capped to the maximum of algorithm)
+    '''
+    def __init__(self, algorithms=('br', 'gzip'), min_size=1024, level=None):
+        unknown = set(algorithms) - set(['br', 'gzip'])
+        if unknown:
+            raise ValueError('Unknown compression algorithms: {0}'
+                             .format(', '.join(sorted(unknown))))
+        self.algorithms = [name for name in algorithms
+                           if name in COMPRESSORS]
+        self.min_size = min_size
+        self.levels = dict(
+            (name, default if level is None else min(level, maximum))
+            for name, (_, default, maximum) in COMPRESSORS.items())
+        self._negotiated = {}
+
+    def encoding(self, handler):
+        '''
+        Returns content coding of the response negotiated with
+        ``Accept-Encoding`` header, or None. Results are memoized per
+        header value.
+        '''
+        accept = handler.request.headers.get('Accept-Encoding')
+        if not accept:
+            return None
+        try:
+            return self._negotiated[accept]
+        except KeyError:
+            pass
+        accepted = parse_accept(accept)
+        encoding = None
+        for name in self.algorithms:
+            if name in accepted or '*' in accepted:
+                encoding = name
+                break
+        if len(self._negotiated) >= 1024:
+            self._negotiated.clear()
+        self._negotiated[accept] = encoding
+        return encoding
+
+    def compress(self, handler):
+        '''
+        Compress the body buffered by the handler in place, when the
+        response is compressible, large enough and not flushed yet.
+        '''
+        if handler._headers_written or \
+                'Content-Encoding' in handler._headers or \
+                handler.get_status() in (204, 304) or \
+                not compressible(handler._headers.get('Content-Type', '')):
+            return
+        body = b''.join(handler._write_buffer)
+        if len(body) < self.min_size:
+            return
+        handler.add_header('Vary', 'Accept-Encoding')
+        encoding = self.encoding(handler)
+        if encoding is None:
+            return
+        compressor = COMPRESSORS[encoding][0]
+        handler._write_buffer = [compressor(body, self.levels[encoding])]
+        handler.set_header('Content-Encoding', encoding)
+
+
+def handler_compression(handler):
+    '''
+    Returns :class:`Compression` of the namespace of a handler or None.
+    '''
+    namespace = getattr(handler, '_restplus_namespace', None)
+    if namespace is None:
+        return None
+    return namespace.compression
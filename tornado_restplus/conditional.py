@@ -0,0 +1,124 @@
+'''
+Conditional GET.
+
+Validators (ETag and Last-Modified) are computed by cheap functions
+provided by the handler, eg. from a row version or ``updated_at``
+column, and checked before the handler method runs, so ``304 Not
+Modified`` responses skip building and serializing the body. Tornado's
+own ETag hashes the finished body, it saves bandwidth but no CPU.
+'''
+import calendar
+import datetime
+import email.utils
+import numbers
+from functools import wraps
+
+from tornado import gen
+
+from .marshalling import is_awaitable
+from .utils import add_apidoc
+
+
+def format_etag(version, weak=False):
+    '''
+    Returns ETag header value of a version (any value convertible to str).
+    '''
+    etag = '"{0}"'.format(version)
+    return 'W/' + etag if weak else etag
+
+
+def to_datetime(value):
+    '''
+    Returns naive UTC datetime (truncated to seconds, the precision of
+    http dates) of a datetime or a POSIX timestamp.
+    '''
+    if isinstance(value, numbers.Number):
+        value = datetime.datetime.utcfromtimestamp(value)
+    elif value.utcoffset() is not None:
+        value = value.replace(tzinfo=None) - value.utcoffset()
+    return value.replace(microsecond=0)
+
+
+def modified_since(handler, last_modified):
+    '''
+    Returns False when ``If-Modified-Since`` request header is not older
+    than ``last_modified``.
+    '''
+    value = handler.request.headers.get('If-Modified-Since')
+    if not value:
+        return True
+    date = email.utils.parsedate(value)
+    if date is None:
+        return True
+    since = datetime.datetime.utcfromtimestamp(calendar.timegm(date))
+    return last_modified > since
+
+
+@gen.coroutine
+def _call(func, handler, args, kwargs):
+    value = func(handler, *args, **kwargs)
+    if is_awaitable(value):
+        value = yield value
+    raise gen.Return(value)
+
+
+def conditional(etag=None, last_modified=None, weak=False):
+    '''
+    A decorator for GET handler methods answering ``304 Not Modified``
+    before the method runs when the resource did not change.
+
+    Validator functions take the handler and path arguments of the
+    method, they may return a future. ``If-None-Match`` takes precedence
+    over ``If-Modified-Since``. Validators are sent with the response
+    (and Tornado does not hash the body to compute its own ETag).
+
+    :param callable etag: function returning resource version (eg. row
+                          version or hash), None when it is unknown
+    :param callable last_modified: function returning datetime or POSIX
+                                   timestamp of the last modification
+    :param bool weak: whether the ETag is weak
+    '''
+    if etag is None and last_modified is None:
+        raise ValueError('etag or last_modified function is required')
+
+    def decorator(method):
+        @wraps(method)
+        @gen.coroutine
+        def wrapper(self, *args, **kwargs):
+            safe = self.request.method in ('GET', 'HEAD')
+            not_modified = None
+            if etag is not None:
+                version = yield _call(etag, self, args, kwargs)
+                if version is not None:
+                    self.set_header('Etag', format_etag(version, weak))
+                    if safe and 'If-None-Match' in self.request.headers:
+                        not_modified = self.check_etag_header()
+            if last_modified is not None:
+                modified = yield _call(last_modified, self, args, kwargs)
+                if modified is not None:
+                    modified = to_datetime(modified)
+                    self.set_header('Last-Modified', modified)
+                    if safe and not_modified is None:
+                        not_modified = not modified_since(self, modified)
+            if not_modified:
+                self.set_status(304)
+                return
+            result = method(self, *args, **kwargs)
+            if is_awaitable(result):
+                result = yield result
+            raise gen.Return(result)
+        parameters = []
+        if etag is not None:
+            parameters.append({
+                'name': 'If-None-Match', 'in': 'header', 'type': 'string',
+                'description': 'ETag of the cached representation'})
+        if last_modified is not None:
+            parameters.append({
+                'name': 'If-Modified-Since', 'in': 'header',
+                'type': 'string',
+                'description': 'Date of the cached representation'})
+        return add_apidoc(wrapper, {
+            'parameters': parameters,
+            'responses': {'304': {'description': 'Not Modified'}},
+        })
+    return decorator
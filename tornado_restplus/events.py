@@ -0,0 +1,328 @@
+'''
+Server-Sent Events.
+
+An :class:`EventStream` resource pushes events of a topic to many
+subscribers over ``text/event-stream`` responses. Events of a topic are
+produced once, by the async iterator returned by :meth:`EventStream.events`,
+and fanned out to all subscribers of the topic::
+
+    @ns.route(r'/prices/(?P<symbol>[A-Z]+)')
+    class PriceStream(EventStream):
+        event_schema = PriceSchema
+        overflow = 'coalesce'
+
+        @classmethod
+        def events(cls, topic):
+            return price_feed(topic)
+
+The producer starts with the first subscriber and is closed when the last
+one leaves. Every event is serialized once and buffered per subscriber;
+buffers are bounded, so a subscriber that cannot keep up is either
+dropped (its response is finished, ``EventSource`` clients reconnect) or
+gets pending events coalesced, keeping only the latest event of each
+name.
+'''
+import logging
+from collections import OrderedDict, deque
+
+from tornado import gen
+from tornado.ioloop import IOLoop
+from tornado.iostream import StreamClosedError
+from tornado.locks import Event as _Event
+from tornado.web import RequestHandler
+
+from .marshalling import _StopAsyncIteration, dump, get_schema, json_encoder
+from .utils import add_apidoc
+
+log = logging.getLogger(__name__)
+
+DROP = 'drop'
+COALESCE = 'coalesce'
+
+_END = object()
+
+
+class Event(object):
+    '''
+    An event with optional name (``event`` field) and id, producers may
+    yield plain data instead.
+    '''
+    __slots__ = ('data', 'event', 'id')
+
+    def __init__(self, data, event=None, id=None):
+        self.data = data
+        self.event = event
+        self.id = id
+
+
+def format_event(data, event=None, id=None):
+    '''
+    Returns an event in the ``text/event-stream`` format.
+
+    :param str data: serialized data, it may span several lines
+    '''
+    lines = []
+    if event is not None:
+        lines.append('event: {0}'.format(event))
+    if id is not None:
+        lines.append('id: {0}'.format(id))
+    lines.extend('data: ' + line for line in data.split('\n'))
+    return ('\n'.join(lines) + '\n\n').encode('utf-8')
+
+
+class Subscriber(object):
+    '''
+    Bounded buffer of serialized events of a single client.
+
+    :param int max_buffer: maximum number of pending events
+    :param str overflow: ``'drop'`` to close the subscriber when the
+                         buffer is full, ``'coalesce'`` to replace pending
+                         events of the same name (and discard the oldest
+                         ones when still full)
+    '''
+    def __init__(self, max_buffer=100, overflow=DROP):
+        if overflow not in (DROP, COALESCE):
+            raise ValueError('Unknown overflow policy: {0}'.format(overflow))
+        self.max_buffer = max_buffer
+        self.overflow = overflow
+        self.buffer = OrderedDict() if overflow == COALESCE else deque()
+        self.closed = False
+        self.dropped = False
+        self.coalesced = 0
+        self._ready = _Event()
+
+    def put(self, name, chunk):
+        if self.closed:
+            return
+        if self.overflow == COALESCE:
+            # Unnamed events are never replaced
+            key = name if name is not None else object()
+            if self.buffer.pop(key, None) is not None:
+                self.coalesced += 1
+            self.buffer[key] = chunk
+            while len(self.buffer) > self.max_buffer:
+                self.buffer.popitem(last=False)
+                self.coalesced += 1
+        elif len(self.buffer) >= self.max_buffer:
+            self.dropped = True
+            self.close()
+            return
+        else:
+            self.buffer.append(chunk)
+        self._ready.set()
+
+    def close(self):
+        self.closed = True
+        self._ready.set()
+
+    @gen.coroutine
+    def get(self, timeout=None):
+        '''
+        Wait for pending events (at most ``timeout`` seconds), returns
+        them all, an empty list on timeout or when the subscriber is
+        closed.
+        '''
+        if not self.buffer and not self.closed:
+            try:
+                yield self._ready.wait(
+                    None if timeout is None else
+                    IOLoop.current().time() + timeout)
+            except gen.TimeoutError:
+                pass
+        if self.overflow == COALESCE:
+            chunks = list(self.buffer.values())
+        else:
+            chunks = list(self.buffer)
+        self.buffer.clear()
+        self._ready.clear()
+        raise gen.Return(chunks)
+
+
+class Topic(object):
+    '''
+    A producer of events fanned out to subscribers.
+
+    :param iterator: async iterator (or iterator) of events or data
+    :param encode: function serializing event data to text
+    '''
+    def __init__(self, iterator, encode):
+        self.iterator = iterator
+        self.encode = encode
+        self.subscribers = set()
+        self.closed = False
+
+    def publish(self, item):
+        if not self.subscribers:
+            return
+        if not isinstance(item, Event):
+            item = Event(item)
+        chunk = format_event(self.encode(item.data), item.event, item.id)
+        for subscriber in list(self.subscribers):
+            subscriber.put(item.event, chunk)
+            if subscriber.closed:
+                self.subscribers.discard(subscriber)
+
+    @gen.coroutine
+    def _next(self):
+        if hasattr(self.iterator, '__anext__'):
+            try:
+                item = yield self.iterator.__anext__()
+            except _StopAsyncIteration:
+                item = _END
+        else:
+            item = next(self.iterator, _END)
+        raise gen.Return(item)
+
+    @gen.coroutine
+    def run(self):
+        try:
+            while not self.closed:
+                item = yield self._next()
+                if item is _END:
+                    break
+                self.publish(item)
+        except Exception:
+            log.exception('Producer of events failed')
+        finally:
+            self.closed = True
+            for subscriber in self.subscribers:
+                subscriber.close()
+            self.subscribers.clear()
+            aclose = getattr(self.iterator, 'aclose', None)
+            if aclose is not None:
+                yield gen.convert_yielded(aclose())
+
+
+class Hub(object):
+    '''
+    Topics keyed by producer and topic, each with a single producer
+    running while it has subscribers.
+    '''
+    def __init__(self):
+        self.topics = {}
+
+    def subscribe(self, key, factory, subscriber):
+        '''
+        Add a subscriber of a topic, the producer is created by ``factory``
+        (returning a :class:`Topic`) and started when the topic is new.
+        '''
+        topic = self.topics.get(key)
+        if topic is None or topic.closed:
+            topic = self.topics[key] = factory()
+            topic.subscribers.add(subscriber)
+            future = topic.run()
+            IOLoop.current().add_future(
+                future, lambda future: self._remove(key, topic))
+        else:
+            topic.subscribers.add(subscriber)
+        return topic
+
+    def unsubscribe(self, key, subscriber):
+        topic = self.topics.get(key)
+        if topic is None:
+            return
+        topic.subscribers.discard(subscriber)
+        if not topic.subscribers:
+            # The producer stops before producing the next event
+            topic.closed = True
+            self._remove(key, topic)
+
+    def _remove(self, key, topic):
+        if self.topics.get(key) is topic:
+            del self.topics[key]
+
+
+class EventStream(RequestHandler):
+    '''
+    Base of Server-Sent Events resources, see module documentation.
+    Subclasses implement :meth:`events` and may override :meth:`topic`.
+    '''
+    hub = Hub()
+    #: marshmallow schema of event data
+    event_schema = None
+    #: maximum number of events pending per subscriber
+    max_buffer = 100
+    #: ``'drop'`` or ``'coalesce'`` slow subscribers
+    overflow = DROP
+    #: seconds between keep-alive comments
+    keepalive = 15
+
+    @classmethod
+    def events(cls, topic):
+        '''
+        Returns async iterator (or iterator) of events of a topic, as
+        :class:`Event` or data. It is called once per topic, for its first
+        subscriber, so it must not depend on the request.
+        '''
+        raise NotImplementedError()
+
+    def topic(self, *args, **kwargs):
+        '''
+        Returns topic of the request, by default the path arguments.
+        '''
+        return args + tuple(sorted(kwargs.items()))
+
+    @classmethod
+    def apidoc(cls, method):
+        if method != 'get':
+            return None
+        response = {'description': 'Stream of server-sent events'}
+        if cls.event_schema is not None:
+            response['schema'] = cls.event_schema
+        return {'produces': ['text/event-stream'],
+                'responses': {'200': response}}
+
+    def _topic(self):
+        schema = get_schema(self.event_schema) \
+            if self.event_schema is not None else None
+        encoder = json_encoder(self)
+
+        def encode(data):
+            if schema is not None:
+                data = dump(schema, data)
+            data = encoder(data)
+            return data.decode('utf-8') if isinstance(data, bytes) else data
+
+        topic = self.topic(*self.path_args, **self.path_kwargs)
+        events = self.events(topic)
+        if hasattr(events, '__aiter__'):
+            events = events.__aiter__()
+        else:
+            events = iter(events)
+        return Topic(events, encode)
+
+    def on_connection_close(self):
+        subscriber = getattr(self, '_subscriber', None)
+        if subscriber is not None:
+            subscriber.close()
+
+    @gen.coroutine
+    def get(self, *args, **kwargs):
+        key = (self.events.__func__, self.topic(*args, **kwargs))
+        subscriber = self._subscriber = Subscriber(self.max_buffer,
+                                                   self.overflow)
+        self.set_header('Content-Type', 'text/event-stream')
+        self.set_header('Cache-Control', 'no-cache')
+        self.set_header('X-Accel-Buffering', 'no')
+        self.hub.subscribe(key, self._topic, subscriber)
+        try:
+            yield self.flush()
+            while True:
+                chunks = yield subscriber.get(self.keepalive)
+                if chunks:
+                    self.write(b''.join(chunks))
+                elif subscriber.closed:
+                    break
+                else:
+                    self.write(b': keep-alive\n\n')
+                yield self.flush()
+        except StreamClosedError:
+            subscriber.close()
+        finally:
+            self.hub.unsubscribe(key, subscriber)
+
+
+add_apidoc(EventStream.get, {
+    'description': 'Events are sent as they are produced, slow clients are '
+                   'dropped or get events coalesced.',
+})
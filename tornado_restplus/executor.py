@@ -0,0 +1,105 @@
+'''
+Running blocking code outside of the IOLoop.
+'''
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import wraps
+
+from tornado import gen
+from tornado.web import HTTPError
+
+
+class QueueFull(Exception):
+    pass
+
+
+class BoundedExecutor(object):
+    '''
+    Thread or process pool with bounded size and visible queue depth.
+
+    :param int max_workers: size of the pool
+    :param int max_queue: maximum number of calls waiting for a worker,
+                          unbounded if None
+    :param executor_class: :class:`concurrent.futures.ThreadPoolExecutor`
+                           or :class:`concurrent.futures.ProcessPoolExecutor`
+    '''
+    def __init__(self, max_workers=4, max_queue=None,
+                 executor_class=ThreadPoolExecutor):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.executor = executor_class(max_workers)
+        self.pending = 0
+        self._lock = threading.Lock()
+
+    @property
+    def processes(self):
+        return isinstance(self.executor, ProcessPoolExecutor)
+
+    @property
+    def queued(self):
+        '''
+        Number of calls waiting for a free worker.
+        '''
+        return max(self.pending - self.max_workers, 0)
+
+    def stats(self):
+        return {
+            'max_workers': self.max_workers,
+            'max_queue': self.max_queue,
+            'pending': self.pending,
+            'queued': self.queued,
+        }
+
+    def _done(self, future):
+        with self._lock:
+            self.pending -= 1
+
+    def submit(self, fn, *args, **kwargs):
+        '''
+        Schedule a call, for process pools fn and arguments have to be
+        picklable.
+
+        :raises QueueFull: when ``max_queue`` calls are already waiting
+        :returns concurrent.futures.Future: future of the result
+        '''
+        with self._lock:
+            if self.max_queue is not None and \
+                    self.pending >= self.max_workers + self.max_queue:
+                raise QueueFull()
+            self.pending += 1
+        future = self.executor.submit(fn, *args, **kwargs)
+        future.add_done_callback(self._done)
+        return future
+
+    def shutdown(self, wait=True):
+        self.executor.shutdown(wait=wait)
+
+
+def run_in_executor(executor):
+    '''
+    A decorator running synchronous handler method on a thread pool
+    executor and awaiting its result on the IOLoop. Responds with
+    ``503 Service Unavailable`` when the executor queue is full.
+
+    The method runs outside of the IOLoop thread, it should only compute
+    and return the result (eg. for :meth:`Namespace.marshal_with`) instead
+    of flushing or finishing the response.
+
+    :param BoundedExecutor executor: a thread based executor
+    '''
+    if executor.processes:
+        raise TypeError('Handler methods can not be run in a process pool, '
+                        'submit picklable functions to the executor instead')
+
+    def decorator(method):
+        @wraps(method)
+        @gen.coroutine
+        def wrapper(self, *args, **kwargs):
+            try:
+                future = executor.submit(method, self, *args, **kwargs)
+            except QueueFull:
+                raise HTTPError(503, 'Executor queue is full')
+            result = yield future
+            raise gen.Return(result)
+        return wrapper
+    return decorator
@@ -0,0 +1,270 @@
+'''
+Long running jobs.
+
+A job route accepts work with ``POST`` and answers right away with
+``202 Accepted`` and the url of the job status (in ``Location`` header
+and the body), which clients poll with ``GET`` until the job is done::
+
+    {"id": "6f1c...", "status": "pending", "status_url": "/reports/6f1c..."}
+    {"id": "6f1c...", "status": "succeeded", "result": {...}}
+
+Synchronous job functions run on a :class:`BoundedExecutor` (thread or
+process pool), coroutine functions on the IOLoop. Jobs are kept in a
+bounded in-process :class:`JobStore`, finished ones expire after a TTL.
+'''
+import inspect
+import logging
+import time
+import uuid
+from collections import OrderedDict
+
+from marshmallow import Schema, fields
+from tornado import gen
+from tornado.ioloop import IOLoop
+from tornado.web import RequestHandler
+
+from .executor import QueueFull
+from .marshalling import decode_json, dump, get_schema, load, write_data
+from .utils import add_apidoc, is_coroutine_function
+
+log = logging.getLogger(__name__)
+
+PENDING = 'pending'
+SUCCEEDED = 'succeeded'
+FAILED = 'failed'
+
+
+class Job(object):
+    __slots__ = ('id', 'status', 'result', 'error', 'expires')
+
+    def __init__(self, job_id):
+        self.id = job_id
+        self.status = PENDING
+        self.result = None
+        self.error = None
+        self.expires = None
+
+
+class JobStore(object):
+    '''
+    In-process store of jobs. Finished jobs are kept for ``ttl`` seconds,
+    when the store is full the oldest finished job is dropped, new jobs
+    are rejected when all kept jobs are pending.
+
+    :param int max_jobs: maximum number of kept jobs
+    :param float ttl: time to live of finished jobs in seconds
+    '''
+    def __init__(self, max_jobs=1024, ttl=3600):
+        self.max_jobs = max_jobs
+        self.ttl = ttl
+        self._jobs = OrderedDict()
+
+    def __len__(self):
+        return len(self._jobs)
+
+    def _expire(self):
+        now = time.time()
+        for job in list(self._jobs.values()):
+            if job.expires is not None and job.expires < now:
+                del self._jobs[job.id]
+
+    def create(self):
+        '''
+        Returns a new pending job.
+
+        :raises QueueFull: when the store is full of pending jobs
+        '''
+        if len(self._jobs) >= self.max_jobs:
+            self._expire()
+        if len(self._jobs) >= self.max_jobs:
+            finished = next((job for job in self._jobs.values()
+                             if job.status != PENDING), None)
+            if finished is None:
+                raise QueueFull()
+            del self._jobs[finished.id]
+        job = Job(uuid.uuid4().hex)
+        self._jobs[job.id] = job
+        return job
+
+    def get(self, job_id):
+        job = self._jobs.get(job_id)
+        if job is not None and job.expires is not None and \
+                job.expires < time.time():
+            del self._jobs[job_id]
+            return None
+        return job
+
+    def discard(self, job_id):
+        self._jobs.pop(job_id, None)
+
+    def finish(self, job, result=None, error=None):
+        job.status = FAILED if error is not None else SUCCEEDED
+        job.result = result
+        job.error = error
+        job.expires = time.time() + self.ttl
+
+
+class JobSchema(Schema):
+    id = fields.Str()
+    status = fields.Str()
+    status_url = fields.Str()
+    result = fields.Raw()
+    error = fields.Str()
+
+
+def job_schema(name, result_schema=None):
+    '''
+    Returns schema of job status with result serialized by
+    ``result_schema`` (a schema class or instance).
+    '''
+    if result_schema is None:
+        return JobSchema
+    return type('{0}JobSchema'.format(name), (JobSchema, ),
+                {'result': fields.Nested(result_schema)})
+
+
+class JobRoute(object):
+    '''
+    A job: its function, where it runs and where it is stored.
+
+    :param callable func: the job function taking the loaded payload
+    :param BoundedExecutor executor: executor of synchronous functions
+    :param JobStore store: the store of jobs
+    :param schema: schema loading the payload or None for raw JSON
+    :param status_schema: schema of job status
+    '''
+    def __init__(self, func, executor, store, schema, status_schema):
+        self.func = func
+        self.executor = executor
+        self.store = store
+        self.schema = get_schema(schema) if schema is not None else None
+        self.status_schema = get_schema(status_schema)
+        self.coroutine = is_coroutine_function(func)
+
+    def run(self, payload):
+        if self.coroutine:
+            return gen.convert_yielded(self.func(payload))
+        return self.executor.submit(self.func, payload)
+
+    @gen.coroutine
+    def execute(self, job, future):
+        try:
+            result = yield future
+        except Exception as err:
+            log.exception('Job %s failed', job.id)
+            self.store.finish(job, error=str(err) or type(err).__name__)
+        else:
+            self.store.finish(job, result=result)
+
+
+class JobSubmitHandler(RequestHandler):
+    '''
+    Submits jobs of :attr:`job`, bound subclasses are created by
+    :meth:`Namespace.job`.
+    '''
+    job = None
+
+    def post(self):
+        job_route = self.job
+        try:
+            data = decode_json(self.request.body) if self.request.body \
+                else None
+        except ValueError:
+            self.set_status(400)
+            self.write({'message': 'Failed to decode JSON object'})
+            return
+        payload = data
+        if job_route.schema is not None:
+            payload, errors = load(job_route.schema, data)
+            if errors:
+                self.set_status(400)
+                self.write({'message': 'Input payload validation failed',
+                            'errors': errors})
+                return
+        try:
+            job = job_route.store.create()
+        except QueueFull:
+            job = None
+        if job is not None:
+            try:
+                future = job_route.run(payload)
+            except QueueFull:
+                job_route.store.discard(job.id)
+                job = None
+        if job is None:
+            self.set_status(503)
+            self.write({'message': 'Too many pending jobs'})
+            return
+        IOLoop.current().add_callback(job_route.execute, job, future)
+        status_url = '{0}/{1}'.format(self.request.path.rstrip('/'), job.id)
+        self.set_header('Location', status_url)
+        write_data(self, {'id': job.id, 'status': job.status,
+                          'status_url': status_url}, 202)
+
+
+class JobStatusHandler(RequestHandler):
+    '''
+    Reports status (and result) of jobs of :attr:`job`.
+    '''
+    job = None
+
+    def get(self, job_id):
+        job = self.job.store.get(job_id)
+        if job is None:
+            self.set_status(404)
+            self.write({'message': 'Job not found'})
+            return
+        status = {'id': job.id, 'status': job.status}
+        if job.status == SUCCEEDED:
+            status['result'] = job.result
+        elif job.status == FAILED:
+            status['error'] = job.error
+        write_data(self, dump(self.job.status_schema, status))
+
+
+def job_handlers(func, executor, store, schema=None, result_schema=None):
+    '''
+    Returns submit and status handler classes of a job function, with
+    their operations documented.
+    '''
+    name = ''.join(part.title() for part in func.__name__.split('_'))
+    status_schema = job_schema(name, result_schema)
+    job_route = JobRoute(func, executor, store, schema, status_schema)
+    summary = (inspect.getdoc(func) or 'Submit {0} job'.format(
+        func.__name__)).split('\n')[0]
+
+    # Operations are documented per job, so the handlers get their own
+    # methods instead of documenting the shared ones
+    def post(self):
+        return JobSubmitHandler.post(self)
+
+    def get(self, job_id):
+        return JobStatusHandler.get(self, job_id)
+
+    add_apidoc(post, {
+        'summary': summary,
+        'description': 'Submit a job, its status is available at '
+                       '``status_url``',
+        'responses': {
+            '202': {'description': 'Job accepted', 'schema': status_schema},
+            '400': {'description': 'Invalid payload'},
+            '503': {'description': 'Too many pending jobs'},
+        },
+    })
+    add_apidoc(get, {
+        'summary': 'Status of {0} job'.format(func.__name__),
+        'parameters': [{'name': 'job_id', 'in': 'path', 'type': 'string',
+                        'required': True}],
+        'responses': {
+            '200': {'description': 'Job status, with result when it '
+                                   'succeeded', 'schema': status_schema},
+            '404': {'description': 'Unknown or expired job'},
+        },
+    })
+    submit = type('{0}JobHandler'.format(name), (JobSubmitHandler, ),
+                  {'job': job_route, 'post': post,
+                   '__module__': func.__module__})
+    status = type('{0}JobStatusHandler'.format(name), (JobStatusHandler, ),
+                  {'job': job_route, 'get': get,
+                   '__module__': func.__module__})
+    return submit, status
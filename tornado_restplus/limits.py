@@ -0,0 +1,176 @@
+'''
+Request rate and concurrency limits.
+
+Limits are checked before the handler method runs, requests over the
+limit are rejected right away with ``429 Too Many Requests`` (rate) or
+``503 Service Unavailable`` (concurrency).
+'''
+import math
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from tornado import gen
+from tornado.httputil import responses
+
+from .marshalling import is_awaitable
+
+try:
+    _now = time.monotonic
+except AttributeError:  # python 2
+    _now = time.time
+
+
+def client_ip(handler):
+    return handler.request.remote_ip
+
+
+class RateLimitBackend(object):
+    '''
+    Interface of token bucket stores. ``consume`` may return a future, so
+    shared (eg. network) stores can be used.
+    '''
+    def consume(self, key, rate, burst):
+        '''
+        Take a token from the bucket of given key.
+
+        :param str key: the bucket key
+        :param float rate: tokens added per second
+        :param int burst: bucket capacity
+        :returns: None if the token was taken, otherwise number of
+                  seconds until a token is available
+        '''
+        raise NotImplementedError()
+
+
+class MemoryRateLimitBackend(RateLimitBackend):
+    '''
+    In-process token buckets. Each bucket is a ``[tokens, timestamp]``
+    pair, the least recently used ones are dropped above ``max_keys``
+    (a dropped bucket starts full again).
+
+    :param int max_keys: maximum number of kept buckets
+    '''
+    def __init__(self, max_keys=65536):
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()
+
+    def __len__(self):
+        return len(self._buckets)
+
+    def consume(self, key, rate, burst):
+        now = _now()
+        bucket = self._buckets.pop(key, None)
+        if bucket is None:
+            bucket = [burst, now]
+        else:
+            bucket[0] = min(burst, bucket[0] + (now - bucket[1]) * rate)
+            bucket[1] = now
+        self._buckets[key] = bucket
+        if len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        if bucket[0] >= 1:
+            bucket[0] -= 1
+            return None
+        return (1 - bucket[0]) / rate
+
+
+class RateLimit(object):
+    '''
+    Token bucket rate limit.
+
+    :param float rate: allowed requests per second
+    :param int burst: bucket capacity, defaults to ``rate`` (at least 1)
+    :param callable key: function taking the handler and returning limit
+                         key, defaults to client ip
+    :param RateLimitBackend backend: bucket store, in-process by default
+    '''
+    status = 429
+
+    def __init__(self, rate, burst=None, key=None, backend=None):
+        self.rate = float(rate)
+        self.burst = burst if burst is not None else max(int(rate), 1)
+        self.key = key or client_ip
+        self.backend = backend or MemoryRateLimitBackend()
+
+    def acquire(self, handler):
+        '''
+        :returns: None when allowed, otherwise seconds to wait (or a
+                  future of it for asynchronous backends)
+        '''
+        return self.backend.consume(self.key(handler), self.rate, self.burst)
+
+    def release(self, handler):
+        pass
+
+
+class ConcurrencyLimit(object):
+    '''
+    Limit of concurrent in-flight requests, kept in-process.
+
+    :param int max_concurrent: maximum number of requests being handled
+    :param callable key: function taking the handler and returning limit
+                         key, by default all requests share the limit
+    '''
+    status = 503
+
+    def __init__(self, max_concurrent, key=None):
+        self.max_concurrent = max_concurrent
+        self.key = key or (lambda handler: None)
+        self.inflight = {}
+
+    def acquire(self, handler):
+        key = self.key(handler)
+        count = self.inflight.get(key, 0)
+        if count >= self.max_concurrent:
+            return 0
+        self.inflight[key] = count + 1
+        return None
+
+    def release(self, handler):
+        key = self.key(handler)
+        count = self.inflight[key] - 1
+        if count:
+            self.inflight[key] = count
+        else:
+            # Idle keys are dropped to keep the table small
+            del self.inflight[key]
+
+
+def reject(handler, limit, wait):
+    handler.set_status(limit.status)
+    if wait:
+        handler.set_header('Retry-After', str(int(math.ceil(wait))))
+    handler.finish({'message': responses[limit.status]})
+
+
+def limit(*limits):
+    '''
+    A decorator checking limits before the handler method runs.
+
+    :param limits: :class:`RateLimit` and :class:`ConcurrencyLimit`
+                   instances
+    '''
+    def decorator(method):
+        @wraps(method)
+        @gen.coroutine
+        def wrapper(self, *args, **kwargs):
+            acquired = []
+            try:
+                for item in limits:
+                    wait = item.acquire(self)
+                    if is_awaitable(wait):
+                        wait = yield wait
+                    if wait is not None:
+                        reject(self, item, wait)
+                        return
+                    acquired.append(item)
+                result = method(self, *args, **kwargs)
+                if is_awaitable(result):
+                    result = yield result
+                raise gen.Return(result)
+            finally:
+                for item in acquired:
+                    item.release(self)
+        return wrapper
+    return decorator
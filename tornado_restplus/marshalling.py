@@ -0,0 +1,288 @@
+import json
+import sys
+from functools import wraps
+
+from marshmallow import ValidationError
+from tornado import gen
+from tornado.web import HTTPError
+
+from .mask import MASK_APIDOC, MaskError, apply_mask
+from .representations import DEFAULT_REPRESENTATIONS, output_json
+from .utils import add_apidoc
+
+# json.loads accepts bytes on python 2 and python>=3.6
+_LOADS_BYTES = sys.version_info < (3, ) or sys.version_info >= (3, 6)
+
+try:
+    _StopAsyncIteration = StopAsyncIteration
+except NameError:  # python 2
+    _StopAsyncIteration = None
+
+_schemas = {}
+
+
+def get_schema(schema, many=False):
+    '''
+    Returns cached schema instance.
+
+    Schema classes are instantiated once (per ``many``) and shared by all
+    routes using them, instances are returned as they are.
+
+    :param schema: marshmallow schema class or instance
+    :param bool many: whether the schema (de)serializes collections
+    '''
+    if not isinstance(schema, type):
+        return schema
+    key = (schema, many)
+    if key not in _schemas:
+        _schemas[key] = schema(many=many)
+    return _schemas[key]
+
+
+def decode_json(body):
+    '''
+    Decode JSON request body, straight from bytes where json supports it.
+
+    :param bytes body: the request body
+    :raises ValueError: when body is not a valid JSON document
+    '''
+    if not _LOADS_BYTES:
+        body = body.decode('utf-8')
+    return json.loads(body)
+
+
+def load(schema, data):
+    '''
+    Deserialize and validate data with a marshmallow schema.
+
+    :returns tuple: deserialized data and a dict of errors (empty if valid)
+    '''
+    try:
+        result = schema.load(data)
+    except ValidationError as err:
+        return getattr(err, 'valid_data', None), err.messages
+    # marshmallow 2 returns UnmarshalResult instead of raising
+    if hasattr(result, 'errors'):
+        return result.data, result.errors
+    return result, {}
+
+
+def dump(schema, obj):
+    '''
+    Serialize object with a marshmallow schema.
+    '''
+    result = schema.dump(obj)
+    # marshmallow 2 returns MarshalResult
+    if hasattr(result, 'errors'):
+        return result.data
+    return result
+
+
+def representation(handler):
+    '''
+    Returns mediatype and encoder used for responses of given handler,
+    negotiated with ``Accept`` header among representations of the api
+    the handler is bound to.
+
+    :returns tuple: mediatype and encoder
+    :raises HTTPError: ``406 Not Acceptable`` when no representation is
+                       acceptable and the api has no default mediatype
+    '''
+    api = getattr(handler, '_restplus_api', None)
+    if api is None:
+        return DEFAULT_REPRESENTATIONS[0]
+    mediatype = api.negotiate(handler.request.headers.get('Accept'))
+    if mediatype is None:
+        raise HTTPError(406)
+    if len(api.representations) > 1:
+        handler.add_header('Vary', 'Accept')
+    return mediatype, api.representations[mediatype]
+
+
+def json_encoder(handler):
+    '''
+    Returns JSON encoder of the api the handler is bound to.
+    '''
+    api = getattr(handler, '_restplus_api', None)
+    if api is None:
+        return output_json
+    return api.representations.get('application/json', output_json)
+
+
+def write_data(handler, data, code=200):
+    '''
+    Encode data with handler's representation and write it as a response.
+    '''
+    mediatype, encoder = representation(handler)
+    handler.set_status(code)
+    handler.set_header('Content-Type', mediatype)
+    handler.write(encoder(data))
+
+
+def masked_schema(handler, schema):
+    '''
+    Returns the schema restricted by the fields mask requested by the
+    client. Invalid masks are answered with ``400 Bad Request`` and None
+    is returned.
+    '''
+    try:
+        return apply_mask(handler, schema)
+    except MaskError as err:
+        handler.set_status(400)
+        handler.write({'message': 'Invalid mask: {0}'.format(err)})
+
+
+def is_awaitable(obj):
+    return gen.is_future(obj) or hasattr(obj, '__await__')
+
+
+def expect(schema, many=False, validate=True):
+    '''
+    A decorator for handler methods which decodes JSON request body and
+    loads it with a marshmallow schema before the method runs.
+
+    Loaded data is available as ``self.payload``. When validation is
+    enabled, invalid requests are answered with ``400 Bad Request``
+    and a description of errors, without calling the method.
+
+    :param schema: marshmallow schema class or instance
+    :param bool many: whether the body is a collection
+    :param bool validate: whether to reject invalid payloads
+    '''
+    schema = get_schema(schema, many=many)
+
+    def decorator(method):
+        @wraps(method)
+        def wrapper(self, *args, **kwargs):
+            try:
+                data = decode_json(self.request.body)
+            except ValueError:
+                self.set_status(400)
+                self.write({'message': 'Failed to decode JSON object'})
+                return
+            payload, errors = load(schema, data)
+            if validate and errors:
+                self.set_status(400)
+                self.write({'message': 'Input payload validation failed',
+                            'errors': errors})
+                return
+            self.payload = payload
+            return method(self, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def marshal_with(schema, code=200, many=False, mask=True):
+    '''
+    A decorator for handler methods which serializes returned object with
+    a marshmallow schema and writes encoded bytes as the response.
+
+    Methods may be coroutines. Nothing is written when the method finished
+    the request itself.
+
+    :param schema: marshmallow schema class or instance
+    :param int code: the response status code
+    :param bool many: whether returned object is a collection
+    :param bool mask: whether to serialize only fields requested with
+                      a fields mask (see :mod:`mask`)
+    '''
+    schema = get_schema(schema, many=many)
+
+    def decorator(method):
+        @wraps(method)
+        @gen.coroutine
+        def wrapper(self, *args, **kwargs):
+            response_schema = masked_schema(self, schema) if mask else schema
+            if response_schema is None:
+                return
+            result = method(self, *args, **kwargs)
+            if is_awaitable(result):
+                result = yield result
+            if not self._finished:
+                write_data(self, dump(response_schema, result), code)
+        return add_apidoc(wrapper, MASK_APIDOC) if mask else wrapper
+    return decorator
+
+
+@gen.coroutine
+def write_stream(handler, schema, items, ndjson=False, chunk_size=100):
+    '''
+    Serialize items one by one and write them as a JSON array (or newline
+    delimited JSON), flushing every ``chunk_size`` items, so the whole
+    collection is never kept in memory.
+
+    :param RequestHandler handler: the handler to write to
+    :param schema: marshmallow schema instance for a single item
+    :param items: an iterable or async iterable of items
+    :param bool ndjson: whether to write newline delimited JSON
+    :param int chunk_size: number of items written between flushes
+    '''
+    # Items are framed as JSON, so streams are not negotiated
+    encoder = json_encoder(handler)
+    if ndjson:
+        handler.set_header('Content-Type', 'application/x-ndjson')
+        separator, end = b'\n', b'\n'
+    else:
+        handler.set_header('Content-Type', 'application/json')
+        separator, end = b',', b']'
+        handler.write(b'[')
+
+    if hasattr(items, '__aiter__'):
+        iterator = items.__aiter__()
+    else:
+        iterator = iter(items)
+    count = 0
+    while True:
+        if hasattr(iterator, '__anext__'):
+            try:
+                item = yield iterator.__anext__()
+            except _StopAsyncIteration:
+                break
+        else:
+            try:
+                item = next(iterator)
+            except StopIteration:
+                break
+        if count:
+            handler.write(separator)
+        handler.write(encoder(dump(schema, item)))
+        count += 1
+        if count % chunk_size == 0:
+            yield handler.flush()
+    if count or not ndjson:
+        handler.write(end)
+
+
+def marshal_stream(schema, code=200, ndjson=False, chunk_size=100,
+                   mask=True):
+    '''
+    A decorator for handler methods returning an iterator, generator or
+    async generator of objects. Each object is serialized with a
+    marshmallow schema and streamed as a chunked JSON array or newline
+    delimited JSON.
+
+    :param schema: marshmallow schema class or instance for a single item
+    :param int code: the response status code
+    :param bool ndjson: whether to write newline delimited JSON
+    :param int chunk_size: number of items written between flushes
+    :param bool mask: whether to serialize only fields requested with
+                      a fields mask (see :mod:`mask`)
+    '''
+    schema = get_schema(schema)
+
+    def decorator(method):
+        @wraps(method)
+        @gen.coroutine
+        def wrapper(self, *args, **kwargs):
+            item_schema = masked_schema(self, schema) if mask else schema
+            if item_schema is None:
+                return
+            result = method(self, *args, **kwargs)
+            if is_awaitable(result):
+                result = yield result
+            if not self._finished:
+                self.set_status(code)
+                yield write_stream(self, item_schema, result, ndjson=ndjson,
+                                   chunk_size=chunk_size)
+        return add_apidoc(wrapper, MASK_APIDOC) if mask else wrapper
+    return decorator
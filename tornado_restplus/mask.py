@@ -0,0 +1,176 @@
+'''
+Field masks (sparse fieldsets).
+
+Clients ask for a subset of fields with ``X-Fields`` header or ``fields``
+query argument, eg. ``name,owner{name}`` (outer braces are optional).
+Masks are compiled into marshmallow schemas with ``only`` set, so only
+requested fields are serialized. Compiled schemas are kept in an LRU cache.
+'''
+from collections import OrderedDict
+
+from marshmallow import fields
+
+MASK_HEADER = 'X-Fields'
+MASK_ARGUMENT = 'fields'
+
+MASK_APIDOC = {'parameters': [
+    {'name': MASK_HEADER, 'in': 'header', 'type': 'string', 'format': 'mask',
+     'description': 'An optional fields mask'},
+]}
+
+
+class MaskError(ValueError):
+    pass
+
+
+def parse_mask(mask):
+    '''
+    Parse a mask into a tuple of (dotted) field names::
+
+        >>> parse_mask('{name,owner{name,age}}')
+        ('name', 'owner.name', 'owner.age')
+
+    :raises MaskError: when the mask is malformed
+    '''
+    mask = mask.strip()
+    if mask.startswith('{') and mask.endswith('}'):
+        mask = mask[1:-1]
+    paths = []
+    parents = []
+    name = ''
+    for char in mask + ',':
+        if char == '{':
+            if not name:
+                raise MaskError('Unexpected opening bracket')
+            parents.append(name)
+            name = ''
+        elif char in ',}':
+            if name:
+                paths.append('.'.join(parents + [name]))
+                name = ''
+            if char == '}':
+                if not parents:
+                    raise MaskError('Unexpected closing bracket')
+                parents.pop()
+        elif not char.isspace():
+            name += char
+    if parents:
+        raise MaskError('Missing closing bracket')
+    if not paths:
+        raise MaskError('Empty mask')
+    return tuple(paths)
+
+
+def _validate(schema_fields, paths):
+    # Fields of the schema instance, so fields left out with only/exclude
+    # of the route schema can't be requested
+    for path in paths:
+        name, _, nested = path.partition('.')
+        if name not in schema_fields:
+            raise MaskError('Unknown field: {0}'.format(name))
+        field = schema_fields[name]
+        if nested:
+            if not isinstance(field, fields.Nested):
+                raise MaskError('Field is not nested: {0}'.format(name))
+            _validate(field.schema.fields, [nested])
+
+
+def _expand(schema_fields, paths):
+    # Nested fields selected as a whole are expanded to the fields their
+    # schema serializes, so they stay restricted by only/exclude of the
+    # route schema
+    expanded = []
+    for path in paths:
+        name, _, nested = path.partition('.')
+        field = schema_fields[name]
+        if isinstance(field, fields.Nested) and (
+                nested or field.only or field.exclude):
+            nested_fields = field.schema.fields
+            expanded.extend(
+                name + '.' + item for item in _expand(
+                    nested_fields, [nested] if nested else nested_fields))
+        else:
+            expanded.append(path)
+    return tuple(expanded)
+
+
+# Schema settings kept by masked schemas (those present in the installed
+# marshmallow version)
+SCHEMA_SETTINGS = ('exclude', 'prefix', 'strict', 'load_only', 'dump_only',
+                   'partial', 'unknown')
+
+
+def _frozen(value):
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return tuple(sorted(value))
+    return value
+
+
+class MaskedSchemaCache(object):
+    '''
+    LRU cache of schemas compiled for masks.
+
+    :param int maxsize: maximum number of kept schemas
+    '''
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self._schemas = OrderedDict()
+
+    def __len__(self):
+        return len(self._schemas)
+
+    def get(self, schema, mask):
+        '''
+        Returns schema serializing only fields selected by the mask, with
+        settings of the schema (``only``, ``exclude``, ``context``, ...)
+        kept.
+
+        :param schema: marshmallow schema instance
+        :param str mask: the mask
+        :raises MaskError: when the mask is malformed or selects fields
+                           the schema does not serialize
+        '''
+        settings = dict((name, getattr(schema, name))
+                        for name in SCHEMA_SETTINGS if hasattr(schema, name))
+        # The compiled schema shares the context, so its id is not reused
+        # while the entry is kept
+        key = (type(schema), schema.many, _frozen(schema.only),
+               id(schema.context), mask) + tuple(
+            (name, _frozen(value)) for name, value in sorted(settings.items()))
+        compiled = self._schemas.pop(key, None)
+        if compiled is None:
+            only = parse_mask(mask)
+            _validate(schema.fields, only)
+            compiled = type(schema)(only=_expand(schema.fields, only),
+                                    many=schema.many, context=schema.context,
+                                    **settings)
+        self._schemas[key] = compiled
+        if len(self._schemas) > self.maxsize:
+            self._schemas.popitem(last=False)
+        return compiled
+
+
+schemas = MaskedSchemaCache()
+
+
+def get_mask(handler):
+    '''
+    Returns mask requested by the client or None.
+    '''
+    return handler.request.headers.get(MASK_HEADER) or \
+        handler.get_query_argument(MASK_ARGUMENT, None)
+
+
+def apply_mask(handler, schema):
+    '''
+    Returns the schema restricted to fields requested by the client.
+
+    :raises MaskError: when the mask is invalid
+    '''
+    # Responses differ by the mask header, shared caches must know it
+    # (also when it is not sent, the response is not masked)
+    handler.add_header('Vary', MASK_HEADER)
+    mask = get_mask(handler)
+    if not mask:
+        return schema
+    return schemas.get(schema, mask)
@@ -0,0 +1,133 @@
+'''
+Per route request metrics.
+
+Metrics are labelled by namespace name, route template and http method,
+so that requests to ``/items/1`` and ``/items/2`` are counted together.
+'''
+from bisect import bisect_left
+from collections import OrderedDict
+
+from tornado.web import RequestHandler
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5,
+                   5.0, 10.0)
+
+
+class RouteMetrics(object):
+    '''
+    Request count, status codes and latency histogram of a single route.
+    '''
+    __slots__ = ('count', 'sum', 'buckets', 'statuses')
+
+    def __init__(self, buckets):
+        self.count = 0
+        self.sum = 0.0
+        # The last bucket is +Inf
+        self.buckets = [0] * (len(buckets) + 1)
+        self.statuses = {}
+
+    def to_dict(self, buckets):
+        cumulative = []
+        total = 0
+        for le, count in zip(buckets + (float('inf'), ), self.buckets):
+            total += count
+            cumulative.append((le, total))
+        return {
+            'count': self.count,
+            'sum': self.sum,
+            'statuses': dict(self.statuses),
+            'buckets': cumulative,
+        }
+
+
+class MetricsCollector(object):
+    '''
+    In-process metrics collector, attach it with :meth:`Api.instrument`.
+
+    :param tuple buckets: upper bounds (in seconds) of latency histogram
+                          buckets
+    '''
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.bucket_bounds = tuple(sorted(buckets))
+        self.routes = OrderedDict()
+
+    def observe(self, handler):
+        '''
+        Record a finished request.
+
+        :param RequestHandler handler: bound resource which served the
+                                       request
+        '''
+        namespace = handler._restplus_namespace
+        key = (namespace.name if namespace else '', handler._restplus_route,
+               handler.request.method)
+        metrics = self.routes.get(key)
+        if metrics is None:
+            metrics = self.routes[key] = RouteMetrics(self.bucket_bounds)
+        latency = handler.request.request_time()
+        status = handler.get_status()
+        metrics.count += 1
+        metrics.sum += latency
+        metrics.buckets[bisect_left(self.bucket_bounds, latency)] += 1
+        metrics.statuses[status] = metrics.statuses.get(status, 0) + 1
+
+    def snapshot(self):
+        '''
+        Returns current metrics as a list of dicts with ``namespace``,
+        ``route``, ``method``, ``count``, ``sum`` (of latencies in
+        seconds), ``statuses`` and cumulative ``buckets`` keys.
+        '''
+        snapshot = []
+        for (namespace, route, method), metrics in self.routes.items():
+            item = metrics.to_dict(self.bucket_bounds)
+            item.update(namespace=namespace, route=route, method=method)
+            snapshot.append(item)
+        return snapshot
+
+    def reset(self):
+        self.routes.clear()
+
+    def prometheus(self):
+        '''
+        Returns metrics in prometheus text exposition format.
+        '''
+        requests = ['# HELP restplus_requests_total Number of requests.',
+                    '# TYPE restplus_requests_total counter']
+        durations = ['# HELP restplus_request_duration_seconds '
+                     'Request latency.',
+                     '# TYPE restplus_request_duration_seconds histogram']
+        for item in self.snapshot():
+            labels = 'namespace="{0}",route="{1}",method="{2}"'.format(
+                _escape(item['namespace']), _escape(item['route']),
+                item['method'])
+            for status, count in sorted(item['statuses'].items()):
+                requests.append('restplus_requests_total{{{0},code="{1}"}} '
+                                '{2}'.format(labels, status, count))
+            for le, count in item['buckets']:
+                le = '+Inf' if le == float('inf') else repr(le)
+                durations.append(
+                    'restplus_request_duration_seconds_bucket'
+                    '{{{0},le="{1}"}} {2}'.format(labels, le, count))
+            durations.append('restplus_request_duration_seconds_sum{{{0}}} '
+                             '{1!r}'.format(labels, item['sum']))
+            durations.append('restplus_request_duration_seconds_count{{{0}}} '
+                             '{1}'.format(labels, item['count']))
+        return '\n'.join(requests + durations) + '\n'
+
+
+def _escape(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"') \
+        .replace('\n', '\\n')
+
+
+class MetricsHandler(RequestHandler):
+    '''
+    Serves metrics of an :class:`Api` in prometheus text format.
+    '''
+    def initialize(self, api):
+        self.api = api
+
+    def get(self):
+        self.set_header('Content-Type', 'text/plain; version=0.0.4')
+        collector = self.api.collector
+        self.write(collector.prometheus() if collector is not None else '')
@@ -1,5 +1,19 @@
 # -*- coding: utf-8 -*-
 from __future__ import unicode_literals
+
+from tornado import gen
+from tornado.web import RequestHandler
+
+from . import marshalling
+from .auth import normalize_security, secure
+from .bulk import bulk
+from .cache import MemoryCache, cached
+from .compression import Compression
+from .conditional import conditional
+from .executor import BoundedExecutor, run_in_executor
+from .jobs import JobStore, job_handlers
+from .limits import limit
+from .pagination import item_id, paginate
 from .utils import make_path_chunk
 
 
@@ -13,20 +27,45 @@ class Namespace(object):
     :param str description: An optionale short description
     :param str path: An optional prefix path. If not provided, prefix is
                      ``/+name``
-    :param list decorators: A list of decorators to apply to each resources
+    :param list decorators: A list of decorators to apply to each http
+                            method of namespace resources
     :param bool validate: Whether or not to perform validation on this
                           namespace
     :param Api api: an optional API to attache to the namespace
+    :param CacheBackend cache_backend: store for responses cached with
+                                       :meth:`cache`, in-process LRU by
+                                       default
+    :param BoundedExecutor executor: executor of methods marked with
+                                     :meth:`run_in_executor` and of jobs
+    :param list limits: :class:`RateLimit` and :class:`ConcurrencyLimit`
+                        instances shared by all namespace resources
+    :param Compression compression: compression policy of responses of
+                                    namespace resources, True for the
+                                    default one
+    :param security: security requirements of namespace resources,
+                     defaults to api ``security``
     '''
     def __init__(self, name, description=None, path=None, decorators=None,
-                 validate=None, **kwargs):
+                 validate=None, cache_backend=None, executor=None,
+                 limits=None, compression=None, security=None, **kwargs):
         self.name = name
         self.description = description
         self._path = make_path_chunk(path) if path else None
+        self._validate = validate
+        self.decorators = decorators or []
+        self.executor = executor
+        self._default_executor = None
+        self.limits = limits or []
+        if compression is True:
+            compression = Compression()
+        self.compression = compression
+        self.security = normalize_security(security)
         self.definitions = []
         self.resources = []
         # self.error_handlers = {}
         self.default_error_handler = None
+        self.cache_backend = cache_backend
+        self._cache_backends = []
         self.apis = []
         if 'api' in kwargs:
             self.apis.append(kwargs['api'])
@@ -67,6 +106,38 @@ class Namespace(object):
             ns_urls = api.ns_urls(self, urls)
             api.register_resource(self, resource, *ns_urls, **kwargs)
 
+    def decorate(self, resource, security=None):
+        '''
+        Returns http methods of the resource wrapped with namespace
+        decorators, keyed by method name. Security requirements are checked
+        before them (unless the method declares its own), and namespace
+        limits before anything else.
+
+        :param resource: RequestHandler descendant
+        :param list security: requirements used when the namespace has
+                              none (eg. api ``security``)
+        :returns dict: decorated methods
+        '''
+        if self.security is not None:
+            security = self.security
+        if not (self.decorators or self.limits or security):
+            return {}
+        methods = {}
+        for http_method in resource.SUPPORTED_METHODS:
+            name = http_method.lower()
+            method = getattr(resource, name, None)
+            if method is None or method is getattr(RequestHandler, name,
+                                                   None):
+                continue
+            for decorator in self.decorators:
+                method = decorator(method)
+            if security and getattr(method, '__security__', None) is None:
+                method = secure(security)(method)
+            if self.limits:
+                method = limit(*self.limits)(method)
+            methods[name] = method
+        return methods
+
     def route(self, *urls, **kwargs):
         '''
         A decorator to route resources.
@@ -79,4 +150,226 @@ class Namespace(object):
     def definition(self, *args, **kwargs):
         self.definitions.append((args, kwargs))
         for api in self.apis:
-            api.spec.definition(*args, **kwargs)
+            api.register_definition(self, *args, **kwargs)
+
+    def expect(self, schema, many=False, validate=None):
+        '''
+        A decorator to load and validate request body of a handler method
+        with a marshmallow schema. Loaded data is available as
+        ``self.payload``.
+
+        :param schema: marshmallow schema class or instance
+        :param bool many: whether the body is a collection
+        :param bool validate: whether to reject invalid payloads with
+                              ``400``, defaults to namespace ``validate``
+                              (or True when it is not set)
+        '''
+        if validate is None:
+            validate = self._validate if self._validate is not None else True
+        return marshalling.expect(schema, many=many, validate=validate)
+
+    def marshal_with(self, schema, code=200, many=False, mask=True):
+        '''
+        A decorator serializing object returned by a handler method with
+        a marshmallow schema. Response is encoded with the representation
+        negotiated with ``Accept`` header, see :meth:`Api.negotiate`.
+
+        :param schema: marshmallow schema class or instance
+        :param int code: the response status code
+        :param bool many: whether returned object is a collection
+        :param bool mask: whether to serialize only fields requested with
+                          ``X-Fields`` header or ``fields`` query argument
+        '''
+        return marshalling.marshal_with(schema, code=code, many=many,
+                                        mask=mask)
+
+    def bulk(self, schema, code=200, result_schema=None, max_items=1000,
+             max_size=10 * 1024 * 1024, atomic=False):
+        '''
+        A decorator for handler methods processing an array of items in
+        a single call. Items are validated in one pass and the valid ones
+        passed as ``self.payload``; the method returns a result per item
+        and the response is an array of per-item statuses, see
+        :mod:`bulk`.
+
+        :param schema: marshmallow schema class or instance of single item
+        :param int code: status of successfully processed items
+        :param result_schema: marshmallow schema of results of items
+        :param int max_items: maximum number of items of a request
+        :param int max_size: maximum size of request body in bytes
+        :param bool atomic: whether to reject the whole request when any
+                            item is invalid
+        '''
+        return bulk(schema, code=code, result_schema=result_schema,
+                    max_items=max_items, max_size=max_size, atomic=atomic)
+
+    def marshal_stream(self, schema, code=200, ndjson=False, chunk_size=100,
+                       mask=True):
+        '''
+        A decorator streaming objects yielded by a handler method (iterator
+        or async generator), each serialized with a marshmallow schema, as
+        a chunked JSON array or newline delimited JSON.
+
+        :param schema: marshmallow schema class or instance for single item
+        :param int code: the response status code
+        :param bool ndjson: whether to write newline delimited JSON
+        :param int chunk_size: number of items written between flushes
+        :param bool mask: whether to serialize only fields requested with
+                          ``X-Fields`` header or ``fields`` query argument
+        '''
+        return marshalling.marshal_stream(schema, code=code, ndjson=ndjson,
+                                          chunk_size=chunk_size, mask=mask)
+
+    def cache(self, ttl, key=None, backend=None):
+        '''
+        A decorator caching responses (body and headers) of a GET handler
+        method. Concurrent misses on the same key are computed once.
+
+        :param float ttl: time to live of cached responses in seconds
+        :param callable key: function taking the handler and returning
+                             cache key, defaults to request uri and
+                             mediatype
+        :param CacheBackend backend: store for responses, defaults to
+                                     namespace ``cache_backend``
+        '''
+        if backend is None:
+            if self.cache_backend is None:
+                self.cache_backend = MemoryCache()
+            backend = self.cache_backend
+        if backend not in self._cache_backends:
+            self._cache_backends.append(backend)
+        return cached(backend, ttl, key=key, prefix=self._cache_prefix)
+
+    @property
+    def _cache_prefix(self):
+        return '{0}:'.format(self.name)
+
+    def invalidate_cache(self):
+        '''
+        Drop all responses cached by resources of this namespace.
+
+        :returns: a future when some of the backends are asynchronous
+        '''
+        results = [backend.delete_prefix(self._cache_prefix)
+                   for backend in self._cache_backends]
+        futures = [result for result in results
+                   if marshalling.is_awaitable(result)]
+        if futures:
+            return gen.multi(futures)
+
+    def conditional(self, etag=None, last_modified=None, weak=False):
+        '''
+        A decorator answering ``304 Not Modified`` to conditional GET
+        requests before the handler method runs. Validators are computed
+        by cheap functions taking the handler and path arguments, see
+        :func:`conditional.conditional`.
+
+        :param callable etag: function returning resource version
+        :param callable last_modified: function returning datetime or
+                                       timestamp of the last modification
+        :param bool weak: whether the ETag is weak
+        '''
+        return conditional(etag=etag, last_modified=last_modified,
+                           weak=weak)
+
+    def secure(self, *security):
+        '''
+        A decorator checking security requirements before a handler method
+        runs, they replace requirements of the namespace. Without
+        requirements the method is public. The principal returned by
+        the verifier is available as ``self.current_user``, see
+        :mod:`auth`.
+
+        :param security: requirements in the swagger form (dicts of scheme
+                         names to scopes, any of them must be satisfied)
+                         or scheme names
+        '''
+        return secure(normalize_security(list(security)))
+
+    def run_in_executor(self, executor=None):
+        '''
+        A decorator running synchronous handler method on a thread pool and
+        awaiting its result on the IOLoop. The method should only compute
+        and return its result, see :func:`executor.run_in_executor`.
+
+        :param BoundedExecutor executor: the executor, defaults to
+                                         namespace ``executor`` or a thread
+                                         pool shared by the namespace
+        '''
+        return run_in_executor(self._get_executor(executor))
+
+    def _get_executor(self, executor=None):
+        if executor is None:
+            executor = self.executor
+        if executor is None:
+            if self._default_executor is None:
+                self._default_executor = BoundedExecutor()
+            executor = self._default_executor
+        return executor
+
+    def job(self, url, schema=None, result_schema=None, executor=None,
+            store=None, **kwargs):
+        '''
+        A decorator registering a function as a long running job. ``POST``
+        to the url submits the job with the request body (loaded with
+        ``schema``) and answers ``202 Accepted`` with its status url,
+        ``GET`` of the status url returns status and result of the job,
+        see :mod:`jobs`. Both routes are documented in the spec::
+
+            @ns.job('/reports', schema=ReportRequest, result_schema=Report)
+            def report(payload):
+                return build_report(payload)
+
+        :param str url: url of the job route
+        :param schema: marshmallow schema loading the payload
+        :param result_schema: marshmallow schema serializing the result
+        :param BoundedExecutor executor: executor of synchronous functions,
+                                         defaults to namespace executor or
+                                         a thread pool shared by the
+                                         namespace
+        :param JobStore store: store of the jobs, a new in-process one by
+                               default
+        '''
+        kwargs.setdefault('_doc', True)
+
+        def wrapper(func):
+            submit, status = job_handlers(
+                func, self._get_executor(executor),
+                store if store is not None else JobStore(),
+                schema=schema, result_schema=result_schema)
+            self.add_resource(submit, url, **kwargs)
+            self.add_resource(status, url.rstrip('/') +
+                              r'/(?P<job_id>[0-9a-f]{32})', **kwargs)
+            return func
+        return wrapper
+
+    def limit(self, *limits):
+        '''
+        A decorator checking rate and concurrency limits before a handler
+        method runs. Requests over the limit are answered with ``429``
+        (rate) or ``503`` (concurrency) without running the method.
+
+        :param limits: :class:`RateLimit` and :class:`ConcurrencyLimit`
+                       instances
+        '''
+        return limit(*limits)
+
+    def paginate(self, schema, max_page_size=100, default_page_size=None,
+                 key=item_id, mask=True):
+        '''
+        A decorator for keyset paginated handler methods. ``limit`` and
+        ``cursor`` query arguments are passed to the method as
+        ``self.page`` and returned items are wrapped in an envelope with
+        an opaque ``next_cursor``, see :func:`pagination.paginate`. The
+        query arguments are documented in the spec.
+
+        :param schema: marshmallow schema class or instance for single item
+        :param int max_page_size: the upper bound of ``limit``
+        :param int default_page_size: ``limit`` used when not provided
+        :param callable key: function returning the key of an item
+        :param bool mask: whether to serialize only fields requested with
+                          ``X-Fields`` header or ``fields`` query argument
+        '''
+        return paginate(schema, max_page_size=max_page_size,
+                        default_page_size=default_page_size, key=key,
+                        mask=mask)
@@ -0,0 +1,117 @@
+'''
+Keyset (cursor) pagination.
+
+Cursors are opaque to clients: the key of the last item of a page is
+encoded as urlsafe base64 of its JSON representation.
+'''
+import base64
+import binascii
+import json
+from collections import namedtuple
+from functools import wraps
+
+from tornado import gen
+
+from .mask import MASK_APIDOC
+from .marshalling import (dump, get_schema, is_awaitable, masked_schema,
+                          write_data)
+from .utils import add_apidoc
+
+PageRequest = namedtuple('PageRequest', ['limit', 'after'])
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(key):
+    data = json.dumps(key, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(data).rstrip(b'=').decode('ascii')
+
+
+def decode_cursor(cursor):
+    try:
+        data = base64.urlsafe_b64decode(
+            (cursor + '=' * (-len(cursor) % 4)).encode('ascii'))
+        return json.loads(data.decode('utf-8'))
+    except (binascii.Error, ValueError, UnicodeError, TypeError):
+        raise InvalidCursor(cursor)
+
+
+def item_id(item):
+    if isinstance(item, dict):
+        return item['id']
+    return item.id
+
+
+def paginate(schema, max_page_size=100, default_page_size=None,
+             key=item_id, mask=True):
+    '''
+    A decorator for handler methods returning a page of items.
+
+    ``limit`` and ``cursor`` query arguments are parsed and passed to the
+    method as ``self.page`` (:class:`PageRequest` with ``limit`` and
+    ``after``, the decoded key of the last item of previous page or None).
+    The method returns up to ``page.limit`` items ordered by key, they are
+    serialized with the schema and wrapped in an envelope::
+
+        {"items": [...], "limit": 20, "next_cursor": "eyJpZCI6NDJ9"}
+
+    ``next_cursor`` is None when the returned page is not full.
+
+    :param schema: marshmallow schema class or instance for a single item
+    :param int max_page_size: the upper bound of ``limit``
+    :param int default_page_size: ``limit`` used when not provided,
+                                  defaults to ``max_page_size``
+    :param callable key: function returning the key of an item, defaults
+                         to its ``id``
+    :param bool mask: whether to serialize only fields requested with
+                      a fields mask (see :mod:`mask`)
+    '''
+    schema = get_schema(schema, many=True)
+    default_page_size = default_page_size or max_page_size
+
+    def decorator(method):
+        @wraps(method)
+        @gen.coroutine
+        def wrapper(self, *args, **kwargs):
+            try:
+                limit = int(self.get_query_argument('limit',
+                                                    default_page_size))
+                cursor = self.get_query_argument('cursor', None)
+                after = decode_cursor(cursor) if cursor else None
+            except (ValueError, InvalidCursor):
+                self.set_status(400)
+                self.write({'message': 'Invalid limit or cursor'})
+                return
+            self.page = PageRequest(min(max(limit, 1), max_page_size), after)
+            items_schema = masked_schema(self, schema) if mask else schema
+            if items_schema is None:
+                return
+
+            items = method(self, *args, **kwargs)
+            if is_awaitable(items):
+                items = yield items
+            if self._finished:
+                return
+            items = list(items)[:self.page.limit]
+            next_cursor = None
+            if items and len(items) == self.page.limit:
+                next_cursor = encode_cursor(key(items[-1]))
+            write_data(self, {
+                'items': dump(items_schema, items),
+                'limit': self.page.limit,
+                'next_cursor': next_cursor,
+            })
+        if mask:
+            add_apidoc(wrapper, MASK_APIDOC)
+        return add_apidoc(wrapper, {'parameters': [
+            {'name': 'limit', 'in': 'query', 'type': 'integer',
+             'minimum': 1, 'maximum': max_page_size,
+             'default': default_page_size,
+             'description': 'Maximum number of items in the page'},
+            {'name': 'cursor', 'in': 'query', 'type': 'string',
+             'description': 'Cursor of the page (next_cursor of the '
+                            'previous page)'},
+        ]})
+    return decorator
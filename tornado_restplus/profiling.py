@@ -0,0 +1,295 @@
+'''
+On demand profiling of api resources.
+
+A profiling endpoint (see :meth:`Api.add_profiling_endpoint`) profiles
+resources of a namespace or a single route for a number of seconds and
+returns stats grouped by handler class::
+
+    $ curl -X POST '/api/_profile?seconds=10&namespace=items'
+    $ curl -X POST '/api/_profile?seconds=10&format=collapsed' > stacks.txt
+    $ flamegraph.pl stacks.txt > flamegraph.svg
+
+The default ``sample`` mode is a statistical sampler: a thread takes
+stacks of all other threads (so methods run on executors are included)
+every few milliseconds and keeps those passing through http methods of
+profiled handlers, as collapsed stacks. The ``cprofile`` mode runs
+:mod:`cProfile` on the IOLoop thread and reports functions reachable from
+http methods of each handler (with their overall counts, cProfile has no
+call stacks).
+
+Nothing is hooked into request handling, resources do not pay anything
+when profiling is off.
+'''
+import cProfile
+import pstats
+import sys
+import threading
+import time
+
+from tornado import gen
+from tornado.web import RequestHandler
+
+from .marshalling import write_data
+from .resource import ResourceMixin
+
+SAMPLE = 'sample'
+CPROFILE = 'cprofile'
+
+
+def _code_chain(func):
+    # Code of the function and of functions it wraps (decorators)
+    codes = []
+    while func is not None:
+        code = getattr(func, '__code__', None)
+        if code is not None:
+            codes.append(code)
+        func = getattr(func, '__wrapped__', None)
+    return codes
+
+
+def frame_label(frame):
+    code = frame.f_code
+    return '{0}:{1}'.format(frame.f_globals.get('__name__', code.co_filename),
+                            code.co_name)
+
+
+class Profiler(object):
+    '''
+    Profiles resources of an api, see module documentation.
+
+    :param Api api: the api
+    :param str mode: ``'sample'`` or ``'cprofile'``
+    :param str namespace: name of the profiled namespace, all by default
+    :param str route: complete url template of the profiled route, all by
+                      default
+    :param float interval: seconds between samples
+    :param int limit: maximum number of functions reported per handler in
+                      ``cprofile`` mode
+    '''
+    def __init__(self, api, mode=SAMPLE, namespace=None, route=None,
+                 interval=0.005, limit=50):
+        if mode not in (SAMPLE, CPROFILE):
+            raise ValueError('Unknown profiling mode: {0}'.format(mode))
+        self.api = api
+        self.mode = mode
+        self.namespace = namespace
+        self.route = route
+        self.interval = interval
+        self.limit = limit
+        self.codes = set()
+        # Code of the original http methods of each profiled resource
+        self.methods = {}
+        for item in api.routes:
+            if issubclass(item.resource, ProfileHandler) or \
+                    not self._matches_route(item.namespace, item.url):
+                continue
+            for http_method in item.resource.SUPPORTED_METHODS:
+                name = http_method.lower()
+                method = getattr(item.resource, name, None)
+                if method is None or method is getattr(RequestHandler, name,
+                                                       None):
+                    continue
+                codes = _code_chain(method)
+                self.codes.update(codes)
+                if codes:
+                    self.methods.setdefault(item.resource, set()).add(
+                        codes[-1])
+        if not self.methods:
+            raise ValueError('No resources to profile')
+        self.stacks = {}
+        self.samples = 0
+        self.started = None
+        self.stopped = None
+        self._stop = threading.Event()
+        self._thread = None
+        self._profile = None
+
+    def _matches_route(self, namespace, route):
+        if self.namespace is not None and (
+                namespace is None or namespace.name != self.namespace):
+            return False
+        return self.route is None or route == self.route
+
+    def _matches(self, handler):
+        return isinstance(handler, ResourceMixin) and \
+            handler._restplus_api is self.api and \
+            not isinstance(handler, ProfileHandler) and \
+            self._matches_route(handler._restplus_namespace,
+                                handler._restplus_route)
+
+    def start(self):
+        '''
+        Start profiling, ``cprofile`` mode profiles the calling thread.
+        '''
+        self.started = time.time()
+        if self.mode == CPROFILE:
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+        else:
+            self._thread = threading.Thread(target=self._run,
+                                            name='restplus-profiler')
+            self._thread.daemon = True
+            self._thread.start()
+
+    def stop(self):
+        if self.mode == CPROFILE:
+            self._profile.disable()
+        else:
+            self._stop.set()
+            self._thread.join()
+        self.stopped = time.time()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.sample()
+
+    def sample(self):
+        '''
+        Record stacks of all threads (but the calling one) running http
+        methods of profiled handlers.
+        '''
+        current = threading.current_thread().ident
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == current:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(frame)
+                frame = frame.f_back
+            # The outermost frame of a profiled handler starts the stack
+            for index in range(len(stack) - 1, -1, -1):
+                handler = None
+                if stack[index].f_code in self.codes:
+                    handler = stack[index].f_locals.get('self')
+                if self._matches(handler):
+                    break
+            else:
+                continue
+            key = ';'.join([type(handler).__name__] +
+                           [frame_label(item)
+                            for item in reversed(stack[:index + 1])])
+            self.stacks[key] = self.stacks.get(key, 0) + 1
+            self.samples += 1
+
+    def collapsed(self):
+        '''
+        Returns sampled stacks in the collapsed format of flamegraph tools,
+        one ``handler;frame;...;frame count`` line per stack.
+        '''
+        return ''.join('{0} {1}\n'.format(key, count)
+                       for key, count in sorted(self.stacks.items()))
+
+    def _sampled_handlers(self):
+        handlers = {}
+        for key, count in self.stacks.items():
+            handler, stack = key.split(';', 1)
+            item = handlers.setdefault(handler, {'samples': 0, 'stacks': {}})
+            item['samples'] += count
+            item['stacks'][stack] = count
+        return handlers
+
+    def _profiled_handlers(self):
+        stats = pstats.Stats(self._profile).stats
+        callees = {}
+        for func, (_, _, _, _, callers) in stats.items():
+            for caller in callers:
+                callees.setdefault(caller, set()).add(func)
+        handlers = {}
+        for resource, codes in self.methods.items():
+            roots = [(code.co_filename, code.co_firstlineno, code.co_name)
+                     for code in codes]
+            roots = [func for func in roots if func in stats]
+            reachable = set()
+            pending = list(roots)
+            while pending:
+                func = pending.pop()
+                if func not in reachable:
+                    reachable.add(func)
+                    pending.extend(callees.get(func, ()))
+            if not roots:
+                continue
+            functions = sorted((
+                {'function': pstats.func_std_string(func),
+                 'calls': stats[func][1], 'tottime': stats[func][2],
+                 'cumtime': stats[func][3]} for func in reachable),
+                key=lambda item: -item['cumtime'])
+            handlers[resource.__name__] = {
+                'calls': sum(stats[func][1] for func in roots),
+                'functions': functions[:self.limit],
+            }
+        return handlers
+
+    def results(self):
+        '''
+        Returns stats grouped by handler class name: ``samples`` and
+        collapsed ``stacks`` (sample mode) or ``calls`` of http methods
+        and ``functions`` sorted by cumulative time (cprofile mode).
+        '''
+        if self.mode == CPROFILE:
+            handlers = self._profiled_handlers()
+        else:
+            handlers = self._sampled_handlers()
+        return {
+            'mode': self.mode,
+            'namespace': self.namespace,
+            'route': self.route,
+            'seconds': (self.stopped or time.time()) - self.started,
+            'samples': self.samples,
+            'handlers': handlers,
+        }
+
+
+class ProfileHandler(RequestHandler):
+    '''
+    Profiles resources of an :class:`Api` for a number of seconds and
+    returns the stats. Query arguments: ``seconds``, ``mode``
+    (``sample`` or ``cprofile``), ``namespace``, ``route`` and ``format``
+    (``json`` or ``collapsed`` stacks of sample mode).
+    '''
+    def initialize(self, api, max_seconds=60):
+        self.api = api
+        self.max_seconds = max_seconds
+
+    def error(self, status, message):
+        self.set_status(status)
+        self.write({'message': message})
+
+    @gen.coroutine
+    def post(self):
+        if self.api.profiler is not None:
+            self.error(409, 'Profiling is already running')
+            return
+        try:
+            seconds = float(self.get_query_argument('seconds', 5))
+        except ValueError:
+            seconds = 0
+        if not 0 < seconds <= self.max_seconds:
+            self.error(400, 'Seconds must be between 0 and {0}'.format(
+                self.max_seconds))
+            return
+        mode = self.get_query_argument('mode', SAMPLE)
+        output = self.get_query_argument('format', 'json')
+        if output not in ('json', 'collapsed') or \
+                (output == 'collapsed' and mode != SAMPLE):
+            self.error(400, 'Collapsed stacks are available in sample mode')
+            return
+        try:
+            profiler = Profiler(
+                self.api, mode=mode,
+                namespace=self.get_query_argument('namespace', None),
+                route=self.get_query_argument('route', None))
+        except ValueError as err:
+            self.error(400, str(err))
+            return
+        self.api.profiler = profiler
+        profiler.start()
+        try:
+            yield gen.sleep(seconds)
+        finally:
+            profiler.stop()
+            self.api.profiler = None
+        if output == 'collapsed':
+            self.set_header('Content-Type', 'text/plain; charset=UTF-8')
+            self.write(profiler.collapsed())
+        else:
+            write_data(self, profiler.results())
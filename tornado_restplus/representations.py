@@ -0,0 +1,114 @@
+'''
+Encoders turning marshalled data into response bytes, keyed by mediatype.
+
+Each encoder is a callable taking the data and returning ``bytes``. For
+``application/json`` the fastest installed backend is used (orjson, ujson,
+stdlib json in this order), other backends are available in
+:data:`JSON_ENCODERS`. Binary ``application/x-msgpack`` and
+``application/cbor`` are available when msgpack and cbor2 are installed.
+
+The representation of a response is negotiated with ``Accept`` request
+header, see :func:`best_match`.
+'''
+import json
+from collections import OrderedDict
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+try:
+    import ujson
+except ImportError:  # pragma: no cover
+    ujson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover
+    msgpack = None
+
+try:
+    import cbor2
+except ImportError:  # pragma: no cover
+    cbor2 = None
+
+
+def stdlib_json(data):
+    return json.dumps(data, separators=(',', ':')).encode('utf-8')
+
+
+JSON_ENCODERS = OrderedDict()
+
+if orjson is not None:
+    def orjson_json(data):
+        return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+    JSON_ENCODERS['orjson'] = orjson_json
+
+if ujson is not None:
+    def ujson_json(data):
+        return ujson.dumps(data, ensure_ascii=False).encode('utf-8')
+    JSON_ENCODERS['ujson'] = ujson_json
+
+JSON_ENCODERS['json'] = stdlib_json
+
+output_json = next(iter(JSON_ENCODERS.values()))
+
+DEFAULT_REPRESENTATIONS = [('application/json', output_json)]
+
+if msgpack is not None:
+    def output_msgpack(data):
+        return msgpack.packb(data, use_bin_type=True)
+    DEFAULT_REPRESENTATIONS.append(('application/x-msgpack', output_msgpack))
+
+if cbor2 is not None:
+    def output_cbor(data):
+        return cbor2.dumps(data)
+    DEFAULT_REPRESENTATIONS.append(('application/cbor', output_cbor))
+
+
+def parse_accept(header):
+    '''
+    Parse ``Accept`` header into a list of mediatypes ordered by
+    preference (quality, then specificity, then order in the header).
+    Mediatypes with zero quality are left out.
+    '''
+    accepted = []
+    for index, item in enumerate(header.split(',')):
+        params = item.split(';')
+        mediatype = params[0].strip().lower()
+        if not mediatype:
+            continue
+        quality = 1.0
+        for param in params[1:]:
+            name, _, value = param.partition('=')
+            if name.strip() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if quality > 0:
+            specificity = 2 - mediatype.count('*')
+            accepted.append((-quality, -specificity, index, mediatype))
+    return [item[-1] for item in sorted(accepted)]
+
+
+def best_match(header, mediatypes):
+    '''
+    Returns the preferred of available mediatypes according to ``Accept``
+    header, or None when none of them is acceptable. Wildcards match
+    available mediatypes in their order.
+
+    :param str header: value of ``Accept`` header
+    :param list mediatypes: available mediatypes, the default one first
+    '''
+    for accepted in parse_accept(header):
+        if accepted == '*/*':
+            return mediatypes[0] if mediatypes else None
+        if accepted.endswith('/*'):
+            for mediatype in mediatypes:
+                if mediatype.startswith(accepted[:-1]):
+                    return mediatype
+        elif accepted in mediatypes:
+            return accepted
+    return None
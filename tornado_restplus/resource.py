@@ -0,0 +1,30 @@
+class ResourceMixin(object):
+    '''
+    Mixed into resources registered through :meth:`Api.register_resource`.
+
+    Registered handlers are subclasses of the user's resource bound to an
+    api, a namespace and a route template, available as ``self.api``,
+    ``self.namespace`` and ``self.route``. These are read-only aliases (not
+    set when the resource defines the names itself), the library reads
+    the binding from private attributes so handlers may reuse the names,
+    eg. set ``self.api`` in ``initialize``.
+    '''
+    _restplus_api = None
+    _restplus_namespace = None
+    _restplus_route = None
+
+    def finish(self, chunk=None):
+        namespace = self._restplus_namespace
+        if namespace is not None and namespace.compression is not None and \
+                not self._finished:
+            if chunk is not None:
+                self.write(chunk)
+                chunk = None
+            namespace.compression.compress(self)
+        return super(ResourceMixin, self).finish(chunk)
+
+    def on_finish(self):
+        collector = self._restplus_api.collector
+        if collector is not None:
+            collector.observe(self)
+        super(ResourceMixin, self).on_finish()
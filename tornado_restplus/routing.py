@@ -0,0 +1,96 @@
+import re
+from collections import namedtuple
+
+from tornado.routing import ReversibleRouter
+from tornado.web import URLSpec
+
+# Entry of the route table of an api: complete url, the resource as
+# registered (not bound), its namespace (or None) and handler kwargs
+Route = namedtuple('Route', ['url', 'resource', 'namespace', 'kwargs'])
+
+
+# Characters making a path segment a regex rather than static text
+_REGEX_SYNTAX = re.compile(r'[\\.^$*+?{}\[\]|()]')
+
+
+class _PrefixNode(object):
+    __slots__ = ('children', 'rules')
+
+    def __init__(self):
+        self.children = {}
+        self.rules = []
+
+
+class NamespaceRouter(ReversibleRouter):
+    '''
+    Router which dispatches requests per namespace prefix.
+
+    Rules are grouped by the static prefix of the namespace they belong to
+    (api prefix + namespace path). On each request the prefix is looked up
+    segment by segment in a trie, and only the regexes registered under the
+    matched prefix are tried. When none of them matches, shorter prefixes
+    are tried, so the most specific namespace always wins.
+
+    :param tornado.web.Application application: the application used for
+                                                creating handler delegates
+    '''
+    def __init__(self, application=None):
+        self.application = application
+        self._root = _PrefixNode()
+        self.named_rules = {}
+
+    @staticmethod
+    def _segments(path):
+        return [segment for segment in path.split('/') if segment]
+
+    def add_rules(self, prefix, rules):
+        '''
+        Register rules under given prefix. Only its leading static segments
+        are looked up, the rest (eg. ``(?P<uid>\\d+)`` of a namespace path)
+        is matched by regexes of the rules.
+
+        :param str prefix: the prefix (eg. ``/api/namespace``)
+        :param list rules: a list of :class:`tornado.web.URLSpec` or
+                           ``(url, handler, kwargs)`` tuples
+        '''
+        node = self._root
+        for segment in self._segments(prefix):
+            if _REGEX_SYNTAX.search(segment):
+                break
+            node = node.children.setdefault(segment, _PrefixNode())
+        for rule in rules:
+            if not isinstance(rule, URLSpec):
+                rule = URLSpec(*rule)
+            node.rules.append(rule)
+            if rule.name:
+                self.named_rules[rule.name] = rule
+
+    def _match(self, request):
+        nodes = [self._root]
+        node = self._root
+        for segment in request.path.split('/'):
+            if not segment:
+                continue
+            node = node.children.get(segment)
+            if node is None:
+                break
+            nodes.append(node)
+
+        for node in reversed(nodes):
+            for rule in node.rules:
+                params = rule.matcher.match(request)
+                if params is not None:
+                    return rule, params
+        return None, None
+
+    def find_handler(self, request, **kwargs):
+        rule, params = self._match(request)
+        if rule is None:
+            return None
+        return self.application.get_handler_delegate(
+            request, rule.target, target_kwargs=rule.target_kwargs, **params)
+
+    def reverse_url(self, name, *args):
+        if name in self.named_rules:
+            return self.named_rules[name].reverse(*args)
+        return None
@@ -0,0 +1,201 @@
+import copy
+import inspect
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from apispec import APISpec
+from apispec.ext.marshmallow import resolve_schema_dict
+from apispec.utils import PATH_KEYS, load_yaml_from_docstring
+from marshmallow import Schema
+from tornado.web import URLSpec
+
+from .utils import merge_operation
+
+
+def _is_schema(schema):
+    return isinstance(schema, Schema) or (isinstance(schema, type) and
+                                          issubclass(schema, Schema))
+
+
+def _takes_varargs(method):
+    try:
+        parameters = inspect.signature(method).parameters.values()
+    except AttributeError:  # python 2
+        method = getattr(method, '__wrapped__', method)
+        return inspect.getargspec(method).varargs is not None
+    return any(parameter.kind == parameter.VAR_POSITIONAL
+               for parameter in parameters)
+
+
+def path_template(urlspec):
+    '''
+    Returns swagger path of a urlspec with parameters named after groups
+    of its regex (the tornado plugin names them after arguments of the
+    http method, which is not possible for ``*args``).
+    '''
+    names = dict((index, name)
+                 for name, index in urlspec.regex.groupindex.items())
+    params = tuple('{{{0}}}'.format(names.get(index, 'arg{0}'.format(index)))
+                   for index in range(1, urlspec.regex.groups + 1))
+    return urlspec.matcher._path % params
+
+
+class SpecFragment(object):
+    '''
+    Part of the spec (paths and definitions) contributed by a single
+    namespace.
+    '''
+    def __init__(self):
+        self.paths = OrderedDict()
+        self.definitions = OrderedDict()
+        self.pending = []
+
+
+class IncrementalAPISpec(APISpec):
+    '''
+    :class:`apispec.APISpec` built out of per namespace fragments.
+
+    Paths and definitions are built into the fragment of the namespace
+    they belong to. The whole document is not regenerated on export, only
+    fragments which changed since the last :meth:`to_dict` are merged into
+    it.
+
+    In lazy mode urlspecs added with :meth:`add_urlspec` are only recorded
+    and their docstrings are parsed on the first export. Either way
+    docstrings are parsed once per handler class.
+
+    :param bool lazy: whether to defer docstring parsing until export
+    '''
+    def __init__(self, *args, **kwargs):
+        self.lazy = kwargs.pop('lazy', False)
+        super(IncrementalAPISpec, self).__init__(*args, **kwargs)
+        self.fragments = OrderedDict()
+        self._changed = OrderedDict()
+        self._handler_operations = {}
+
+    def fragment(self, key):
+        '''
+        Returns spec fragment for given key (namespace or None for api
+        level items), creating it if needed.
+        '''
+        if key not in self.fragments:
+            self.fragments[key] = SpecFragment()
+        return self.fragments[key]
+
+    @contextmanager
+    def _building(self, key):
+        # Helpers registered by plugins write directly into _paths and
+        # _definitions, point them to the fragment for the time of build.
+        fragment = self.fragment(key)
+        paths, definitions = self._paths, self._definitions
+        self._paths, self._definitions = fragment.paths, fragment.definitions
+        try:
+            yield fragment
+        finally:
+            self._paths, self._definitions = paths, definitions
+            self._changed[key] = fragment
+
+    def add_path(self, path=None, operations=None, fragment=None, **kwargs):
+        with self._building(fragment):
+            super(IncrementalAPISpec, self).add_path(path, operations,
+                                                     **kwargs)
+
+    def operations(self, handler_class):
+        '''
+        Returns operations documented in docstrings of handler's http
+        methods, merged with fragments attached by decorators (see
+        :func:`utils.add_apidoc`) and with fragments returned by
+        ``apidoc(method)`` classmethod of the handler, if it has one.
+        Docstrings are parsed once per handler class.
+
+        :param handler_class: RequestHandler descendant
+        '''
+        if handler_class not in self._handler_operations:
+            operations = {}
+            handler_apidoc = getattr(handler_class, 'apidoc', None)
+            for method in PATH_KEYS:
+                func = getattr(handler_class, method)
+                data = load_yaml_from_docstring(func.__doc__)
+                apidoc = getattr(func, '__apidoc__', None)
+                if apidoc:
+                    data = merge_operation(data or {}, copy.deepcopy(apidoc))
+                apidoc = handler_apidoc and handler_apidoc(method)
+                if apidoc:
+                    data = merge_operation(data or {}, apidoc)
+                if data:
+                    operations[method] = data
+            self._handler_operations[handler_class] = operations
+        # Helpers modify operations in place, protect the memoized ones
+        return copy.deepcopy(self._handler_operations[handler_class])
+
+    def add_urlspec(self, urlspec, fragment=None, defaults=None):
+        '''
+        Document a tornado urlspec (or ``(url, handler, kwargs)`` tuple).
+
+        :param urlspec: the urlspec to document
+        :param fragment: key of the fragment the path belongs to
+        :param dict defaults: values set in operations which do not
+                              document them (eg. namespace ``security``)
+        '''
+        if self.lazy:
+            self.fragment(fragment).pending.append((urlspec, defaults))
+            self._changed[fragment] = self.fragments[fragment]
+        else:
+            self._add_urlspec(urlspec, fragment, defaults)
+
+    def _add_urlspec(self, urlspec, fragment, defaults=None):
+        if not isinstance(urlspec, URLSpec):
+            urlspec = URLSpec(*urlspec)
+        operations = self.operations(urlspec.handler_class)
+        for operation in operations.values():
+            for key, value in (defaults or {}).items():
+                operation.setdefault(key, copy.deepcopy(value))
+            # Schemas attached by decorators (the marshmallow plugin only
+            # resolves the ones of views)
+            for item in list(operation.get('responses', {}).values()) + \
+                    operation.get('parameters', []):
+                schema = item.get('schema')
+                if _is_schema(schema) or (isinstance(schema, dict) and
+                                          _is_schema(schema.get('items'))):
+                    item['schema'] = resolve_schema_dict(self, schema)
+        path = None
+        if operations and _takes_varargs(
+                getattr(urlspec.handler_class, next(iter(operations)))):
+            path = path_template(urlspec)
+        self.add_path(path=path, urlspec=urlspec, operations=operations,
+                      fragment=fragment)
+
+    def definition(self, name, fragment=None, **kwargs):
+        with self._building(fragment):
+            super(IncrementalAPISpec, self).definition(name, **kwargs)
+
+    def _build_pending(self, key, fragment):
+        # Urlspecs are dropped once built, a failing one stays pending (as
+        # the fragment stays changed) so every export keeps failing
+        while fragment.pending:
+            urlspec, defaults = fragment.pending[0]
+            self._add_urlspec(urlspec, key, defaults)
+            fragment.pending.pop(0)
+
+    def _merge(self):
+        while self._changed:
+            key, fragment = next(iter(self._changed.items()))
+            if fragment.pending:
+                self._build_pending(key, fragment)
+            self._changed.pop(key)
+            for path in fragment.paths.values():
+                self._paths.setdefault(path.path, path).update(path)
+            self._definitions.update(fragment.definitions)
+
+    def load(self, spec):
+        '''
+        Add paths and definitions of an exported spec (the result of
+        :meth:`to_dict`) as they are.
+        '''
+        self._merge()
+        self._paths.update(spec.get('paths', {}))
+        self._definitions.update(spec.get('definitions', {}))
+
+    def to_dict(self):
+        self._merge()
+        return super(IncrementalAPISpec, self).to_dict()
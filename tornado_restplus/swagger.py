@@ -0,0 +1,53 @@
+import hashlib
+import json
+
+from tornado.web import RequestHandler
+
+from .compression import gzip_compress
+from .representations import parse_accept
+
+
+class SerializedSpec(object):
+    '''
+    Swagger document serialized once and kept as byte buffers.
+
+    :param dict spec: the swagger document (eg. ``APISpec.to_dict()``)
+    :param int compresslevel: gzip compression level
+    '''
+    def __init__(self, spec, compresslevel=9):
+        self.identity = json.dumps(spec).encode('utf-8')
+        self.etag = '"{0}"'.format(hashlib.sha1(self.identity).hexdigest())
+        self.gzip = gzip_compress(self.identity, compresslevel)
+
+
+class SwaggerHandler(RequestHandler):
+    '''
+    Serves the swagger document of an :class:`Api`.
+
+    The document is taken from :attr:`Api.serialized_spec`, so it is
+    built and compressed only once per spec change. Responds with
+    ``304 Not Modified`` when ``If-None-Match`` matches the ETag.
+    '''
+    def initialize(self, api):
+        self.api = api
+
+    def compute_etag(self):
+        # ETag is precomputed, there is no need to hash the body again
+        return None
+
+    def get(self):
+        spec = self.api.serialized_spec
+        self.set_header('ETag', spec.etag)
+        self.set_header('Vary', 'Accept-Encoding')
+        if self.check_etag_header():
+            self.set_status(304)
+            return
+
+        self.set_header('Content-Type', 'application/json; charset=UTF-8')
+        accepted = parse_accept(
+            self.request.headers.get('Accept-Encoding', ''))
+        if 'gzip' in accepted or '*' in accepted:
+            self.set_header('Content-Encoding', 'gzip')
+            self.write(spec.gzip)
+        else:
+            self.write(spec.identity)
@@ -1,3 +1,9 @@
+import importlib
+import inspect
+
+from tornado import gen
+
+
 def make_path_chunk(chunk):
     if chunk == '':
         return chunk
@@ -9,3 +15,62 @@ def make_path_chunk(chunk):
     chunk = ''.join(['/', chunk])
     chunk = chunk.rstrip('/')
     return chunk
+
+
+def is_coroutine_function(func):
+    '''
+    Returns whether the function is a tornado or a native coroutine
+    function (the latter do not exist on Python 2).
+    '''
+    iscoroutinefunction = getattr(inspect, 'iscoroutinefunction', None)
+    return gen.is_coroutine_function(func) or \
+        bool(iscoroutinefunction and iscoroutinefunction(func))
+
+
+def import_path(obj):
+    '''
+    Returns import path (``module:name``) of a class or function.
+    '''
+    return '{0}:{1}'.format(obj.__module__,
+                            getattr(obj, '__qualname__', obj.__name__))
+
+
+def import_object(path):
+    '''
+    Import an object by its import path (``module:name``).
+    '''
+    module, _, name = path.partition(':')
+    obj = importlib.import_module(module)
+    for attr in name.split('.'):
+        obj = getattr(obj, attr)
+    return obj
+
+
+def merge_operation(operation, doc):
+    '''
+    Merge swagger operation fragment into operation dict. Lists (eg.
+    ``parameters``) are extended, dicts (eg. ``responses``) are updated
+    without overriding existing keys, other values are set when missing.
+    '''
+    for key, value in doc.items():
+        if isinstance(value, list):
+            operation[key] = operation.get(key, []) + [
+                item for item in value if item not in operation.get(key, [])]
+        elif isinstance(value, dict):
+            merged = dict(value)
+            merged.update(operation.get(key, {}))
+            operation[key] = merged
+        else:
+            operation.setdefault(key, value)
+    return operation
+
+
+def add_apidoc(func, doc):
+    '''
+    Attach swagger operation fragment to a handler method, it is merged
+    into the operation documented in the method docstring. Fragments of
+    inner decorators are kept (``functools.wraps`` copies them).
+    '''
+    func.__apidoc__ = merge_operation(dict(getattr(func, '__apidoc__', {})),
+                                      doc)
+    return func